@@ -1,15 +1,26 @@
+import io
+import csv
+import base64
 import json
 import datetime
 import os
 import secrets
 import asyncio
 from typing import Optional
-from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends, Security
+from fastapi import APIRouter, HTTPException, Depends, Security, Response, Query, Request, Header
+from fastapi.responses import StreamingResponse
 from fastapi.security import APIKeyHeader
 from pydantic import BaseModel
-from app.core.db import database, redis_client
+from app.core.db import database, redis_client, LATENCY_ROLLUP_TABLE
 from app.core.settings import settings
 from app.core.notifications import notifier
+from app.core.logger import log_pipeline, LOG_STREAM_KEY, latency_percentile
+from app.core.scheduler import scheduler
+from app.core.responses import FastJSONResponse
+from app.core.ai_cache import ai_cache
+from app.core.resolver import resolver
+from app.core.airspace import airspace, airspace_table
+from app.core.geography import airports_icao, airports_lid
 
 # --- SECURITY CONFIGURATION ---
 API_KEY_NAME = "X-Admin-Key"
@@ -39,6 +50,90 @@ async def get_admin_key(api_key_header: str = Security(api_key_header)):
 # Protect all routes in this file
 router = APIRouter(dependencies=[Depends(get_admin_key)])
 
+def _format_window_stats(row, pop_ap, top_user, blocked, p95_lat):
+    return {
+        "total": row['total'] or 0,
+        "avg_latency": round(row['avg_lat'] or 0, 2),
+        "p95_latency": round(p95_lat or 0, 2),
+        "breakdown": {
+            "success": row['success'] or 0, 
+            "cache": row['cache'] or 0, 
+            "limit": row['limit_hit'] or 0, 
+            "fail": row['fail'] or 0
+        },
+        "top_airport": f"{pop_ap['input_icao']} ({pop_ap['c']})" if pop_ap else "-",
+        "top_user": f"{top_user['client_id'][:8]}.. ({top_user['c']})" if top_user else "-",
+        "top_blocked": f"{blocked['client_id'][:8]}.. ({blocked['c']})" if blocked else "-"
+    }
+
+async def _window_stats_from_logs(cutoff_time):
+    query_base = "FROM logs WHERE timestamp > :cutoff"
+    params = {"cutoff": cutoff_time}
+    
+    query_agg = f"""
+        SELECT COUNT(*) as total, AVG(duration_seconds) as avg_lat,
+        percentile_cont(0.95) WITHIN GROUP (ORDER BY duration_seconds) as p95_lat,
+        SUM(CASE WHEN status = 'SUCCESS' THEN 1 ELSE 0 END) as success,
+        SUM(CASE WHEN status = 'CACHE_HIT' THEN 1 ELSE 0 END) as cache,
+        SUM(CASE WHEN status = 'RATE_LIMIT' THEN 1 ELSE 0 END) as limit_hit,
+        SUM(CASE WHEN status IN ('FAIL', 'ERROR') THEN 1 ELSE 0 END) as fail
+        {query_base}
+    """
+    row = await database.fetch_one(query_agg, values=params)
+    
+    query_top_apt = f"SELECT input_icao, COUNT(*) as c {query_base} GROUP BY input_icao ORDER BY c DESC LIMIT 1"
+    pop_ap = await database.fetch_one(query_top_apt, values=params)
+    
+    query_top_user = f"SELECT client_id, COUNT(*) as c {query_base} GROUP BY client_id ORDER BY c DESC LIMIT 1"
+    top_user = await database.fetch_one(query_top_user, values=params)
+
+    query_blocked = f"SELECT client_id, COUNT(*) as c {query_base} AND status='RATE_LIMIT' GROUP BY client_id ORDER BY c DESC LIMIT 1"
+    blocked = await database.fetch_one(query_blocked, values=params)
+
+    return _format_window_stats(row, pop_ap, top_user, blocked, row['p95_lat'])
+
+async def _window_stats_from_rollups(cutoff_time):
+    # Hour-aligned: includes the partial hour the cutoff falls in
+    params = {"cutoff": cutoff_time.replace(minute=0, second=0, microsecond=0)}
+    
+    query_agg = """
+        SELECT SUM(requests) as total, SUM(latency_sum) / NULLIF(SUM(requests), 0) as avg_lat,
+        SUM(CASE WHEN status = 'SUCCESS' THEN requests ELSE 0 END) as success,
+        SUM(CASE WHEN status = 'CACHE_HIT' THEN requests ELSE 0 END) as cache,
+        SUM(CASE WHEN status = 'RATE_LIMIT' THEN requests ELSE 0 END) as limit_hit,
+        SUM(CASE WHEN status IN ('FAIL', 'ERROR') THEN requests ELSE 0 END) as fail
+        FROM logs_hourly WHERE bucket >= :cutoff
+    """
+    row = await database.fetch_one(query_agg, values=params)
+    
+    query_top_apt = """
+        SELECT input_icao, SUM(requests) as c FROM logs_hourly_icao WHERE bucket >= :cutoff
+        GROUP BY input_icao ORDER BY c DESC LIMIT 1
+    """
+    pop_ap = await database.fetch_one(query_top_apt, values=params)
+    
+    query_top_user = """
+        SELECT client_id, SUM(requests) as c FROM logs_hourly_client WHERE bucket >= :cutoff
+        GROUP BY client_id ORDER BY c DESC LIMIT 1
+    """
+    top_user = await database.fetch_one(query_top_user, values=params)
+
+    query_blocked = """
+        SELECT client_id, SUM(rate_limited) as c FROM logs_hourly_client WHERE bucket >= :cutoff AND rate_limited > 0
+        GROUP BY client_id ORDER BY c DESC LIMIT 1
+    """
+    blocked = await database.fetch_one(query_blocked, values=params)
+
+    # Bin upper bound, so at most one bin above the exact value
+    query_latency = f"""
+        SELECT bin, SUM(requests) as c FROM {LATENCY_ROLLUP_TABLE} WHERE bucket >= :cutoff
+        GROUP BY bin
+    """
+    bins = await database.fetch_all(query_latency, values=params)
+    p95_lat = latency_percentile({r['bin']: r['c'] for r in bins}, 0.95)
+
+    return _format_window_stats(row, pop_ap, top_user, blocked, p95_lat)
+
 # --- 1. STATISTICS (THE CARDS) ---
 @router.get("/stats")
 async def get_stats():
@@ -63,41 +158,11 @@ async def get_stats():
     }
     
     for label, cutoff_time in intervals.items():
-        query_base = "FROM logs WHERE timestamp > :cutoff"
-        params = {"cutoff": cutoff_time}
-        
-        query_agg = f"""
-            SELECT COUNT(*) as total, AVG(duration_seconds) as avg_lat,
-            SUM(CASE WHEN status = 'SUCCESS' THEN 1 ELSE 0 END) as success,
-            SUM(CASE WHEN status = 'CACHE_HIT' THEN 1 ELSE 0 END) as cache,
-            SUM(CASE WHEN status = 'RATE_LIMIT' THEN 1 ELSE 0 END) as limit_hit,
-            SUM(CASE WHEN status IN ('FAIL', 'ERROR') THEN 1 ELSE 0 END) as fail
-            {query_base}
-        """
-        row = await database.fetch_one(query_agg, values=params)
-        
-        query_top_apt = f"SELECT input_icao, COUNT(*) as c {query_base} GROUP BY input_icao ORDER BY c DESC LIMIT 1"
-        pop_ap = await database.fetch_one(query_top_apt, values=params)
-        
-        query_top_user = f"SELECT client_id, COUNT(*) as c {query_base} GROUP BY client_id ORDER BY c DESC LIMIT 1"
-        top_user = await database.fetch_one(query_top_user, values=params)
-
-        query_blocked = f"SELECT client_id, COUNT(*) as c {query_base} AND status='RATE_LIMIT' GROUP BY client_id ORDER BY c DESC LIMIT 1"
-        blocked = await database.fetch_one(query_blocked, values=params)
-
-        stats[label] = {
-            "total": row['total'] or 0,
-            "avg_latency": round(row['avg_lat'] or 0, 2),
-            "breakdown": {
-                "success": row['success'] or 0, 
-                "cache": row['cache'] or 0, 
-                "limit": row['limit_hit'] or 0, 
-                "fail": row['fail'] or 0
-            },
-            "top_airport": f"{pop_ap['input_icao']} ({pop_ap['c']})" if pop_ap else "-",
-            "top_user": f"{top_user['client_id'][:8]}.. ({top_user['c']})" if top_user else "-",
-            "top_blocked": f"{blocked['client_id'][:8]}.. ({blocked['c']})" if blocked else "-"
-        }
+        if label == "1h":
+            # Sub-hour precision: small indexed range scan on the raw table
+            stats[label] = await _window_stats_from_logs(cutoff_time)
+        else:
+            stats[label] = await _window_stats_from_rollups(cutoff_time)
     
     try:
         await redis_client.setex(cache_key, 60, json.dumps(stats))
@@ -107,60 +172,302 @@ async def get_stats():
     return stats
 
 # --- 2. LOGS VIEWER ---
+# Timestamps are stored as naive UTC; tagging them in SQL saves a per-row fixup in Python
+LOG_SELECT = """
+    SELECT id, timestamp AT TIME ZONE 'UTC' AS timestamp, client_id, ip_address,
+    input_icao, resolved_icao, plane_profile, duration_seconds, status, error_message,
+    model_used, tokens_used, weather_icao,
+    expiration_timestamp AT TIME ZONE 'UTC' AS expiration_timestamp,
+    duration_wx, duration_notams, duration_ai, duration_alt
+    FROM logs
+"""
+
+LOG_EXPORT_FIELDS = [
+    "id", "timestamp", "client_id", "ip_address", "input_icao", "resolved_icao",
+    "plane_profile", "duration_seconds", "status", "error_message", "model_used",
+    "tokens_used", "weather_icao", "expiration_timestamp",
+    "duration_wx", "duration_notams", "duration_ai", "duration_alt"
+]
+
+def _log_filters(status=None, icao=None, client_id=None, since=None, until=None, cursor=None):
+    """
+    Builds the WHERE clause shared by the viewer and the export.
+    Everything is keyed on `timestamp` so Postgres only visits the daily
+    partitions in range; equality filters pair with it in composite indexes.
+    """
+    clauses = []
+    values = {}
+    if status:
+        clauses.append("status = :status")
+        values["status"] = status.upper()
+    if icao:
+        clauses.append("input_icao = :icao")
+        values["icao"] = icao.upper().strip()
+    if client_id:
+        clauses.append("client_id = :client_id")
+        values["client_id"] = client_id
+    if since:
+        clauses.append("timestamp >= :since")
+        values["since"] = _naive_utc(since)
+    if until:
+        clauses.append("timestamp < :until")
+        values["until"] = _naive_utc(until)
+    if cursor:
+        # Opaque base64url("<iso timestamp>|<id>") from X-Next-Cursor
+        try:
+            ts_str, id_str = _decode_cursor(cursor).rsplit("|", 1)
+            values["cursor_ts"] = _naive_utc(datetime.datetime.fromisoformat(ts_str))
+            values["cursor_id"] = int(id_str)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor.")
+        clauses.append("(timestamp, id) < (:cursor_ts, :cursor_id)")
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    return where, values
+
+def _encode_cursor(row):
+    # base64url keeps the "+00:00" offset intact when the cursor is pasted into a query string
+    raw = f"{row['timestamp'].isoformat()}|{row['id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def _decode_cursor(cursor):
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return base64.urlsafe_b64decode(padded.encode()).decode()
+
+def _naive_utc(dt):
+    if dt.tzinfo is not None:
+        return dt.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return dt
+
 @router.get("/logs")
-async def get_logs(limit: int = 100):
-    query = "SELECT * FROM logs ORDER BY id DESC LIMIT :limit"
-    rows = await database.fetch_all(query=query, values={"limit": limit})
+async def get_logs(
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    icao: Optional[str] = None,
+    client_id: Optional[str] = None,
+    since: Optional[datetime.datetime] = None,
+    until: Optional[datetime.datetime] = None
+):
+    """
+    Newest-first log page. Pass the returned X-Next-Cursor as `cursor`
+    to fetch the next (older) page.
+    """
+    where, values = _log_filters(status, icao, client_id, since, until, cursor)
+    values["limit"] = limit
+    query = f"{LOG_SELECT} {where} ORDER BY logs.timestamp DESC, id DESC LIMIT :limit"
+    rows = await database.fetch_all(query=query, values=values)
     
-    results = []
-    for row in rows:
-        r = dict(row)
-        # Fix Timestamp (Log Time)
-        if r['timestamp'] and r['timestamp'].tzinfo is None:
-            r['timestamp'] = r['timestamp'].replace(tzinfo=datetime.timezone.utc)
-            
-        # Fix Expiration Timestamp (Cache Time)
-        if r.get('expiration_timestamp') and r['expiration_timestamp'].tzinfo is None:
-            r['expiration_timestamp'] = r['expiration_timestamp'].replace(tzinfo=datetime.timezone.utc)
-            
-        results.append(r)
+    headers = {}
+    if len(rows) == limit and rows[-1]['timestamp']:
+        headers["X-Next-Cursor"] = _encode_cursor(rows[-1])
         
-    return results
+    return FastJSONResponse([dict(row) for row in rows], headers=headers)
+
+@router.get("/logs/export")
+async def export_logs(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    status: Optional[str] = None,
+    icao: Optional[str] = None,
+    client_id: Optional[str] = None,
+    since: Optional[datetime.datetime] = None,
+    until: Optional[datetime.datetime] = None
+):
+    """
+    Streams every matching row through a server-side cursor, so memory
+    stays flat regardless of the size of the result.
+    """
+    where, values = _log_filters(status, icao, client_id, since, until)
+    query = f"{LOG_SELECT} {where} ORDER BY logs.timestamp DESC, id DESC"
+
+    def encode(value):
+        return value.isoformat() if isinstance(value, datetime.datetime) else value
+
+    async def ndjson_rows():
+        async for row in database.iterate(query=query, values=values):
+            yield json.dumps({k: encode(row[k]) for k in LOG_EXPORT_FIELDS}) + "\n"
+
+    async def csv_rows():
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(LOG_EXPORT_FIELDS)
+        # Header goes out on its own, so an empty result is still a valid CSV
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate(0)
+        async for row in database.iterate(query=query, values=values):
+            writer.writerow([encode(row[k]) for k in LOG_EXPORT_FIELDS])
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate(0)
+
+    stamp = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%d-%H%M%S")
+    if format == "csv":
+        return StreamingResponse(
+            csv_rows(), media_type="text/csv",
+            headers={"Content-Disposition": f'attachment; filename="logs-{stamp}.csv"'}
+        )
+    return StreamingResponse(
+        ndjson_rows(), media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="logs-{stamp}.ndjson"'}
+    )
+
+@router.get("/logs/stream")
+async def stream_logs(
+    request: Request,
+    last_id: Optional[str] = None,
+    last_event_id: Optional[str] = Header(None)
+):
+    """
+    Server-Sent Events tail of new log rows, fed from the Redis stream
+    written by the log pipeline (no Postgres polling).
+    Resumes after `Last-Event-ID` (or `?last_id=`) when given.
+    """
+    cursor = last_event_id or last_id
+    if not cursor:
+        # Start from the newest entry so nothing slips in between reads
+        newest = await redis_client.xrevrange(LOG_STREAM_KEY, count=1)
+        cursor = newest[0][0] if newest else "0-0"
+
+    async def events():
+        nonlocal cursor
+        yield "retry: 3000\n\n"
+        while not await request.is_disconnected():
+            try:
+                entries = await redis_client.xread({LOG_STREAM_KEY: cursor}, block=15000, count=100)
+            except Exception as e:
+                yield f"event: error\ndata: {json.dumps(str(e))}\n\n"
+                await asyncio.sleep(3)
+                continue
+
+            if not entries:
+                yield ": keepalive\n\n"
+                continue
+
+            for _, messages in entries:
+                for entry_id, fields in messages:
+                    cursor = entry_id
+                    yield f"id: {entry_id}\nevent: log\ndata: {fields['data']}\n\n"
+
+    return StreamingResponse(
+        events(), media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/logs/pipeline")
+async def get_log_pipeline_stats():
+    # Per-worker counters for the batched log writer
+    return log_pipeline.stats()
+
+@router.get("/resolver")
+async def get_resolver_stats():
+    # Per-worker identifier resolution cache counters
+    return resolver.stats()
+
+@router.get("/airspace")
+async def get_airspace_zones():
+    # Every indexed zone with its airport counts (precomputed table)
+    zones = []
+    for zone in airspace.zones.values():
+        hits = airspace_table.airports_in(zone.id)
+        inside = sum(1 for _, is_inside, _ in hits if is_inside)
+        zones.append({
+            "id": zone.id, "name": zone.name, "type": zone.type,
+            "altitudes": zone.altitudes(),
+            "airports_inside": inside, "airports_nearby": len(hits) - inside
+        })
+    return {
+        "zones": sorted(zones, key=lambda z: z["name"]),
+        "table": {"digest": airspace_table.digest, "source": airspace_table.source, "current": airspace_table.is_current(airspace)}
+    }
+
+@router.get("/airspace/{zone_id}")
+async def get_airports_in_zone(zone_id: str):
+    # Airports inside (then within the advisory buffer of) one zone
+    zone = airspace.zones.get(zone_id)
+    if not zone:
+        raise HTTPException(status_code=404, detail="Unknown zone")
+    airports = []
+    for code, inside, dist in airspace_table.airports_in(zone_id):
+        data = airports_icao.get(code) or airports_lid.get(code) or {}
+        airports.append({"code": code, "name": data.get("name", code), "inside": inside, "distance_nm": dist})
+    return {"zone": {"id": zone.id, "name": zone.name, "type": zone.type, "altitudes": zone.altitudes()}, "airports": airports}
 
 # --- 3. CLIENT MANAGEMENT & UNBLOCKING ---
+CLIENT_SORT_COLUMNS = {
+    "total": "total",
+    "last_seen": "last_seen",
+    "blocked": "blocked_count",
+    "client_id": "client_id",
+}
+
 @router.get("/clients")
-async def get_client_stats():
+async def get_client_stats(
+    response: Response,
+    limit: int = Query(500, ge=1, le=5000),
+    offset: int = Query(0, ge=0),
+    sort: str = "total",
+    order: str = "desc",
+    search: Optional[str] = None,
+    days: int = Query(30, ge=1, le=90)
+):
+    sort_col = CLIENT_SORT_COLUMNS.get(sort)
+    if not sort_col:
+        raise HTTPException(status_code=400, detail=f"Invalid sort. Use one of: {', '.join(CLIENT_SORT_COLUMNS)}")
+    direction = "ASC" if order.lower() == "asc" else "DESC"
+
     limit_count_val = await settings.get("rate_limit_calls", 5)
     limit_count = int(limit_count_val)
     
     period_val = await settings.get("rate_limit_period", 300)
     period_seconds = int(period_val)
     
-    query = """
-        SELECT client_id, MAX(ip_address) as last_ip, COUNT(*) as total, MAX(timestamp) as last_seen,
-        SUM(CASE WHEN status = 'RATE_LIMIT' THEN 1 ELSE 0 END) as blocked_count
-        FROM logs GROUP BY client_id ORDER BY total DESC
+    # Clients seen in the last `days` only: the time bound prunes the daily log partitions
+    now_naive = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+    where = "WHERE timestamp >= :since"
+    values = {"limit": limit, "offset": offset, "since": now_naive - datetime.timedelta(days=days)}
+    if search:
+        where += " AND (client_id ILIKE :search OR ip_address ILIKE :search)"
+        values["search"] = f"%{search}%"
+
+    # One grouped pass; COUNT(*) OVER () gives the population size for paging.
+    # last_ip is the IP of the client's latest request (what the limiter keys on now)
+    query = f"""
+        SELECT client_id, (array_agg(ip_address ORDER BY timestamp DESC))[1] as last_ip,
+        COUNT(*) as total, MAX(timestamp) as last_seen,
+        SUM(CASE WHEN status = 'RATE_LIMIT' THEN 1 ELSE 0 END) as blocked_count,
+        COUNT(*) OVER () as total_clients
+        FROM logs {where} GROUP BY client_id
+        ORDER BY {sort_col} {direction}, client_id
+        LIMIT :limit OFFSET :offset
     """
-    rows = await database.fetch_all(query)
+    rows = await database.fetch_all(query, values=values)
+    response.headers["X-Total-Count"] = str(rows[0]['total_clients'] if rows else 0)
+
+    # Live limiter state straight from the RateLimiter ZSETs (one pipelined round trip)
+    window_counts = [0] * len(rows)
+    if rows and limit_count > 0:
+        try:
+            # Same clock as the limiter's ZSET scores (Redis TIME, ms)
+            seconds, micros = await redis_client.time()
+            window_start = seconds * 1000 + micros // 1000 - period_seconds * 1000
+            async with redis_client.pipeline(transaction=False) as pipe:
+                for r in rows:
+                    pipe.zcount(f"rate_limit:{r['last_ip']}", window_start, "+inf")
+                results = await pipe.execute(raise_on_error=False)
+            window_counts = [c if isinstance(c, int) else 0 for c in results]
+        except Exception:
+            pass
     
     data = []
-    for r in rows:
+    for r, current_window_count in zip(rows, window_counts):
         c_id = r['client_id']
-        q_window = """
-            SELECT COUNT(*) FROM logs 
-            WHERE client_id = :cid 
-            AND timestamp > (NOW() - :seconds * INTERVAL '1 second')
-            AND status NOT IN ('CACHE_HIT', 'RATE_LIMIT')
-        """
-        current_window_count = await database.fetch_val(q_window, values={"cid": c_id, "seconds": period_seconds})
-        
         data.append({
             "client_id": c_id,
             "last_ip": r['last_ip'],
             "total": r['total'],
             "last_seen": r['last_seen'],
             "blocked_count": r['blocked_count'],
-            "is_limited": current_window_count >= limit_count,
+            "is_limited": limit_count > 0 and current_window_count >= limit_count,
             "limit_key": c_id
         })
     return data
@@ -176,7 +483,7 @@ async def unblock_client(data: UnblockRequest):
 
     # 2. Smart Redis Unblock
     keys_to_check = [f"rate_limit:{data.key}"]
-    ip_query = "SELECT ip_address FROM logs WHERE client_id = :key ORDER BY id DESC LIMIT 1"
+    ip_query = "SELECT ip_address FROM logs WHERE client_id = :key ORDER BY timestamp DESC LIMIT 1"
     ip_row = await database.fetch_one(ip_query, values={"key": data.key})
     
     if ip_row and ip_row['ip_address']:
@@ -191,28 +498,40 @@ async def unblock_client(data: UnblockRequest):
 
 # --- 4. CACHE MANAGEMENT ---
 @router.get("/cache")
-async def get_cache_entries():
-    query = "SELECT key, icao, category, timestamp, data FROM flight_cache ORDER BY timestamp DESC"
-    rows = await database.fetch_all(query)
+async def get_cache_entries(
+    limit: int = Query(500, ge=1, le=5000),
+    offset: int = Query(0, ge=0),
+    icao: Optional[str] = None
+):
+    # Metadata columns only; the stored report body is never read here
+    where = ""
+    values = {"limit": limit, "offset": offset}
+    if icao:
+        where = "WHERE icao = :icao"
+        values["icao"] = icao.upper().strip()
+
+    query = f"""
+        SELECT key, icao, category, timestamp AT TIME ZONE 'UTC' AS timestamp,
+        weather_source, valid_until,
+        COUNT(*) OVER () AS total_entries
+        FROM flight_cache {where}
+        ORDER BY timestamp DESC, key
+        LIMIT :limit OFFSET :offset
+    """
+    rows = await database.fetch_all(query, values=values)
+    headers = {"X-Total-Count": str(rows[0]['total_entries'] if rows else 0)}
     
     results = []
     for row in rows:
-        data_blob = json.loads(row['data'])
-        
-        # We explicitly set the timezone to UTC so the frontend converts it correctly.
-        stored_time = row['timestamp']
-        if stored_time and stored_time.tzinfo is None:
-            stored_time = stored_time.replace(tzinfo=datetime.timezone.utc)
-
         results.append({
             "key": row['key'],
             "icao": row['icao'],
             "category": row['category'],
-            "weather_source": data_blob.get('raw_data', {}).get('weather_source'),
-            "timestamp": stored_time, # <--- Used to be just row['timestamp']
-            "expires_at": datetime.datetime.fromtimestamp(data_blob.get('valid_until'), datetime.timezone.utc) if data_blob.get('valid_until') else None
+            "weather_source": row['weather_source'],
+            "timestamp": row['timestamp'],
+            "expires_at": datetime.datetime.fromtimestamp(row['valid_until'], datetime.timezone.utc) if row['valid_until'] else None
         })
-    return results
+    return FastJSONResponse(results, headers=headers)
 
 class CacheClearRequest(BaseModel):
     key: Optional[str] = None # If None, clear all
@@ -228,6 +547,11 @@ async def clear_cache(data: CacheClearRequest):
         await database.execute(query)
         return {"status": "success", "message": "Global cache flush successful."}
 
+@router.get("/cache/ai")
+async def get_ai_cache_stats():
+    # Model-output reuse across report expiries (app.core.ai_cache)
+    return await ai_cache.stats()
+
 # --- 5. SETTINGS & PROBES ---
 @router.get("/settings")
 async def get_all_settings():
@@ -243,6 +567,11 @@ async def get_all_settings():
         "usage": {"total_tokens": usage['t'] or 0, "ai_calls": usage['c'] or 0}
     }
 
+@router.get("/scheduler")
+async def get_scheduler_status():
+    # Current leader plus recent run history for each periodic job
+    return await scheduler.status()
+
 class SettingUpdate(BaseModel):
     key: str
     value: str
@@ -266,8 +595,12 @@ class TestNotification(BaseModel):
     channel: str
 
 @router.post("/test-notification")
-async def test_notification(data: TestNotification, background_tasks: BackgroundTasks):
-    if data.channel == 'smtp': background_tasks.add_task(notifier._send_email, "Test", "Test Alert")
-    elif data.channel == 'discord': background_tasks.add_task(notifier._send_discord, "Test", "Test Alert")
-    elif data.channel == 'slack': background_tasks.add_task(notifier._send_slack, "Test", "Test Alert")
-    return {"status": "queued"}
\ No newline at end of file
+async def test_notification(data: TestNotification):
+    # Delivered inline (not via the outbox) so the admin sees the outcome
+    configured = {"smtp": notifier.smtp_host, "discord": notifier.discord_url, "slack": notifier.slack_url}
+    if not configured.get(data.channel):
+        raise HTTPException(status_code=400, detail=f"Channel '{data.channel}' is not configured.")
+    failed = await notifier.deliver("test", "Test", "Test Alert", channels=[data.channel])
+    if failed:
+        raise HTTPException(status_code=502, detail=f"Test via {data.channel} failed (see server log).")
+    return {"status": "sent"}
\ No newline at end of file
@@ -1,9 +1,7 @@
 import time
 import datetime
 import asyncio
-import re
 import logging
-import difflib
 from typing import Optional
 from fastapi import APIRouter, Request, HTTPException, BackgroundTasks
 from pydantic import BaseModel
@@ -11,13 +9,17 @@ from pydantic import BaseModel
 from app.core.weather import get_metar_taf, get_bulk_weather_data
 from app.core.notams import get_notams
 from app.core.ai import analyze_risk
-from app.core.geography import get_nearest_reporting_stations, check_airspace_zones, airports_icao, airports_lid, get_coords_from_awc, calculate_distance
+from app.core.geography import get_nearest_reporting_stations, check_airspace_zones, airports_icao, airports_lid, calculate_distance
+from app.core.resolver import resolver, AirportNotFound
 from app.core.rate_limit import RateLimiter
 from app.core.logger import log_attempt
-from app.core.cache import get_cached_report, save_cached_report
+from app.core.cache import get_cached_report, save_cached_report, copy_cached_report
+from app.core.stations import get_best_reporting_stations
+from app.core.freshness import observation_fingerprint, report_ttl
 from app.core.settings import settings
-from app.core.notifications import notifier
+from app.core.alerts import alert_aggregator
 from app.core.db import database
+from app.core.responses import FastJSONResponse, cached_report_response
 
 router = APIRouter()
 limiter = RateLimiter()
@@ -28,30 +30,52 @@ class AnalysisRequest(BaseModel):
     force: bool = False
     weather_override: Optional[str] = None
 
-def parse_metar_time(metar_str):
-    if not metar_str: return None
-    match = re.search(r'\b(\d{2})(\d{2})(\d{2})Z\b', metar_str)
-    if not match: return None
-    
-    day, hour, minute = map(int, match.groups())
-    now = datetime.datetime.now(datetime.timezone.utc)
-    
-    try:
-        dt = now.replace(day=day, hour=hour, minute=minute, second=0, microsecond=0)
-    except ValueError:
-        first_of_month = now.replace(day=1)
-        last_month = first_of_month - datetime.timedelta(days=1)
-        try:
-            dt = last_month.replace(day=day, hour=hour, minute=minute, second=0, microsecond=0)
-        except ValueError:
-            return None
-
-    if dt > now + datetime.timedelta(days=15):
-        if dt.month == 1:
-            dt = dt.replace(year=dt.year - 1, month=12)
-        else:
-            dt = dt.replace(month=dt.month - 1)
-    return dt
+def airport_context(input_icao, remote_data=None):
+    """(lat, lon, name, tz, resolved_icao) from the catalog, else from the resolver's AWC lookup."""
+    # Try Local DB (ICAO or LID)
+    local_data = airports_icao.get(input_icao) or airports_lid.get(input_icao)
+    if local_data:
+        return float(local_data['lat']), float(local_data['lon']), local_data['name'], local_data.get('tz', 'UTC'), local_data.get('icao', input_icao)
+    # Try Remote (Re-use data from Sanity Check if available)
+    if remote_data:
+        return remote_data['lat'], remote_data['lon'], remote_data.get('name', input_icao), 'UTC', input_icao
+    return None, None, input_icao, 'UTC', input_icao
+
+def select_reporting_station(candidates, bulk_data):
+    """
+    Strategy: the first candidate (best-first) with a TAF.
+    If none found, fallback to the closest station with a METAR.
+    Returns (station, dist, data, name) or None.
+    """
+    fallback = None
+    for station, dist in candidates:
+        # Use local bulk data instead of making a network call
+        data = bulk_data.get(station)
+        
+        if data and data.get('metar'):
+            # Check for Valid TAF (Not empty, not the error string)
+            raw_taf = data.get('taf', "")
+            has_taf = raw_taf and "No TAF available" not in raw_taf
+            
+            # Resolve Name
+            st_data = airports_icao.get(station)
+            st_name = st_data.get('name', station) if st_data else station
+            
+            if has_taf:
+                # Winner! Found a prioritized station with a TAF.
+                return station, dist, data, st_name
+            
+            # If this is the first station with at least a METAR, save it as fallback
+            if not fallback:
+                fallback = (station, dist, data, st_name)
+    return fallback
+
+async def store_report(input_icao, plane_size, response_data, weather_data, weather_override=None):
+    """Caches a fresh report; it lives until the station issues a new METAR/SPECI or TAF, or briefly if its METAR is stale (see app.core.freshness). Returns the TTL."""
+    fingerprint = observation_fingerprint(weather_data)
+    ttl = report_ttl(weather_data)
+    await save_cached_report(input_icao, plane_size, response_data, ttl_seconds=ttl, weather_source=weather_override, fingerprint=fingerprint)
+    return ttl
 
 @router.post("/analyze")
 async def analyze_flight(request: AnalysisRequest, raw_request: Request, background_tasks: BackgroundTasks):
@@ -67,97 +91,19 @@ async def analyze_flight(request: AnalysisRequest, raw_request: Request, backgro
     
     raw_input = request.icao.upper().strip()
     
-    # 1. Try exact match
-    if raw_input in airports_icao:
-        input_icao = raw_input
-    # 2. Try LID match
-    elif raw_input in airports_lid:
-        lid_data = airports_lid[raw_input]
-        input_icao = lid_data.get('icao') or raw_input
-    # 3. Lazy US Pilot Logic
-    elif len(raw_input) == 3 and ("K" + raw_input) in airports_icao:
-        input_icao = "K" + raw_input
-    else:
-        # Final Sanity Check: If not in local DB, check the FAA remote records
-        # This prevents "Fake" airports from hitting the AI and consuming tokens.
-        remote_data = await get_coords_from_awc(raw_input)
-        
-        if not remote_data:
-            suggestions = []
-            raw_upper = raw_input.upper()
-
-            # --- 1. GATHER KEYS ---
-            # Merge ICAO and LID keys for searching
-            all_keys = list(airports_icao.keys()) + list(airports_lid.keys())
-
-            # --- 2. FUZZY CODE MATCHING (Handles "KFFAA" -> "KFFA" & "FFAA" -> "KFFA") ---
-            # Only run fuzzy match if input is code-like (short, no spaces)
-            if len(raw_upper) <= 7 and " " not in raw_upper:
-                # cutoff=0.6 allows for 1-2 character differences/typos
-                close_matches = difflib.get_close_matches(raw_upper, all_keys, n=3, cutoff=0.6)
-                for m in close_matches:
-                    data = airports_icao.get(m) or airports_lid.get(m)
-                    if data: suggestions.append({"icao": m, "name": data['name']})
-
-            # --- 3. CONFUSABLES (Handles 1 vs I vs L, 0 vs O) ---
-            # Explicitly check for common visual swaps
-            def get_variants(s):
-                vars = set()
-                # 1 <-> I <-> L
-                if '1' in s: vars.add(s.replace('1', 'I')); vars.add(s.replace('1', 'L'))
-                if 'I' in s: vars.add(s.replace('I', '1'))
-                if 'L' in s: vars.add(s.replace('L', '1'))
-                # 0 <-> O
-                if '0' in s: vars.add(s.replace('0', 'O'))
-                if 'O' in s: vars.add(s.replace('O', '0'))
-                return vars
-
-            for v in get_variants(raw_upper):
-                if v == raw_upper: continue
-                if v in airports_icao:
-                    suggestions.append({"icao": v, "name": airports_icao[v]['name']})
-                elif v in airports_lid:
-                    suggestions.append({"icao": v, "name": airports_lid[v]['name']})
-
-            # --- 4. NAME SEARCH (STRICTER) ---
-            # Fixes "CIA" matching "Social Circle" (1OL2)
-            # Only scan names if we don't have enough suggestions yet
-            if len(suggestions) < 5:
-                count = 0
-                for code, data in airports_icao.items():
-                    if count >= 5: break
-                    name_up = data['name'].upper()
-                    
-                    # LOGIC:
-                    # If input is short (<=3), MUST start with input (e.g. "CIA" -> "CIA Field")
-                    # If input is long (>3), can be contained in (e.g. "KENNEDY" -> "John F Kennedy")
-                    is_match = False
-                    if len(raw_upper) <= 3:
-                        if name_up.startswith(raw_upper): is_match = True
-                    else:
-                        if raw_upper in name_up: is_match = True
-                    
-                    if is_match:
-                        suggestions.append({"icao": code, "name": data['name']})
-                        count += 1
-
-            # --- DEDUPLICATE & FORMAT ---
-            seen = set()
-            final_suggestions = []
-            for s in suggestions:
-                if s['icao'] not in seen:
-                    final_suggestions.append(s)
-                    seen.add(s['icao'])
-
-            # Raise 404 with structured detail
-            raise HTTPException(
-                status_code=404, 
-                detail={
-                    "message": f"Airport '{raw_input}' not found.",
-                    "suggestions": final_suggestions[:5]
-                }
-            )
-        input_icao = raw_input
+    # Catalog (ICAO / LID / K+LID), then AWC; unknown codes are negatively cached.
+    # This prevents "Fake" airports from hitting the AI and consuming tokens.
+    try:
+        input_icao, remote_data = await resolver.resolve(raw_input)
+    except AirportNotFound as e:
+        # Raise 404 with structured detail
+        raise HTTPException(
+            status_code=404, 
+            detail={
+                "message": f"Airport '{raw_input}' not found.",
+                "suggestions": e.suggestions
+            }
+        )
     
     resolved_icao = input_icao
     status = "FAIL" 
@@ -184,11 +130,8 @@ async def analyze_flight(request: AnalysisRequest, raw_request: Request, backgro
             duration = time.time() - t_start
             status = "CACHE_HIT" 
             
-            raw_data = cached_result.get('raw_data', {})
-            weather_icao = raw_data.get('weather_source', resolved_icao)
-            
-            if 'valid_until' in cached_result:
-                expiration_dt = datetime.datetime.fromtimestamp(cached_result['valid_until'], datetime.timezone.utc)
+            weather_icao = cached_result['weather_source'] or resolved_icao
+            expiration_dt = datetime.datetime.fromtimestamp(cached_result['valid_until'], datetime.timezone.utc)
             
             output_for_log = resolved_icao
             if resolved_icao == ("K" + raw_input) and any(char.isdigit() for char in raw_input):
@@ -196,8 +139,8 @@ async def analyze_flight(request: AnalysisRequest, raw_request: Request, backgro
 
             await log_attempt(client_id, client_ip, raw_input, output_for_log, request.plane_size, duration, "CACHE_HIT", weather_icao=weather_icao, expiration=expiration_dt)
             
-            cached_result['is_cached'] = True
-            return cached_result
+            # Stored with is_cached already set: bytes go out untouched
+            return cached_report_response(raw_request, cached_result)
 
         # 2. RATE LIMIT CHECK
         # LOGIC UPDATE: Exempt authorized Kiosks from rate limits during forced refreshes
@@ -205,7 +148,8 @@ async def analyze_flight(request: AnalysisRequest, raw_request: Request, backgro
         if request.force:
              # Check if this ICAO is in our "Paid/Authorized" Kiosk table
              # UPDATED: Checks new 'kiosk_profiles' table using target_icao
-             kiosk_check = "SELECT 1 FROM kiosk_profiles WHERE target_icao = :icao AND is_active = 1"
+             # Boards are charged through /api/analyze/batch, never exempt here
+             kiosk_check = "SELECT 1 FROM kiosk_profiles WHERE target_icao = :icao AND is_active = 1 AND profile_type = 'single'"
              is_kiosk = await database.fetch_val(kiosk_check, values={"icao": resolved_icao})
              if is_kiosk:
                  is_exempt = True
@@ -215,22 +159,7 @@ async def analyze_flight(request: AnalysisRequest, raw_request: Request, backgro
 
         # 3. FETCH DATA
         # Unified Coordinate Resolution
-        target_lat, target_lon = None, None
-        airport_name = input_icao
-        airport_tz = 'UTC'
-
-        # Try Local DB (ICAO or LID)
-        local_data = airports_icao.get(input_icao) or airports_lid.get(input_icao)
-        if local_data:
-            target_lat, target_lon = float(local_data['lat']), float(local_data['lon'])
-            airport_name = local_data['name']
-            airport_tz = local_data.get('tz', 'UTC')
-            resolved_icao = local_data.get('icao', input_icao)
-        else:
-            # Try Remote (Re-use data from Sanity Check if available)
-            if 'remote_data' in locals() and remote_data:
-                 target_lat, target_lon = remote_data['lat'], remote_data['lon']
-                 airport_name = remote_data.get('name', input_icao)
+        target_lat, target_lon, airport_name, airport_tz, resolved_icao = airport_context(input_icao, remote_data)
 
         airspace_warnings = []
         if target_lat is not None and target_lon is not None:
@@ -274,54 +203,19 @@ async def analyze_flight(request: AnalysisRequest, raw_request: Request, backgro
         # Weather Fallback Logic
         if not weather_data:
             t0_alt = time.time()
-            candidates = await get_nearest_reporting_stations(input_icao)
+            # Precomputed best-first list (TAF stations first); live search only for unknown airports
+            candidates = await get_best_reporting_stations(input_icao)
+            if candidates is None:
+                candidates = await get_nearest_reporting_stations(input_icao)
             
             # --- BULK FETCH OPTIMIZATION ---
             # Instead of checking one-by-one (slow), fetch all candidates at once.
             candidate_codes = [c[0] for c in candidates]
             bulk_data = await get_bulk_weather_data(candidate_codes)
-            
-            # Strategy: Iterate to find a station with a TAF. 
-            # If none found, fallback to the closest station with a METAR.
-            fallback_data = None
-            fallback_station = None
-            fallback_dist = 0
-            fallback_name = None
-
-            for station, dist in candidates:
-                # Use local bulk data instead of making a network call
-                data = bulk_data.get(station)
-                
-                if data and data.get('metar'):
-                    # Check for Valid TAF (Not empty, not the error string)
-                    raw_taf = data.get('taf', "")
-                    has_taf = raw_taf and "No TAF available" not in raw_taf
-                    
-                    # Resolve Name
-                    st_data = airports_icao.get(station)
-                    st_name = st_data.get('name', station) if st_data else station
-                    
-                    if has_taf:
-                        # Winner! Found a prioritized station with a TAF.
-                        weather_icao = station
-                        weather_dist = dist
-                        weather_data = data
-                        weather_name = st_name
-                        break
-                    
-                    # If this is the first station with at least a METAR, save it as fallback
-                    if not fallback_data:
-                        fallback_data = data
-                        fallback_station = station
-                        fallback_dist = dist
-                        fallback_name = st_name
-
-            # If loop finishes without a TAF-station, use the fallback (closest with METAR)
-            if not weather_data and fallback_data:
-                weather_icao = fallback_station
-                weather_dist = fallback_dist
-                weather_data = fallback_data
-                weather_name = fallback_name
+
+            picked = select_reporting_station(candidates, bulk_data)
+            if picked:
+                weather_icao, weather_dist, weather_data, weather_name = picked
             
             t_alt = time.time() - t0_alt
         
@@ -337,7 +231,8 @@ async def analyze_flight(request: AnalysisRequest, raw_request: Request, backgro
                 # 1. Backfill the "Auto" key (if this request was Auto)
                 if not request.weather_override:
                      # Save to the "Default" key
-                     await save_cached_report(input_icao, request.plane_size, mid_stream_cache, ttl_seconds=300, weather_source=None)
+                     remaining = int(mid_stream_cache['valid_until'] - time.time())
+                     await copy_cached_report(mid_stream_cache, input_icao, request.plane_size, ttl_seconds=remaining, weather_source=None)
 
                 # 2. Log & Return
                 duration = time.time() - t_start
@@ -347,9 +242,7 @@ async def analyze_flight(request: AnalysisRequest, raw_request: Request, backgro
                     output_for_log = raw_input
 
                 # Extract Expiration if present
-                ms_exp_dt = None
-                if 'valid_until' in mid_stream_cache:
-                     ms_exp_dt = datetime.datetime.fromtimestamp(mid_stream_cache['valid_until'], datetime.timezone.utc)
+                ms_exp_dt = datetime.datetime.fromtimestamp(mid_stream_cache['valid_until'], datetime.timezone.utc)
 
                 # IMPORTANT: Update status so 'finally' block knows we succeeded
                 status = "CACHE_HIT_LINK"
@@ -361,8 +254,7 @@ async def analyze_flight(request: AnalysisRequest, raw_request: Request, backgro
                     t_wx=t_wx_fetch, t_notams=t_notams, t_ai=0, t_alt=t_alt # Pass timings!
                 )
                 
-                mid_stream_cache['is_cached'] = True
-                return mid_stream_cache
+                return cached_report_response(raw_request, mid_stream_cache)
 
         t0 = time.time()
         
@@ -402,39 +294,18 @@ async def analyze_flight(request: AnalysisRequest, raw_request: Request, backgro
 
         # --- CACHING ---
         now = datetime.datetime.now(datetime.timezone.utc)
-        current_minute = now.minute
-        should_cache = True
-        ttl = 300 
-        
-        if current_minute < 50:
-            minutes_until_update = 50 - current_minute
-            ttl = minutes_until_update * 60
-        else:
-            metar_dt = parse_metar_time(weather_data['metar'])
-            if metar_dt:
-                is_fresh = (metar_dt.hour == now.hour) or \
-                           (metar_dt > now - datetime.timedelta(minutes=15))
-                if is_fresh:
-                    ttl = 60 * 60
-                else:
-                    should_cache = False
-            else:
-                should_cache = False
-
-        if should_cache:
-            cache_override = request.weather_override if request.weather_override else None
-            await save_cached_report(input_icao, request.plane_size, response_data, ttl_seconds=ttl, weather_source=cache_override)
-            expiration_dt = now + datetime.timedelta(seconds=ttl)
+        cache_override = request.weather_override if request.weather_override else None
+        ttl = await store_report(input_icao, request.plane_size, response_data, weather_data, cache_override)
+        expiration_dt = now + datetime.timedelta(seconds=ttl)
         
         status = "SUCCESS"
-        return response_data
+        return FastJSONResponse(response_data)
 
     except HTTPException as e:
         if e.status_code == 429:
             status = "RATE_LIMIT"
-            try:
-                await notifier.send_alert("rate_limit", f"Rate Limit: {input_icao}", f"User {client_id}")
-            except: pass
+            # Counted, not sent: one summary per window (no I/O on the rejected path)
+            alert_aggregator.record("rate_limit", client_id, f"Rate Limit: {input_icao} from {client_ip}")
         else:
             status = "ERROR"
         error_msg = e.detail
@@ -443,7 +314,7 @@ async def analyze_flight(request: AnalysisRequest, raw_request: Request, backgro
     except Exception as e:
         status = "ERROR"
         error_msg = str(e)
-        background_tasks.add_task(notifier.send_alert, "error", "System Error", str(e))
+        alert_aggregator.record("error", f"{type(e).__name__}: {e}", f"{input_icao} ({client_id})")
         raise e
         
     finally:
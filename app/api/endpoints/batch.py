@@ -0,0 +1,260 @@
+import json
+import time
+import asyncio
+import logging
+from typing import List, Optional
+from fastapi import APIRouter, Request, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from app.core.weather import get_bulk_weather_data
+from app.core.notams import get_notams
+from app.core.ai import analyze_risk
+from app.core.geography import get_nearest_reporting_stations, check_airspace_zones
+from app.core.resolver import resolver, AirportNotFound
+from app.core.logger import log_attempt
+from app.core.cache import get_cached_report, decode_cached_report
+from app.core.stations import get_best_reporting_stations
+from app.core.settings import settings
+from app.core.alerts import alert_aggregator
+from app.core.responses import dumps
+from app.core.db import database
+from app.api.endpoints.analysis import limiter, airport_context, select_reporting_station, store_report
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+# --- BATCH ANALYZE (Dispatch boards) ---
+# Streams NDJSON: cached airports go out first, the rest one line each as they finish.
+BATCH_MAX_AIRPORTS = 20
+BATCH_CONCURRENCY = 4         # Airports computed at once (NOTAM search + model call each)
+BATCH_AIRPORT_TIMEOUT = 45    # Seconds per airport once it has a slot
+# A board kiosk's refreshes are charged to the board itself: each of its
+# airports may be recomputed once per window, whoever sends the request
+KIOSK_BOARD_WINDOW = 15 * 60
+
+class BatchRequest(BaseModel):
+    airports: List[str]
+    plane_size: str
+    force: bool = False
+    kiosk: Optional[str] = None  # Board kiosk slug (charged to the board's budget)
+
+async def _kiosk_board(slug, codes):
+    """The board's airport list if `slug` is an active board kiosk listing every requested airport, else None."""
+    row = await database.fetch_one(
+        "SELECT airports FROM kiosk_profiles WHERE slug = :slug AND is_active = 1 AND profile_type = 'board'",
+        values={"slug": slug}
+    )
+    if not row or not row["airports"]:
+        return None
+    airports = json.loads(row["airports"])
+    return airports if set(codes) <= set(airports) else None
+
+async def _build_report(input_icao, remote_data, plane_size, bulk):
+    """One airport's report, as /api/analyze would build it (weather from the batch's bulk fetch)."""
+    timings = {"notams": 0, "alt": 0, "ai": 0}
+    lat, lon, name, tz, resolved_icao = airport_context(input_icao, remote_data)
+
+    airspace_warnings = []
+    if lat is not None and lon is not None:
+        try:
+            airspace_warnings = check_airspace_zones(input_icao, lat, lon)
+        except Exception: pass
+
+    t0 = time.time()
+    notams = await get_notams(input_icao)
+    timings["notams"] = time.time() - t0
+
+    weather_data = bulk.get(input_icao)
+    weather_icao, weather_dist, weather_name = input_icao, 0, name
+    if not (weather_data and weather_data.get('metar')):
+        weather_data, weather_icao, weather_name = None, None, None
+        t0 = time.time()
+        candidates = await get_best_reporting_stations(input_icao)
+        if candidates is None:
+            candidates = await get_nearest_reporting_stations(input_icao)
+        picked = select_reporting_station(candidates, await get_bulk_weather_data([c[0] for c in candidates]))
+        if picked:
+            weather_icao, weather_dist, weather_data, weather_name = picked
+        timings["alt"] = time.time() - t0
+    if not weather_data:
+        weather_data = {"metar": None, "taf": None}
+
+    t0 = time.time()
+    analysis = await analyze_risk(
+        icao_code=resolved_icao,
+        weather_data=weather_data,
+        notams=notams,
+        plane_size=plane_size,
+        reporting_station=weather_icao,
+        reporting_station_name=weather_name,
+        airport_tz=tz,
+        external_airspace_warnings=airspace_warnings,
+        dist=weather_dist,
+        target_icao=resolved_icao
+    )
+    timings["ai"] = time.time() - t0
+    meta = analysis.pop('_meta', {})
+
+    response_data = {
+        "airport_name": name,
+        "airport_tz": tz,
+        "is_cached": False,
+        "analysis": analysis,
+        "raw_data": {
+            "metar": weather_data['metar'],
+            "taf": weather_data['taf'],
+            "notams": notams,
+            "weather_source": weather_icao,
+            "weather_dist": round(weather_dist, 1),
+            "weather_name": weather_name
+        }
+    }
+    await store_report(input_icao, plane_size, response_data, weather_data)
+    return response_data, meta, timings
+
+def _line(obj):
+    return dumps(obj) + b"\n"
+
+@router.post("/analyze/batch")
+async def analyze_batch(request: BatchRequest, raw_request: Request):
+    is_paused = await settings.get("global_pause")
+    if is_paused == "true":
+        msg = await settings.get("global_pause_message", "System is under maintenance.")
+        raise HTTPException(status_code=503, detail=msg)
+
+    t_start = time.time()
+    client_id = raw_request.headers.get("X-Client-ID", "UNKNOWN")
+    client_ip = raw_request.headers.get("X-Forwarded-For", raw_request.client.host).split(',')[0].strip()
+
+    raw_codes = []
+    for code in request.airports:
+        code = code.upper().strip()
+        if code and code not in raw_codes:
+            raw_codes.append(code)
+    if not raw_codes:
+        raise HTTPException(status_code=400, detail="Provide at least one airport.")
+    if len(raw_codes) > BATCH_MAX_AIRPORTS:
+        raise HTTPException(status_code=400, detail=f"A batch covers at most {BATCH_MAX_AIRPORTS} airports.")
+    raw_input = " ".join(raw_codes)
+
+    # --- 1. RESOLVE (An unknown code is reported on its own line, not a failed batch) ---
+    resolved = await asyncio.gather(*(resolver.resolve(code) for code in raw_codes), return_exceptions=True)
+    airports, not_found = [], []
+    for raw, result in zip(raw_codes, resolved):
+        if isinstance(result, AirportNotFound):
+            not_found.append({"type": "error", "icao": raw, "error": f"Airport '{raw}' not found.", "suggestions": result.suggestions})
+        elif isinstance(result, Exception):
+            raise result
+        elif result[0] not in (a[0] for a in airports):
+            airports.append(result)
+    codes = [icao for icao, _ in airports]
+
+    # --- 2. PER-AIRPORT CACHE (Shared with /api/analyze and /api/briefing) ---
+    cached = {}
+    if not request.force:
+        entries = await asyncio.gather(*(get_cached_report(icao, request.plane_size) for icao in codes))
+        cached = {icao: entry for icao, entry in zip(codes, entries) if entry}
+    misses = [(icao, remote) for icao, remote in airports if icao not in cached]
+
+    limited = []
+    if misses:
+        # Every miss is its own model call, so each one is a rate-limit charge.
+        # Misses beyond what the window allows come back as per-airport errors.
+        # The kiosk slug is public: it only moves the charge to the board's own
+        # budget (KIOSK_BOARD_WINDOW), it never lifts the limit.
+        slug = request.kiosk.lower().strip() if request.kiosk else None
+        board = await _kiosk_board(slug, raw_codes) if slug else None
+        try:
+            if board:
+                granted = await limiter.consume(f"rate_limit:kiosk:{slug}", len(board), KIOSK_BOARD_WINDOW, len(misses), raw_request)
+            else:
+                granted = await limiter(raw_request, cost=len(misses))
+        except HTTPException as e:
+            if e.status_code == 429:
+                alert_aggregator.record("rate_limit", client_id, f"Rate Limit: batch {raw_input} from {client_ip}")
+            await log_attempt(client_id, client_ip, raw_input, " ".join(codes), request.plane_size,
+                              time.time() - t_start, "RATE_LIMIT" if e.status_code == 429 else "ERROR", e.detail)
+            raise
+        misses, limited = misses[:granted], misses[granted:]
+
+    async def stream():
+        sem = asyncio.Semaphore(BATCH_CONCURRENCY)
+        tasks = []
+        failed, tokens_used, model_used = [], 0, None
+        t_wx = t_notams = t_alt = t_ai = 0
+
+        async def compute(icao, remote, bulk):
+            async with sem:
+                try:
+                    report, meta, timings = await asyncio.wait_for(
+                        _build_report(icao, remote, request.plane_size, bulk), BATCH_AIRPORT_TIMEOUT
+                    )
+                    return icao, report, meta, timings, None
+                except asyncio.TimeoutError:
+                    return icao, None, {}, {}, f"Timed out after {BATCH_AIRPORT_TIMEOUT}s."
+                except Exception as e:
+                    alert_aggregator.record("error", f"{type(e).__name__}: {e}", f"batch {icao} ({client_id})")
+                    return icao, None, {}, {}, str(e)
+
+        try:
+            yield _line({
+                "type": "batch", "airports": codes, "plane_size": request.plane_size,
+                "cached": len(cached), "pending": len(misses), "rate_limited": len(limited)
+            })
+            for line in not_found:
+                yield _line(line)
+            for icao, _ in limited:
+                yield _line({"type": "error", "icao": icao, "error": "Rate limit exceeded."})
+            for icao in codes:
+                if icao in cached:
+                    yield _line({"type": "report", "icao": icao, "report": decode_cached_report(cached[icao])})
+
+            if misses:
+                # --- 3. ONE BULK WEATHER FETCH, THEN EACH AIRPORT ON ITS OWN ---
+                t0 = time.time()
+                bulk = await get_bulk_weather_data([icao for icao, _ in misses])
+                t_wx = time.time() - t0
+
+                tasks = [asyncio.ensure_future(compute(icao, remote, bulk)) for icao, remote in misses]
+                for done in asyncio.as_completed(tasks):
+                    icao, report, meta, timings, error = await done
+                    if error:
+                        failed.append(icao)
+                        yield _line({"type": "error", "icao": icao, "error": error})
+                        continue
+                    tokens_used += meta.get('tokens', 0)
+                    model_used = meta.get('model') or model_used
+                    t_notams = max(t_notams, timings["notams"])
+                    t_alt = max(t_alt, timings["alt"])
+                    t_ai = max(t_ai, timings["ai"])
+                    yield _line({"type": "report", "icao": icao, "report": report})
+
+            yield _line({
+                "type": "done", "cached": len(cached), "computed": len(misses) - len(failed),
+                "failed": failed + [n["icao"] for n in not_found],
+                "rate_limited": [icao for icao, _ in limited], "duration": round(time.time() - t_start, 2)
+            })
+        finally:
+            # Client went away: stop spending tokens on a board nobody is reading
+            for task in tasks:
+                task.cancel()
+            duration = time.time() - t_start
+            status = "ERROR" if failed else ("SUCCESS" if misses else "CACHE_HIT")
+            error_msg = " | ".join(
+                f"{label}: {' '.join(items)}" for label, items in
+                (("Failed", failed), ("Rate limited", [icao for icao, _ in limited])) if items
+            ) or None
+            logger.info(f"⏱️  BATCH: {len(codes)} airports ({len(cached)} cached) | Total: {duration:.2f}s | Wx: {t_wx:.2f}s | Alt: {t_alt:.2f}s | NOTAMs: {t_notams:.2f}s | AI: {t_ai:.2f}s")
+            await log_attempt(
+                client_id, client_ip, raw_input, " ".join(codes), request.plane_size,
+                duration, status, error_msg, model_used, tokens_used,
+                t_wx=t_wx, t_notams=t_notams, t_ai=t_ai, t_alt=t_alt
+            )
+
+    return StreamingResponse(
+        stream(),
+        media_type="application/x-ndjson",
+        # Let each line through a buffering reverse proxy as soon as it's written
+        headers={"Cache-Control": "no-store", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,244 @@
+import re
+import time
+import asyncio
+import logging
+from typing import List, Optional
+from fastapi import APIRouter, Request, HTTPException
+from pydantic import BaseModel
+
+from app.core.weather import get_bulk_weather_data
+from app.core.notams import get_notams
+from app.core.ai import analyze_briefing
+from app.core.geography import get_nearest_reporting_stations, check_airspace_zones
+from app.core.resolver import resolver, AirportNotFound
+from app.core.logger import log_attempt
+from app.core.cache import get_cached_report, decode_cached_report
+from app.core.stations import get_best_reporting_stations
+from app.core.settings import settings
+from app.core.alerts import alert_aggregator
+from app.core.responses import FastJSONResponse
+from app.api.endpoints.analysis import limiter, airport_context, select_reporting_station, store_report
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+BRIEFING_MAX_STOPS = 6
+# NOTAM search is the slowest upstream: don't hit it with a whole route at once
+NOTAM_CONCURRENCY = 3
+# Route string tokens that aren't airports: DCT and airways (V16, J75, T212, Q480)
+ROUTE_SKIP = re.compile(r"^(DCT|[VJTQ]\d+)$")
+
+class BriefingRequest(BaseModel):
+    airports: Optional[List[str]] = None
+    route: Optional[str] = None
+    plane_size: str
+    force: bool = False
+
+def parse_stops(request: BriefingRequest):
+    """Departure, destination and alternates in order, without duplicates."""
+    if request.airports:
+        tokens = request.airports
+    else:
+        tokens = re.split(r"[\s,>]+", request.route or "")
+    stops = []
+    for token in tokens:
+        code = token.upper().strip()
+        if code and not ROUTE_SKIP.match(code) and code not in stops:
+            stops.append(code)
+    return stops
+
+def quick_summary(reports):
+    # Deterministic route line when every stop came from cache (no model call)
+    return " · ".join(
+        f"{code}: {report.get('analysis', {}).get('flight_category', 'UNK')}" for code, report in reports
+    )
+
+@router.post("/briefing")
+async def route_briefing(request: BriefingRequest, raw_request: Request):
+    is_paused = await settings.get("global_pause")
+    if is_paused == "true":
+        msg = await settings.get("global_pause_message", "System is under maintenance.")
+        raise HTTPException(status_code=503, detail=msg)
+
+    t_start = time.time()
+    client_id = raw_request.headers.get("X-Client-ID", "UNKNOWN")
+    client_ip = raw_request.headers.get("X-Forwarded-For", raw_request.client.host).split(',')[0].strip()
+
+    raw_stops = parse_stops(request)
+    if not raw_stops:
+        raise HTTPException(status_code=400, detail="Provide at least one airport.")
+    if len(raw_stops) > BRIEFING_MAX_STOPS:
+        raise HTTPException(status_code=400, detail=f"A briefing covers at most {BRIEFING_MAX_STOPS} airports.")
+
+    # --- 1. RESOLVE ALL STOPS ---
+    resolved = await asyncio.gather(*(resolver.resolve(code) for code in raw_stops), return_exceptions=True)
+    stops = []
+    for raw, result in zip(raw_stops, resolved):
+        if isinstance(result, AirportNotFound):
+            raise HTTPException(
+                status_code=404,
+                detail={"message": f"Airport '{raw}' not found.", "suggestions": result.suggestions}
+            )
+        if isinstance(result, Exception):
+            raise result
+        if result[0] not in (s[0] for s in stops):
+            stops.append(result)
+
+    raw_input = " ".join(raw_stops)
+    codes = [icao for icao, _ in stops]
+    status = "FAIL"
+    error_msg = None
+    model_used = None
+    tokens_used = 0
+    t_wx = t_notams = t_alt = t_ai = 0
+
+    try:
+        # --- 2. PER-AIRPORT CACHE (Shared with /api/analyze) ---
+        reports = {}
+        if not request.force:
+            entries = await asyncio.gather(*(get_cached_report(icao, request.plane_size) for icao in codes))
+            for icao, entry in zip(codes, entries):
+                if entry:
+                    reports[icao] = decode_cached_report(entry)
+        misses = [(icao, remote) for icao, remote in stops if icao not in reports]
+
+        route_summary = None
+        if misses:
+            # One rate-limit charge for the whole briefing
+            await limiter(raw_request)
+
+            # --- 3. FETCH (Bulk weather for every stop, NOTAMs through a bounded pool) ---
+            miss_codes = [icao for icao, _ in misses]
+            sem = asyncio.Semaphore(NOTAM_CONCURRENCY)
+
+            async def fetch_notams(icao):
+                async with sem:
+                    return await get_notams(icao)
+
+            async def fetch_wx():
+                t = time.time()
+                data = await get_bulk_weather_data(miss_codes)
+                return data, time.time() - t
+
+            async def fetch_all_notams():
+                t = time.time()
+                data = await asyncio.gather(*(fetch_notams(icao) for icao in miss_codes))
+                return data, time.time() - t
+
+            (bulk, t_wx), (notam_lists, t_notams) = await asyncio.gather(fetch_wx(), fetch_all_notams())
+
+            contexts = {}
+            for (icao, remote), notams in zip(misses, notam_lists):
+                lat, lon, name, tz, resolved_icao = airport_context(icao, remote)
+                airspace_warnings = []
+                if lat is not None and lon is not None:
+                    try:
+                        airspace_warnings = check_airspace_zones(icao, lat, lon)
+                    except Exception: pass
+                data = bulk.get(icao)
+                has_wx = bool(data and data.get('metar'))
+                contexts[icao] = {
+                    "name": name, "tz": tz, "resolved_icao": resolved_icao, "notams": notams,
+                    "airspace_warnings": airspace_warnings,
+                    "weather_data": data if has_wx else None,
+                    "weather_icao": icao if has_wx else None,
+                    "weather_dist": 0, "weather_name": name if has_wx else None
+                }
+
+            # Weather Fallback: one bulk fetch covering every stop without its own METAR
+            no_wx = [icao for icao in miss_codes if contexts[icao]["weather_data"] is None]
+            if no_wx:
+                t0_alt = time.time()
+
+                async def candidates_for(icao):
+                    candidates = await get_best_reporting_stations(icao)
+                    if candidates is None:
+                        candidates = await get_nearest_reporting_stations(icao)
+                    return candidates
+
+                all_candidates = await asyncio.gather(*(candidates_for(icao) for icao in no_wx))
+                fallback_bulk = await get_bulk_weather_data(sorted({c[0] for cands in all_candidates for c in cands}))
+                for icao, candidates in zip(no_wx, all_candidates):
+                    picked = select_reporting_station(candidates, fallback_bulk)
+                    if picked:
+                        ctx = contexts[icao]
+                        ctx["weather_icao"], ctx["weather_dist"], ctx["weather_data"], ctx["weather_name"] = picked
+                t_alt = time.time() - t0_alt
+
+            for ctx in contexts.values():
+                if not ctx["weather_data"]:
+                    ctx["weather_data"] = {"metar": None, "taf": None}
+
+            # --- 4. ONE MODEL CALL FOR THE UNCACHED STOPS ---
+            t0 = time.time()
+            briefing = await analyze_briefing([
+                {
+                    "icao_code": ctx["resolved_icao"],
+                    "weather_data": ctx["weather_data"],
+                    "notams": ctx["notams"],
+                    "reporting_station": ctx["weather_icao"],
+                    "reporting_station_name": ctx["weather_name"],
+                    "airport_tz": ctx["tz"],
+                    "external_airspace_warnings": ctx["airspace_warnings"],
+                    "dist": ctx["weather_dist"],
+                    "target_icao": ctx["resolved_icao"]
+                }
+                for ctx in contexts.values()
+            ], request.plane_size)
+            t_ai = time.time() - t0
+            tokens_used = briefing["_meta"].get("tokens", 0)
+            model_used = briefing["_meta"].get("model")
+            route_summary = briefing["route_summary"]
+
+            # --- 5. STORE EACH STOP AS ITS OWN REPORT ---
+            for icao, ctx in contexts.items():
+                response_data = {
+                    "airport_name": ctx["name"],
+                    "airport_tz": ctx["tz"],
+                    "is_cached": False,
+                    "analysis": briefing["stops"][ctx["resolved_icao"]],
+                    "raw_data": {
+                        "metar": ctx["weather_data"]['metar'],
+                        "taf": ctx["weather_data"]['taf'],
+                        "notams": ctx["notams"],
+                        "weather_source": ctx["weather_icao"],
+                        "weather_dist": round(ctx["weather_dist"], 1),
+                        "weather_name": ctx["weather_name"]
+                    }
+                }
+                await store_report(icao, request.plane_size, response_data, ctx["weather_data"])
+                reports[icao] = response_data
+
+        ordered = [(icao, reports[icao]) for icao in codes]
+        status = "SUCCESS" if misses else "CACHE_HIT"
+        return FastJSONResponse({
+            "route": codes,
+            "plane_size": request.plane_size,
+            "is_cached": not misses,
+            "route_summary": route_summary or quick_summary(ordered),
+            "stops": [{"icao": icao, **report} for icao, report in ordered]
+        })
+
+    except HTTPException as e:
+        if e.status_code == 429:
+            status = "RATE_LIMIT"
+            alert_aggregator.record("rate_limit", client_id, f"Rate Limit: briefing {raw_input} from {client_ip}")
+        else:
+            status = "ERROR"
+        error_msg = e.detail
+        raise e
+
+    except Exception as e:
+        status = "ERROR"
+        error_msg = str(e)
+        alert_aggregator.record("error", f"{type(e).__name__}: {e}", f"briefing {raw_input} ({client_id})")
+        raise e
+
+    finally:
+        duration = time.time() - t_start
+        logger.info(f"⏱️  BRIEFING: {' '.join(codes)} | Total: {duration:.2f}s | Wx: {t_wx:.2f}s | Alt: {t_alt:.2f}s | NOTAMs: {t_notams:.2f}s | AI: {t_ai:.2f}s")
+        await log_attempt(
+            client_id, client_ip, raw_input, " ".join(codes), request.plane_size,
+            duration, status, error_msg, model_used, tokens_used,
+            t_wx=t_wx, t_notams=t_notams, t_ai=t_ai, t_alt=t_alt
+        )
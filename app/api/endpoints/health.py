@@ -0,0 +1,42 @@
+import asyncio
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from app.core.db import database, redis_client
+from app.core.geography import airports_loaded
+
+router = APIRouter()
+
+# Filled in by the lifespan hook (app.main)
+startup_state = {"complete": False, "startup_seconds": None}
+
+@router.get("/healthz", include_in_schema=False)
+async def healthz():
+    """Liveness: the process is up and serving."""
+    return {"status": "ok"}
+
+@router.get("/readyz", include_in_schema=False)
+async def readyz():
+    """Readiness: startup finished and dependencies answer."""
+    checks = {"startup": startup_state["complete"], "airports": airports_loaded()}
+
+    async def check_db():
+        return await database.fetch_val("SELECT 1") == 1
+
+    async def check_redis():
+        return bool(await redis_client.ping())
+
+    results = await asyncio.gather(
+        asyncio.wait_for(check_db(), 2.0),
+        asyncio.wait_for(check_redis(), 2.0),
+        return_exceptions=True
+    )
+    checks["database"] = results[0] is True
+    checks["redis"] = results[1] is True
+
+    ready = all(checks.values())
+    body = {
+        "status": "ready" if ready else "not_ready",
+        "checks": checks,
+        "startup_seconds": startup_state["startup_seconds"]
+    }
+    return JSONResponse(body, status_code=200 if ready else 503)
@@ -2,10 +2,12 @@ import json
 import datetime
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, List
 from app.core.db import database
 from app.core.weather import get_metar_taf
+from app.core.resolver import resolver, AirportNotFound
 from app.api.endpoints.admin import get_admin_key
+from app.api.endpoints.batch import BATCH_MAX_AIRPORTS
 
 router = APIRouter()
 
@@ -25,7 +27,9 @@ async def get_kiosk_config(slug: str):
         
     return {
         "slug": row['slug'],
+        "profile_type": row['profile_type'] or "single",
         "target_icao": row['target_icao'],
+        "airports": json.loads(row['airports'] or '[]'),
         "weather_override_icao": row['weather_override_icao'],
         "title_override": row['title_override'],
         "default_profile": row['default_profile'],
@@ -56,7 +60,9 @@ async def peek_weather(icao: str, source: str = None):
 
 class KioskProfileRequest(BaseModel):
     slug: str
-    target_icao: str
+    profile_type: str = "single"          # 'single' or 'board' (dispatch board)
+    target_icao: Optional[str] = None
+    airports: Optional[List[str]] = None  # Board only
     weather_override_icao: Optional[str] = None
     title_override: Optional[str] = None
     default_profile: str = "small"
@@ -75,7 +81,27 @@ async def list_kiosks():
 @router.post("/add", dependencies=[Depends(get_admin_key)])
 async def add_kiosk(data: KioskProfileRequest):
     slug_key = data.slug.lower().strip().replace(" ", "-")
-    
+
+    airports = []
+    if data.profile_type == "board":
+        # Stored as resolved ICAO codes: /api/analyze/batch keys its lines by them
+        for code in data.airports or []:
+            code = code.upper().strip()
+            if not code:
+                continue
+            try:
+                icao, _ = await resolver.resolve(code)
+            except AirportNotFound:
+                raise HTTPException(status_code=400, detail=f"Airport '{code}' not found.")
+            if icao not in airports:
+                airports.append(icao)
+        if not airports or len(airports) > BATCH_MAX_AIRPORTS:
+            raise HTTPException(status_code=400, detail=f"A board needs 1 to {BATCH_MAX_AIRPORTS} airports.")
+    elif data.profile_type != "single" or not data.target_icao:
+        raise HTTPException(status_code=400, detail="A single-airport kiosk needs a target airport.")
+    # Boards have no target_icao: the forced-refresh exemption in /api/analyze is for single kiosks only
+    target = None if airports else data.target_icao.upper().strip()
+
     # Pack the config options into JSON
     config_blob = json.dumps({
         "show_raw_metar": data.show_raw_metar,
@@ -85,10 +111,12 @@ async def add_kiosk(data: KioskProfileRequest):
     })
 
     query = """
-        INSERT INTO kiosk_profiles (slug, target_icao, weather_override_icao, title_override, default_profile, subscriber_name, is_active, config_options)
-        VALUES (:slug, :target, :wx_src, :title, :def, :sub, 1, :conf)
+        INSERT INTO kiosk_profiles (slug, profile_type, target_icao, airports, weather_override_icao, title_override, default_profile, subscriber_name, is_active, config_options)
+        VALUES (:slug, :ptype, :target, :airports, :wx_src, :title, :def, :sub, 1, :conf)
         ON CONFLICT (slug) DO UPDATE SET
+        profile_type = :ptype,
         target_icao = :target,
+        airports = :airports,
         weather_override_icao = :wx_src,
         title_override = :title,
         default_profile = :def,
@@ -98,8 +126,10 @@ async def add_kiosk(data: KioskProfileRequest):
     """
     values = {
         "slug": slug_key,
-        "target": data.target_icao.upper(),
-        "wx_src": data.weather_override_icao.upper() if data.weather_override_icao else None,
+        "ptype": data.profile_type,
+        "target": target,
+        "airports": json.dumps(airports) if airports else None,
+        "wx_src": data.weather_override_icao.upper() if data.weather_override_icao and data.profile_type == "single" else None,
         "title": data.title_override,
         "def": data.default_profile,
         "sub": data.subscriber_name,
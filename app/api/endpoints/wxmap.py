@@ -0,0 +1,31 @@
+from fastapi import APIRouter, HTTPException, Query
+from app.core.wxmap import stations_in_bbox, tiles_for, MAX_TILES
+from app.core.responses import FastJSONResponse
+
+router = APIRouter()
+
+def parse_bbox(bbox: str):
+    """'minLon,minLat,maxLon,maxLat' (GeoJSON order)."""
+    try:
+        min_lon, min_lat, max_lon, max_lat = (float(v) for v in bbox.split(","))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="bbox must be minLon,minLat,maxLon,maxLat")
+    if not (-180 <= min_lon < max_lon <= 180 and -90 <= min_lat < max_lat <= 90):
+        raise HTTPException(status_code=400, detail="bbox is out of range or inverted (antimeridian boxes: split in two).")
+    return min_lon, min_lat, max_lon, max_lat
+
+@router.get("/map")
+async def get_flight_category_map(bbox: str = Query(..., description="minLon,minLat,maxLon,maxLat")):
+    box = parse_bbox(bbox)
+    if len(tiles_for(*box)) > MAX_TILES:
+        raise HTTPException(status_code=400, detail="Area too large, zoom in.")
+
+    stations, tile_count, cached_tiles = await stations_in_bbox(*box)
+    counts = {}
+    for s in stations:
+        counts[s["category"]] = counts.get(s["category"], 0) + 1
+    return FastJSONResponse(
+        {"bbox": list(box), "stations": stations, "counts": counts, "tiles": tile_count, "cached_tiles": cached_tiles},
+        # Shared by everyone looking at the same area; tiles refresh every few minutes anyway
+        headers={"Cache-Control": "public, max-age=60"}
+    )
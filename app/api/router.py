@@ -1,11 +1,23 @@
 from fastapi import APIRouter
-from app.api.endpoints import analysis, admin, report, kiosk, calculator, contact
+from app.api.endpoints import analysis, batch, briefing, wxmap, admin, report, kiosk, calculator, contact, health
 
 router = APIRouter()
 
+# /healthz, /readyz (Liveness/Readiness probes)
+router.include_router(health.router, tags=["health"])
+
 # /api/analyze
 router.include_router(analysis.router, prefix="/api", tags=["analysis"])
 
+# /api/analyze/batch (Dispatch boards)
+router.include_router(batch.router, prefix="/api", tags=["analysis"])
+
+# /api/briefing (Multi-airport route)
+router.include_router(briefing.router, prefix="/api", tags=["briefing"])
+
+# /api/map (Regional flight categories)
+router.include_router(wxmap.router, prefix="/api", tags=["map"])
+
 # /api/report
 router.include_router(report.router, prefix="/api", tags=["report"])
 
@@ -1,17 +1,29 @@
 import os
+import copy
 import json
+import asyncio
 import re
 import math
 from datetime import datetime, timezone
-from openai import AsyncOpenAI
 from dotenv import load_dotenv
 from app.core.settings import settings
+from app.core.ai_cache import ai_cache
 from app.core.physics import calculate_crosswind
 from app.core.geography import get_runway_headings
+from app.core.tfr import tfr_store
 
 load_dotenv()
 
-client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# The openai package is slow to import; the client is built on first use
+# (startup warms it in a thread alongside the airport tables)
+_client = None
+
+def get_client():
+    global _client
+    if _client is None:
+        from openai import AsyncOpenAI
+        _client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    return _client
 
 def clean_json_string(s):
     if not s: return "{}"
@@ -61,8 +73,58 @@ def parse_metar_wind(metar_text):
         return direction, speed, gust
     return None
 
-async def analyze_risk(icao_code, weather_data, notams, plane_size="small", reporting_station=None, reporting_station_name=None, airport_tz="UTC", external_airspace_warnings=[], dist=0, target_icao=""):
-    
+_inflight = {}
+
+async def _complete(model_id, system_prompt, user_content):
+    response = await get_client().chat.completions.create(
+        model=model_id,
+        messages=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_content}
+        ],
+        response_format={"type": "json_object"}
+    )
+
+    usage = response.usage
+    tokens = usage.total_tokens if usage else 0
+
+    raw_content = response.choices[0].message.content
+    cleaned_content = clean_json_string(raw_content)
+    return json.loads(cleaned_content), tokens, response.model
+
+async def _cached_complete(cache_key, model_id, system_prompt, user_content, cacheable=True):
+    """
+    (result, tokens, model): from ai_cache, from an identical in-flight call, or a new one.
+    tokens is 0 unless this call paid for the completion. The result is a private copy.
+    """
+    cached = await ai_cache.get(cache_key)
+    if cached:
+        await ai_cache.record(True, cached["tokens"])
+        print(f"DEBUG AI: Result cache hit ({cached['tokens']} tokens saved)")
+        return copy.deepcopy(cached["result"]), 0, cached["model"]
+
+    # Identical concurrent requests share one model call
+    call = _inflight.get(cache_key)
+    if call is None:
+        call = asyncio.ensure_future(_complete(model_id, system_prompt, user_content))
+        _inflight[cache_key] = call
+        call.add_done_callback(lambda _: _inflight.pop(cache_key, None))
+        result, tokens, model_used = await asyncio.shield(call)
+        await ai_cache.record(False)
+        if cacheable:
+            await ai_cache.put(cache_key, result, tokens, model_used)
+    else:
+        result, shared_tokens, model_used = await asyncio.shield(call)
+        tokens = 0
+        await ai_cache.record(True, shared_tokens)
+    return copy.deepcopy(result), tokens, model_used
+
+def _is_cacheable(notams):
+    # Don't pin a FAA outage answer for the rest of the hour
+    return not any(str(n).startswith("NOTAMs unavailable") for n in (notams or []))
+
+def _build_context(icao_code, weather_data, notams, plane_size="small", reporting_station=None, reporting_station_name=None, airport_tz="UTC", external_airspace_warnings=[], dist=0, target_icao=""):
+    """Everything derived in Python for one airport: prompt instructions, crosswind math, airspace text."""
     profiles = {
         "small": "Cessna 172/Piper Archer (Max Crosswind: 15kts, IFR: No Radar)",
         "medium": "Baron/Cirrus SR22 (Max Crosswind: 20kts, IFR: Capable)",
@@ -196,9 +258,79 @@ async def analyze_risk(icao_code, weather_data, notams, plane_size="small", repo
     if external_airspace_warnings:
         bullet_list = "\n".join([f"- {w}" for w in external_airspace_warnings])
         airspace_status_content = f"WARNING - RESTRICTIONS DETECTED:\n{bullet_list}"
+    elif tfr_store.is_current():
+        airspace_status_content = "No intersection with Permanent Prohibited/Restricted zones (P-40, DC SFRA, etc) or active TFRs from the FAA feed detected."
     else:
         airspace_status_content = "No intersection with Permanent Prohibited/Restricted zones (P-40, DC SFRA, etc) detected."
-    airspace_status_content += "\n(Verify dynamic TFRs at tfr.faa.gov)."
+    if tfr_store.is_current():
+        airspace_status_content += "\n(Active TFRs checked against the FAA feed; confirm at tfr.faa.gov before flight)."
+    else:
+        airspace_status_content += "\n(Verify dynamic TFRs at tfr.faa.gov)."
+
+    return {
+        "icao_code": icao_code, "weather_data": weather_data, "notams": notams, "plane_size": plane_size,
+        "selected_profile": selected_profile, "airport_tz": airport_tz, "dist": dist,
+        "target_code": target_code, "target_display": target_display, "weather_source_name": weather_source_name,
+        "opening_instruction": opening_instruction, "xwind_analysis_text": xwind_analysis_text,
+        "calc_rwy": calc_rwy, "calc_xwind": calc_xwind, "calc_status": calc_status, "wind_data": wind_data,
+        "airspace_status_content": airspace_status_content
+    }
+
+def _cache_inputs(ctx):
+    """What shapes one airport's prompt (keys for ai_cache)."""
+    weather_data = ctx["weather_data"]
+    return dict(
+        metar=weather_data.get('metar'), taf=weather_data.get('taf'),
+        notams=ctx["notams"], profile=ctx["plane_size"], tz=ctx["airport_tz"], target=ctx["target_display"],
+        source=ctx["weather_source_name"], dist=f"{ctx['dist']:.1f}", airspace=ctx["airspace_status_content"],
+        opening=ctx["opening_instruction"], xwind=ctx["xwind_analysis_text"], rwy=ctx["calc_rwy"], status=ctx["calc_status"]
+    )
+
+def _postprocess(result, ctx):
+    """Forces the Python-calculated values over whatever the model wrote."""
+    xwind_analysis_text, calc_xwind, calc_rwy, wind_data = ctx["xwind_analysis_text"], ctx["calc_xwind"], ctx["calc_rwy"], ctx["wind_data"]
+
+    if "unavailable" not in xwind_analysis_text.lower():
+        result["summary_crosswind"] = xwind_analysis_text
+
+    # 2. HARD OVERRIDE: Bubbles
+    if "bubbles" in result:
+         # Force the Python Math into the bubble
+         result["bubbles"]["x_wind"] = f"{calc_xwind}kts" if calc_xwind != "--" else "--"
+         result["bubbles"]["rwy"] = calc_rwy
+
+         # Force Winds Calm if speed is 0
+         if wind_data and wind_data[1] == 0:
+             result["bubbles"]["wind"] = "Winds Calm"
+         
+         # Still fix visibility formatting
+         if "visibility" in result["bubbles"]:
+            result["bubbles"]["visibility"] = format_visibility(result["bubbles"]["visibility"])
+
+    # 3. HARD OVERRIDE: Status Color
+    result["crosswind_status"] = ctx["calc_status"]
+    return result
+
+def _error_result(e):
+    return {
+        "flight_category": "UNK",
+        "crosswind_status": "UNK",
+        "summary_weather": f"AI Error: {str(e)}",
+        "summary_crosswind": "--",
+        "summary_airspace": "--",
+        "summary_notams": "--",
+        "timeline": {},
+        "bubbles": {},
+        "airspace_warnings": [],
+        "critical_notams": []
+    }
+
+async def analyze_risk(icao_code, weather_data, notams, plane_size="small", reporting_station=None, reporting_station_name=None, airport_tz="UTC", external_airspace_warnings=[], dist=0, target_icao=""):
+    ctx = _build_context(icao_code, weather_data, notams, plane_size, reporting_station, reporting_station_name, airport_tz, external_airspace_warnings, dist, target_icao)
+    selected_profile, opening_instruction = ctx["selected_profile"], ctx["opening_instruction"]
+    xwind_analysis_text, calc_xwind, calc_rwy, calc_status = ctx["xwind_analysis_text"], ctx["calc_xwind"], ctx["calc_rwy"], ctx["calc_status"]
+    target_display, weather_source_name = ctx["target_display"], ctx["weather_source_name"]
+    airspace_status_content = ctx["airspace_status_content"]
 
     # --- 4. AI PROMPT CONSTRUCTION ---
     current_time_str = datetime.now(timezone.utc).strftime("%H:%MZ")
@@ -282,43 +414,12 @@ async def analyze_risk(icao_code, weather_data, notams, plane_size="small", repo
     try:
         model_id = await settings.get("openai_model", "gpt-4o-mini")
 
-        response = await client.chat.completions.create(
-            model=model_id,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_content}
-            ],
-            response_format={"type": "json_object"}
-        )
-        
-        usage = response.usage
-        tokens = usage.total_tokens if usage else 0
-        model_used = response.model
-
-        raw_content = response.choices[0].message.content
-        cleaned_content = clean_json_string(raw_content)
-        result = json.loads(cleaned_content)
+        # --- 5. RESULT CACHE (Same inputs in the same hour -> same answer) ---
+        cache_key = ai_cache.key(model=model_id, **_cache_inputs(ctx))
+        result, tokens, model_used = await _cached_complete(cache_key, model_id, system_prompt, user_content, _is_cacheable(notams))
         
         # --- POST-PROCESSING ---
-        if "unavailable" not in xwind_analysis_text.lower():
-            result["summary_crosswind"] = xwind_analysis_text
-
-        # 2. HARD OVERRIDE: Bubbles
-        if "bubbles" in result:
-             # Force the Python Math into the bubble
-             result["bubbles"]["x_wind"] = f"{calc_xwind}kts" if calc_xwind != "--" else "--"
-             result["bubbles"]["rwy"] = calc_rwy
-
-             # Force Winds Calm if speed is 0
-             if wind_data and wind_data[1] == 0:
-                 result["bubbles"]["wind"] = "Winds Calm"
-             
-             # Still fix visibility formatting
-             if "visibility" in result["bubbles"]:
-                result["bubbles"]["visibility"] = format_visibility(result["bubbles"]["visibility"])
-
-        # 3. HARD OVERRIDE: Status Color
-        result["crosswind_status"] = calc_status
+        _postprocess(result, ctx)
         
         result['_meta'] = { "tokens": tokens, "model": model_used }
         return result
@@ -326,15 +427,107 @@ async def analyze_risk(icao_code, weather_data, notams, plane_size="small", repo
     except Exception as e:
         print(f"AI ERROR: {e}")
         # Return Error Structure
+        return _error_result(e)
+
+async def analyze_briefing(stops, plane_size="small"):
+    """
+    One model call for several airports (route briefing).
+    stops: [analyze_risk kwargs without plane_size, ...]
+    Returns {"stops": {target_code: analysis}, "route_summary": str, "_meta": {...}};
+    each analysis has the same shape (and overrides) as analyze_risk's.
+    """
+    contexts = [_build_context(plane_size=plane_size, **stop) for stop in stops]
+    selected_profile = contexts[0]["selected_profile"]
+    current_time_str = datetime.now(timezone.utc).strftime("%H:%MZ")
+
+    system_prompt = f"""
+    You are a Weather Analysis Assistant providing a multi-airport route briefing for pilot interpretation.
+    AIRCRAFT PROFILE: {selected_profile}
+    CURRENT TIME (UTC): {current_time_str}
+
+    YOUR TASKS:
+    1. For EACH airport block in the input, produce one analysis object keyed by its AIRPORT code.
+       Follow the block's own instructions:
+       - "summary_weather": Start exactly as the block's OPENING says, then a comprehensive aviation weather narrative
+         (wind, visibility, cloud layers, temperature/dewpoint spread, significant weather).
+       - "summary_crosswind": Use the block's CROSSWIND TEXT verbatim. Do not recalculate.
+       - "summary_airspace": Summarize the block's AIRSPACE status.
+       - "summary_notams": Scan for MAJOR hazards. Translate to plain English. Single paragraph.
+       - "timeline": From the TAF change groups (FM, BECMG, TEMPO), ignoring periods starting within 1 hour of CURRENT TIME,
+         "forecast_1" is the first significant period and "forecast_2" the next one. "time_label" is in the block's LOCAL
+         TIMEZONE (e.g. "From 2:00 PM EST"). If TAF is missing, set values to "NO_TAF".
+       - "bubbles": "wind" as "DDD° @ SSkts" (or "DDD° @ SSkts | Gusting @ GGGkts"), "x_wind" and "rwy" exactly as
+         PRE-CALCULATED in the block, "visibility" in aviation fractions (e.g. "10 SM"), "ceiling" spelled out
+         (e.g. "Broken 2000 FT AGL", newline for multiple layers).
+    2. ROUTE SUMMARY ("route_summary"): A short paragraph comparing the airports in order: which has the most
+       restrictive conditions, and notable trends during the forecast period. Do not make a go/no-go decision.
+
+    OUTPUT JSON FORMAT ONLY:
+    {{
+        "route_summary": "...",
+        "stops": {{
+            "<AIRPORT>": {{
+                "flight_category": "VFR" | "MVFR" | "IFR" | "LIFR" | "UNK",
+                "crosswind_status": "<PRE-CALCULATED status>",
+                "summary_weather": "...",
+                "summary_crosswind": "...",
+                "summary_airspace": "...",
+                "summary_notams": "...",
+                "timeline": {{
+                    "forecast_1": {{ "time_label": "...", "summary": "..." }},
+                    "forecast_2": {{ "time_label": "...", "summary": "..." }}
+                }},
+                "bubbles": {{ "wind": "...", "x_wind": "...", "rwy": "...", "visibility": "...", "ceiling": "..." }},
+                "airspace_warnings": ["..."],
+                "critical_notams": ["..."]
+            }}
+        }}
+    }}
+    """
+
+    blocks = []
+    for ctx in contexts:
+        weather_data = ctx["weather_data"]
+        blocks.append(f"""
+    === AIRPORT: {ctx['target_code']} ===
+    TARGET: {ctx['target_display']}
+    LOCAL TIMEZONE: {ctx['airport_tz']}
+    SOURCE: {ctx['weather_source_name']}
+    DIST: {ctx['dist']:.1f}nm
+    OPENING: {ctx['opening_instruction']}
+    CROSSWIND TEXT: "{ctx['xwind_analysis_text']}"
+    PRE-CALCULATED: x_wind="{ctx['calc_xwind']}kts" rwy="{ctx['calc_rwy']}" status="{ctx['calc_status']}"
+    AIRSPACE: {ctx['airspace_status_content']}
+    METAR: {weather_data.get('metar', 'N/A')}
+    TAF: {weather_data.get('taf', 'N/A')}
+    NOTAMS: {str(ctx['notams'])}
+    """)
+    user_content = f"\n    CURRENT_UTC: {current_time_str}\n" + "".join(blocks)
+
+    try:
+        model_id = await settings.get("openai_model", "gpt-4o-mini")
+        cache_key = ai_cache.key(model=model_id, briefing=[_cache_inputs(ctx) for ctx in contexts])
+        cacheable = all(_is_cacheable(ctx["notams"]) for ctx in contexts)
+        result, tokens, model_used = await _cached_complete(cache_key, model_id, system_prompt, user_content, cacheable)
+    except Exception as e:
+        print(f"AI ERROR: {e}")
         return {
-            "flight_category": "UNK",
-            "crosswind_status": "UNK",
-            "summary_weather": f"AI Error: {str(e)}",
-            "summary_crosswind": "--",
-            "summary_airspace": "--",
-            "summary_notams": "--",
-            "timeline": {},
-            "bubbles": {},
-            "airspace_warnings": [],
-            "critical_notams": []
-        }
\ No newline at end of file
+            "stops": {ctx["target_code"]: _error_result(e) for ctx in contexts},
+            "route_summary": f"AI Error: {str(e)}",
+            "_meta": {"tokens": 0, "model": None}
+        }
+
+    by_stop = result.get("stops") or {}
+    analyses = {}
+    for ctx in contexts:
+        analysis = by_stop.get(ctx["target_code"])
+        if not isinstance(analysis, dict):
+            analyses[ctx["target_code"]] = _error_result("Airport missing from the model response.")
+            continue
+        analyses[ctx["target_code"]] = _postprocess(analysis, ctx)
+
+    return {
+        "stops": analyses,
+        "route_summary": result.get("route_summary", ""),
+        "_meta": {"tokens": tokens, "model": model_used}
+    }
@@ -0,0 +1,78 @@
+import json
+import hashlib
+import logging
+from datetime import datetime, timezone
+from app.core.db import redis_client
+
+logger = logging.getLogger(__name__)
+
+AI_CACHE_PREFIX = "ai_cache:"
+AI_CACHE_STATS = "ai_cache:stats"
+# Entries are keyed on the UTC hour, so they can't be reused past the next one anyway
+AI_CACHE_TTL = 2 * 60 * 60
+
+def _normalize(text):
+    return " ".join(str(text).split()) if text else ""
+
+class AIResultCache:
+    """
+    Content-addressed cache for model output. The key is a hash of
+    everything that shapes the prompt (METAR, TAF, NOTAM set, profile,
+    model, derived crosswind text...) plus the UTC hour, so an identical
+    situation reuses the earlier answer even after the report cache
+    (flight_cache) has expired.
+    """
+    def key(self, **inputs):
+        normalized = {}
+        for name, value in inputs.items():
+            if name == "notams":
+                value = sorted({_normalize(n) for n in (value or [])})
+            elif isinstance(value, (list, tuple)):
+                value = [_normalize(v) for v in value]
+            elif isinstance(value, str):
+                value = _normalize(value)
+            normalized[name] = value
+        normalized["hour"] = datetime.now(timezone.utc).strftime("%Y%m%d%H")
+        digest = hashlib.sha256(json.dumps(normalized, sort_keys=True, default=str).encode()).hexdigest()
+        return f"{AI_CACHE_PREFIX}{digest}"
+
+    async def get(self, key):
+        """Returns {"result", "tokens", "model"} or None."""
+        try:
+            raw = await redis_client.get(key)
+            if raw:
+                return json.loads(raw)
+        except Exception as e:
+            logger.warning(f"AI CACHE READ FAILED: {e}")
+        return None
+
+    async def record(self, hit, tokens_saved=0):
+        """Counts a lookup: a hit (cache or shared in-flight call) or a paid model call."""
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.hincrby(AI_CACHE_STATS, "hits" if hit else "misses", 1)
+                if tokens_saved:
+                    pipe.hincrby(AI_CACHE_STATS, "tokens_saved", tokens_saved)
+                await pipe.execute()
+        except Exception: pass
+
+    async def put(self, key, result, tokens, model):
+        try:
+            entry = {"result": result, "tokens": tokens, "model": model}
+            await redis_client.set(key, json.dumps(entry), ex=AI_CACHE_TTL)
+        except Exception as e:
+            logger.warning(f"AI CACHE WRITE FAILED: {e}")
+
+    async def stats(self):
+        raw = await redis_client.hgetall(AI_CACHE_STATS)
+        hits = int(raw.get("hits", 0))
+        misses = int(raw.get("misses", 0))
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "tokens_saved": int(raw.get("tokens_saved", 0))
+        }
+
+ai_cache = AIResultCache()
@@ -0,0 +1,316 @@
+import os
+import json
+import math
+import hashlib
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# --- AIRSPACE ENGINE (Zone polygons in an R-tree) ---
+# Bundled shapes; point AIRSPACE_GEOJSON at a full special-use airspace export to load more.
+AIRSPACE_GEOJSON = os.getenv(
+    "AIRSPACE_GEOJSON",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "airspace.geojson")
+)
+
+# Per-airport results for the bundled zones; written at build time (python -m app.core.airspace)
+AIRSPACE_TABLE = os.getenv(
+    "AIRSPACE_TABLE",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "airspace_table.json")
+)
+
+PROXIMITY_BUFFER_NM = 5  # ADVISORY band outside a zone's boundary
+NODE_CAPACITY = 16
+
+# --- 1. GEOMETRY ---
+def _point_in_ring(lon, lat, ring):
+    # Ray casting on lon/lat; ring is a closed list of (lon, lat)
+    inside = False
+    j = len(ring) - 1
+    for i in range(len(ring)):
+        xi, yi = ring[i]
+        xj, yj = ring[j]
+        if (yi > lat) != (yj > lat) and lon < (xj - xi) * (lat - yi) / (yj - yi) + xi:
+            inside = not inside
+        j = i
+    return inside
+
+def _ring_distance_nm(lon, lat, ring):
+    # Local flat projection around the query point: plenty accurate at zone scale
+    kx = 60 * math.cos(math.radians(lat))
+    best = float("inf")
+    px, py = (ring[0][0] - lon) * kx, (ring[0][1] - lat) * 60
+    for x, y in ring[1:]:
+        qx, qy = (x - lon) * kx, (y - lat) * 60
+        dx, dy = qx - px, qy - py
+        seg = dx * dx + dy * dy
+        t = 0.0 if seg == 0 else max(0.0, min(1.0, -(px * dx + py * dy) / seg))
+        cx, cy = px + t * dx, py + t * dy
+        d = cx * cx + cy * cy
+        if d < best:
+            best = d
+        px, py = qx, qy
+    return math.sqrt(best)
+
+def zone_set_digest(zones):
+    """Identifies a zone set (shapes, altitudes, types): precomputed results are only valid for the same one."""
+    h = hashlib.sha256()
+    for z in sorted(zones, key=lambda z: str(z.id)):
+        h.update(json.dumps([z.id, z.name, z.type, z.floor_ft, z.ceiling_ft, z.polygons]).encode())
+    return h.hexdigest()[:16]
+
+class Zone:
+    __slots__ = ("id", "name", "type", "floor_ft", "ceiling_ft", "polygons", "bbox", "properties")
+
+    def __init__(self, zone_id, name, zone_type, floor_ft, ceiling_ft, polygons, properties=None):
+        self.id = zone_id
+        self.name = name
+        self.type = zone_type
+        self.floor_ft = floor_ft
+        self.ceiling_ft = ceiling_ft
+        # [[outer_ring, hole, ...], ...] with rings as [(lon, lat), ...]
+        self.polygons = polygons
+        xs = [x for poly in polygons for x, _ in poly[0]]
+        ys = [y for poly in polygons for _, y in poly[0]]
+        self.bbox = (min(xs), min(ys), max(xs), max(ys))
+        self.properties = properties or {}
+
+    def contains(self, lon, lat):
+        for outer, *holes in self.polygons:
+            if _point_in_ring(lon, lat, outer) and not any(_point_in_ring(lon, lat, h) for h in holes):
+                return True
+        return False
+
+    def boundary_distance_nm(self, lon, lat):
+        return min(_ring_distance_nm(lon, lat, ring) for poly in self.polygons for ring in poly)
+
+    def altitudes(self):
+        floor = "SFC" if not self.floor_ft else f"{self.floor_ft:,} ft"
+        if self.ceiling_ft is None:
+            return f"{floor} and above"
+        ceiling = f"FL{(self.ceiling_ft + 1) // 100}" if self.ceiling_ft >= 17999 else f"{self.ceiling_ft:,} ft"
+        return f"{floor}-{ceiling}"
+
+def _zone_from_feature(feature):
+    props = feature.get("properties") or {}
+    geom = feature.get("geometry") or {}
+    if geom.get("type") == "Polygon":
+        raw_polygons = [geom["coordinates"]]
+    elif geom.get("type") == "MultiPolygon":
+        raw_polygons = geom["coordinates"]
+    else:
+        return None
+    polygons = [[[(float(p[0]), float(p[1])) for p in ring] for ring in poly] for poly in raw_polygons if poly]
+    if not polygons:
+        return None
+    return Zone(
+        props.get("id") or props.get("name"),
+        props.get("name") or props.get("id"),
+        (props.get("type") or "RESTRICTED").upper(),
+        props.get("floor_ft"),
+        props.get("ceiling_ft"),
+        polygons,
+        props
+    )
+
+# --- 2. R-TREE (Sort-Tile-Recursive bulk load, read-only) ---
+class RTree:
+    def __init__(self, items, capacity=NODE_CAPACITY):
+        """items: [(bbox, value)] with bbox = (minx, miny, maxx, maxy)."""
+        self.size = len(items)
+        level = [(bbox, value, None) for bbox, value in items]
+        while len(level) > capacity:
+            level = self._pack(level, capacity)
+        self.root = (self._union([n[0] for n in level]), None, level) if level else None
+
+    @staticmethod
+    def _union(boxes):
+        return (min(b[0] for b in boxes), min(b[1] for b in boxes), max(b[2] for b in boxes), max(b[3] for b in boxes))
+
+    def _pack(self, nodes, capacity):
+        nodes = sorted(nodes, key=lambda n: n[0][0] + n[0][2])
+        slices = math.ceil(math.sqrt(math.ceil(len(nodes) / capacity)))
+        per_slice = slices * capacity
+        parents = []
+        for s in range(0, len(nodes), per_slice):
+            column = sorted(nodes[s:s + per_slice], key=lambda n: n[0][1] + n[0][3])
+            for c in range(0, len(column), capacity):
+                children = column[c:c + capacity]
+                parents.append((self._union([n[0] for n in children]), None, children))
+        return parents
+
+    def query(self, minx, miny, maxx, maxy):
+        """Values whose bbox intersects the given one."""
+        if self.root is None:
+            return []
+        found, stack = [], [self.root]
+        while stack:
+            bbox, value, children = stack.pop()
+            if bbox[0] > maxx or bbox[2] < minx or bbox[1] > maxy or bbox[3] < miny:
+                continue
+            if children is None:
+                found.append(value)
+            else:
+                stack.extend(children)
+        return found
+
+# --- 3. INDEX ---
+class AirspaceIndex:
+    """
+    Zone polygons (with floor/ceiling) from GeoJSON, indexed by bounding box.
+    A query only measures the handful of zones whose box is within the
+    proximity buffer, so the cost stays flat as the zone set grows.
+    """
+    def __init__(self, path=AIRSPACE_GEOJSON):
+        self.path = path
+        self.zones = {}
+        self.tree = RTree([])
+        self.digest = None
+        self.loaded = False
+        self._lock = threading.Lock()
+
+    def load(self):
+        with self._lock:
+            if self.loaded:
+                return
+            started = time.perf_counter()
+            try:
+                with open(self.path) as f:
+                    features = json.load(f).get("features", [])
+            except Exception as e:
+                logger.error(f"AIRSPACE: Could not read {self.path}: {e}")
+                features = []
+            self.replace([_zone_from_feature(f) for f in features])
+            self.loaded = True
+            logger.info(f"🗺️ AIRSPACE: {len(self.zones)} zones indexed in {time.perf_counter() - started:.2f}s")
+
+    def replace(self, zones):
+        zones = {z.id: z for z in zones if z is not None}
+        # Built before the swap: queries never see a half-built tree
+        self.zones, self.tree = zones, RTree([(z.bbox, z) for z in zones.values()])
+        self.digest = zone_set_digest(zones.values())
+
+    def _ensure(self):
+        if not self.loaded:
+            self.load()
+
+    def zones_near(self, lat, lon, buffer_nm=PROXIMITY_BUFFER_NM):
+        """[(zone, inside, boundary_nm)] for zones containing the point or within buffer_nm of their boundary."""
+        self._ensure()
+        d_lat = buffer_nm / 60
+        d_lon = buffer_nm / (60 * max(math.cos(math.radians(lat)), 0.01))
+        results = []
+        for zone in self.tree.query(lon - d_lon, lat - d_lat, lon + d_lon, lat + d_lat):
+            inside = zone.contains(lon, lat)
+            dist = zone.boundary_distance_nm(lon, lat)
+            if inside or dist <= buffer_nm:
+                results.append((zone, inside, dist))
+        # Containing zones first, then by distance to the boundary
+        results.sort(key=lambda r: (not r[1], r[2]))
+        return results
+
+    def warnings(self, target_code, lat, lon):
+        return [format_warning(zone, inside, dist, target_code) for zone, inside, dist in self.zones_near(lat, lon)]
+
+def format_warning(zone, inside, dist, target_code):
+    # 1. DIRECT HIT
+    if inside:
+        if zone.type == "PROHIBITED":
+            return f"CRITICAL: {target_code} is located within the {zone.name} ({zone.altitudes()}, {dist:.1f}nm inside the boundary). Flight strictly restricted; special procedures required."
+        return f"WARNING: {target_code} is located within the {zone.name} ({zone.altitudes()}). Special procedures required."
+    # 2. PROXIMITY WARNING (Buffer outside the boundary)
+    return f"ADVISORY: {target_code} is just outside ({dist:.1f}nm from the boundary) of the {zone.name} ({zone.altitudes()}). Exercise caution near boundary."
+
+# --- 4. PRECOMPUTED AIRPORT TABLE ---
+class AirportAirspaceTable:
+    """
+    Zone hits for every catalog airport, computed once per zone set (and
+    airport catalog). Answers 'what is near airport X' and 'which airports
+    are in zone Y' with dict lookups; TFRs stay query-time since they change.
+    """
+    def __init__(self, path=AIRSPACE_TABLE):
+        self.path = path
+        self.digest = None
+        self.source = None
+        self.by_airport = {}  # code -> [(zone_id, inside, dist_nm)]
+        self.by_zone = {}     # zone_id -> [(code, inside, dist_nm)]
+
+    @staticmethod
+    def table_digest(index, catalog_version):
+        return f"{index.digest}:{catalog_version}"
+
+    def is_current(self, index):
+        return self.digest is not None and self.digest.split(":")[0] == index.digest
+
+    def compute(self, index, catalogs):
+        """Blocking: {code: [(zone_id, inside, dist_nm)]} for catalog airports with any hit."""
+        table = {}
+        seen = set()
+        for catalog in catalogs:
+            for code, data in catalog.items():
+                if code in seen:
+                    continue
+                seen.add(code)
+                try:
+                    lat, lon = float(data['lat']), float(data['lon'])
+                except (KeyError, TypeError, ValueError):
+                    continue
+                hits = [(zone.id, inside, round(dist, 2)) for zone, inside, dist in index.zones_near(lat, lon)]
+                if hits:
+                    table[code] = hits
+        return table
+
+    def _set(self, table, digest, source):
+        by_zone = {}
+        for code, hits in table.items():
+            for zone_id, inside, dist in hits:
+                by_zone.setdefault(zone_id, []).append((code, inside, dist))
+        for rows in by_zone.values():
+            rows.sort(key=lambda r: (not r[1], r[2], r[0]))
+        self.by_airport, self.by_zone, self.digest, self.source = table, by_zone, digest, source
+
+    def load_or_build(self, index, catalogs, catalog_version, write=False):
+        """Uses the build-time file if it matches this zone set and catalog, else recomputes."""
+        started = time.perf_counter()
+        digest = self.table_digest(index, catalog_version)
+        try:
+            with open(self.path) as f:
+                stored = json.load(f)
+            if stored.get("digest") == digest:
+                table = {code: [tuple(h) for h in hits] for code, hits in stored["airports"].items()}
+                self._set(table, digest, "file")
+                logger.info(f"🗺️ AIRSPACE: Airport table loaded ({len(table)} airports near zones).")
+                return
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"AIRSPACE: Ignoring unreadable airport table: {e}")
+
+        table = self.compute(index, catalogs)
+        self._set(table, digest, "computed")
+        logger.info(f"🗺️ AIRSPACE: Airport table computed ({len(table)} airports near zones) in {time.perf_counter() - started:.1f}s")
+        if write:
+            with open(self.path, "w") as f:
+                json.dump({"digest": digest, "airports": table}, f, separators=(",", ":"))
+
+    def lookup(self, code):
+        return self.by_airport.get(code, [])
+
+    def airports_in(self, zone_id):
+        return self.by_zone.get(zone_id, [])
+
+airspace = AirspaceIndex()
+airspace_table = AirportAirspaceTable()
+
+if __name__ == "__main__":
+    # Build step: python -m app.core.airspace
+    import sys
+    from app.core.geography import airports_icao, airports_lid, catalog_version
+    logging.basicConfig(level=logging.INFO)
+    airspace.load()
+    if os.path.exists(airspace_table.path):
+        os.remove(airspace_table.path)
+    airspace_table.load_or_build(airspace, (airports_icao, airports_lid), catalog_version(), write=True)
+    print(f"Wrote {airspace_table.path}", file=sys.stderr)
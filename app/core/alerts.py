@@ -0,0 +1,112 @@
+import time
+import asyncio
+import logging
+import datetime
+from app.core.db import redis_client
+from app.core.notifications import notifier
+
+logger = logging.getLogger(__name__)
+
+# Event type -> window length (seconds). One summary alert per window.
+AGGREGATED_EVENTS = {
+    "rate_limit": 300,
+    "error": 300,
+}
+FLUSH_INTERVAL = 5
+# Give the last worker flushes time to land before a window is summarised
+EMIT_GRACE_SECONDS = 15
+# How many closed windows to look back for (covers a leader outage)
+MAX_BACKLOG_WINDOWS = 12
+SUMMARY_TOP_KEYS = 10
+
+class AlertAggregator:
+    """
+    Counts noisy events (per type and key) instead of alerting on each one.
+    record() is a local dict update, so request handlers never wait on
+    notification I/O. Counts are flushed to Redis hashes per window, and
+    the scheduler's alert_summaries job sends one summary per closed window.
+    """
+    def __init__(self):
+        self._counts = {}
+        self._samples = {}
+        self._task = None
+
+    def record(self, event_type, key, sample=""):
+        window = AGGREGATED_EVENTS.get(event_type)
+        if not window:
+            return
+        bucket = (event_type, int(time.time() // window), str(key)[:120])
+        self._counts[bucket] = self._counts.get(bucket, 0) + 1
+        self._samples.setdefault(bucket, str(sample)[:300])
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(FLUSH_INTERVAL)
+            await self.flush()
+
+    async def flush(self):
+        if not self._counts:
+            return
+        counts, samples = self._counts, self._samples
+        self._counts, self._samples = {}, {}
+
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                for (event_type, window_id, key), count in counts.items():
+                    ttl = AGGREGATED_EVENTS[event_type] * (MAX_BACKLOG_WINDOWS + 2)
+                    base = f"alerts:{event_type}:{window_id}"
+                    pipe.hincrby(base, key, count)
+                    pipe.hsetnx(f"{base}:samples", key, samples[(event_type, window_id, key)])
+                    pipe.expire(base, ttl)
+                    pipe.expire(f"{base}:samples", ttl)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"ALERT AGGREGATOR FLUSH FAILED ({sum(counts.values())} events lost): {e}")
+
+    async def emit_summaries(self):
+        """Scheduler job: one summary alert per closed window, per event type."""
+        now = time.time()
+        for event_type, window in AGGREGATED_EVENTS.items():
+            last_closed = int((now - EMIT_GRACE_SECONDS) // window) - 1
+            marker_key = f"alerts:{event_type}:last_emitted"
+            last_emitted = await redis_client.get(marker_key)
+            first = last_closed - MAX_BACKLOG_WINDOWS + 1
+            if last_emitted:
+                first = max(first, int(last_emitted) + 1)
+
+            for window_id in range(first, last_closed + 1):
+                base = f"alerts:{event_type}:{window_id}"
+                counts = await redis_client.hgetall(base)
+                if counts:
+                    samples = await redis_client.hgetall(f"{base}:samples")
+                    subject, body = self._format_summary(event_type, window, window_id, counts, samples)
+                    await notifier.send_alert(event_type, subject, body)
+                await redis_client.set(marker_key, window_id)
+
+    def _format_summary(self, event_type, window, window_id, counts, samples):
+        ranked = sorted(((k, int(v)) for k, v in counts.items()), key=lambda kv: kv[1], reverse=True)
+        total = sum(c for _, c in ranked)
+
+        def fmt(ts):
+            return datetime.datetime.fromtimestamp(ts, datetime.timezone.utc).strftime("%H:%MZ")
+
+        start = window_id * window
+        subject = f"{total} x {event_type} ({fmt(start)}-{fmt(start + window)})"
+        lines = [f"{total} '{event_type}' events from {len(ranked)} distinct keys between {fmt(start)} and {fmt(start + window)}:"]
+        for key, count in ranked[:SUMMARY_TOP_KEYS]:
+            lines.append(f"- {key}: {count}x  (e.g. {samples.get(key, '')})")
+        if len(ranked) > SUMMARY_TOP_KEYS:
+            lines.append(f"... (+ {len(ranked) - SUMMARY_TOP_KEYS} more keys)")
+        return subject, "\n".join(lines)
+
+alert_aggregator = AlertAggregator()
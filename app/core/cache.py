@@ -1,10 +1,19 @@
-import json
+import gzip
+import time
+import hashlib
 import datetime
+import orjson
 from app.core.db import database
+from app.core.responses import dumps
 
 # Default fallback if no TTL specified (30 mins)
 DEFAULT_TTL = 30 * 60
 
+# valid_until is a real Unix time (time.time()), so every reader can compare it
+# with its own clock; `timestamp` stays naive UTC like the other TIMESTAMP columns.
+def _utc_naive():
+    return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+
 def get_plane_category(plane_input: str) -> str:
     p = plane_input.lower().strip()
     if any(x in p for x in ['boeing', 'airbus', '737', '747', 'a320', 'gulfstream', 'global', 'crj', 'erj']):
@@ -13,97 +22,101 @@ def get_plane_category(plane_input: str) -> str:
         return "MEDIUM"
     return "SMALL"
 
-async def get_cached_report(icao: str, plane_input: str, weather_source: str = None):
+def get_cache_key(icao: str, plane_input: str, weather_source: str = None):
     category = get_plane_category(plane_input)
-    
+
     # Context-Aware Key Generation
     if weather_source and weather_source.upper() != icao.upper():
-        cache_key = f"{icao.upper()}_src_{weather_source.upper()}_{category}"
-    else:
-        cache_key = f"{icao.upper()}_{category}"
-    
-    query = "SELECT * FROM flight_cache WHERE key = :key"
-    row = await database.fetch_one(query=query, values={"key": cache_key})
-    
+        return f"{icao.upper()}_src_{weather_source.upper()}_{category}", category
+    return f"{icao.upper()}_{category}", category
+
+async def get_cached_report(icao: str, plane_input: str, weather_source: str = None):
+    """
+    Returns the stored response for a live entry, or None:
+    {"key", "body" (gzip JSON bytes), "etag", "valid_until", "weather_source", "wx_fingerprint"}
+    The body is served as-is (see app.core.responses.cached_report_response).
+    """
+    cache_key, _ = get_cache_key(icao, plane_input, weather_source)
+
+    query = """
+        SELECT key, body, etag, valid_until, weather_source, wx_fingerprint FROM flight_cache
+        WHERE key = :key AND body IS NOT NULL AND valid_until > :now
+    """
+    row = await database.fetch_one(query=query, values={"key": cache_key, "now": time.time()})
+
     if not row:
         return None
-        
-    data = json.loads(row['data'])
-    
-    # --- SMART TTL CHECK ---
-    # Check if this specific record has an expiration time
-    valid_until_ts = data.get('valid_until')
-    
-    now = datetime.datetime.utcnow().timestamp()
-    
-    if valid_until_ts:
-        # Smart Cache Logic: Respect the stamp
-        if now > valid_until_ts:
-            return None
-    else:
-        # Fallback Logic: Old records (30 min default)
-        stored_time = row['timestamp']
-        if stored_time.tzinfo is None:
-            # Assume stored_time is naive UTC
-            stored_ts = stored_time.replace(tzinfo=datetime.timezone.utc).timestamp()
-        else:
-            stored_ts = stored_time.timestamp()
-            
-        age = now - stored_ts
-        if age > DEFAULT_TTL:
-            return None
-
-    return data
-
-async def save_cached_report(icao: str, plane_input: str, data: dict, ttl_seconds: int = DEFAULT_TTL, weather_source: str = None):
-    category = get_plane_category(plane_input)
-    
-    # Context-Aware Key Generation
-    if weather_source and weather_source.upper() != icao.upper():
-        cache_key = f"{icao.upper()}_src_{weather_source.upper()}_{category}"
-    else:
-        cache_key = f"{icao.upper()}_{category}"
-    
+    return dict(row)
+
+def decode_cached_report(entry: dict) -> dict:
+    """The stored report as a dict (for responses that embed it instead of serving the bytes)."""
+    return orjson.loads(gzip.decompress(entry["body"]))
+
+async def save_cached_report(icao: str, plane_input: str, data: dict, ttl_seconds: int = DEFAULT_TTL, weather_source: str = None, fingerprint: str = None):
+    """
+    Serializes the report once, as it will be served from cache
+    (is_cached already set), and stores it gzip-compressed.
+    Also stamps data['valid_until'] for the live response.
+    """
     # Inject Expiration Stamp into the Data Blob
-    now = datetime.datetime.utcnow()
-    valid_until = now + datetime.timedelta(seconds=ttl_seconds)
-    data['valid_until'] = valid_until.timestamp()
-    
+    valid_until = time.time() + ttl_seconds
+    data['valid_until'] = valid_until
+
+    raw = dumps({**data, "is_cached": True})
+    entry = {
+        "body": gzip.compress(raw, compresslevel=6, mtime=0),
+        "etag": f'"{hashlib.sha1(raw).hexdigest()[:20]}"',
+        "weather_source": data.get('raw_data', {}).get('weather_source'),
+        "wx_fingerprint": fingerprint,
+    }
+    await _store(icao, plane_input, entry, weather_source, valid_until)
+
+async def copy_cached_report(entry: dict, icao: str, plane_input: str, ttl_seconds: int = DEFAULT_TTL, weather_source: str = None):
+    """Stores an existing entry's bytes under another key (no re-serialization)."""
+    await _store(icao, plane_input, entry, weather_source, time.time() + ttl_seconds)
+
+async def _store(icao, plane_input, entry, weather_source, valid_until):
+    cache_key, category = get_cache_key(icao, plane_input, weather_source)
     query = """
-        INSERT INTO flight_cache (key, icao, category, timestamp, data)
-        VALUES (:key, :icao, :category, :ts, :data)
-        ON CONFLICT (key) DO UPDATE 
-        SET timestamp = :ts, data = :data
+        INSERT INTO flight_cache (key, icao, category, timestamp, body, etag, valid_until, weather_source, wx_fingerprint)
+        VALUES (:key, :icao, :category, :ts, :body, :etag, :valid_until, :weather_source, :wx_fingerprint)
+        ON CONFLICT (key) DO UPDATE
+        SET timestamp = :ts, data = NULL, body = :body, etag = :etag,
+            valid_until = :valid_until, weather_source = :weather_source, wx_fingerprint = :wx_fingerprint
     """
-    
+
     values = {
         "key": cache_key,
         "icao": icao.upper(),
         "category": category,
-        "ts": now, # Stored for reference/sorting
-        "data": json.dumps(data)
+        "ts": _utc_naive(), # Stored for reference/sorting
+        "body": entry["body"],
+        "etag": entry["etag"],
+        "valid_until": valid_until,
+        "weather_source": entry["weather_source"],
+        "wx_fingerprint": entry.get("wx_fingerprint")
     }
-    
+
     await database.execute(query, values)
 
 async def clear_expired_cache():
     """
     Surgical cleanup of expired cache entries.
-    1. Deletes rows where 'valid_until' in JSON has passed.
+    1. Deletes rows whose valid_until has passed.
     2. Deletes ANY row older than 24 hours (Hard Cleanup).
     """
-    now = datetime.datetime.utcnow().timestamp()
-    
+    now = time.time()
+
     # CHANGED: Added OR condition to force delete anything older than 24 hours
     query = """
-        DELETE FROM flight_cache 
-        WHERE (data::jsonb->>'valid_until')::float < :now
+        DELETE FROM flight_cache
+        WHERE valid_until < :now OR valid_until IS NULL
         OR timestamp < NOW() - INTERVAL '24 hours'
     """
-    
+
     try:
         count = await database.execute(query, values={"now": now})
         if count:
             print(f"🧹 CACHE CLEANUP: Removed {count} expired/old records.")
     except Exception as e:
-        print(f"❌ CLEANUP ERROR: {e}")
\ No newline at end of file
+        print(f"❌ CLEANUP ERROR: {e}")
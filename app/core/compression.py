@@ -0,0 +1,127 @@
+import gzip
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Brotli is optional: without it everything negotiates down to gzip
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5           # On-the-fly responses (speed over ratio)
+BROTLI_QUALITY_STATIC = 11   # Precompressed static assets (done once)
+
+def supported_encodings():
+    return ("br", "gzip") if brotli else ("gzip",)
+
+def negotiate_encoding(accept_encoding, available=None):
+    """
+    Picks the best encoding the client accepts, preferring br over gzip.
+    Returns None for identity.
+    """
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        token, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        accepted[token.strip()] = q
+
+    for encoding in available or supported_encodings():
+        q = accepted.get(encoding, accepted.get("*", 0.0))
+        if q > 0:
+            return encoding
+    return None
+
+def compress(data, encoding, static=False):
+    if encoding == "br":
+        return brotli.compress(data, quality=BROTLI_QUALITY_STATIC if static else BROTLI_QUALITY)
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=9 if static else GZIP_LEVEL, mtime=0)
+    return data
+
+# --- RESPONSE COMPRESSION (ASGI middleware) ---
+# Below this, headers + CPU outweigh the bytes saved
+MIN_RESPONSE_BYTES = 1024
+COMPRESSIBLE_RESPONSE_TYPES = (b"application/json", b"text/", b"application/javascript", b"image/svg+xml")
+
+class CompressionMiddleware:
+    """
+    Negotiated br/gzip for buffered responses above MIN_RESPONSE_BYTES.
+    Streaming bodies (SSE, exports) and responses that already carry a
+    Content-Encoding (precompressed static files) pass through untouched.
+    """
+    def __init__(self, app, minimum_size=MIN_RESPONSE_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        accept = ""
+        for name, value in scope.get("headers", []):
+            if name == b"accept-encoding":
+                accept = value.decode("latin-1")
+                break
+        encoding = negotiate_encoding(accept)
+        if not encoding:
+            return await self.app(scope, receive, send)
+
+        start_message = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                return await send(message)
+
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+
+            if message["type"] == "http.response.body" and start_message is not None:
+                body = message.get("body", b"")
+                headers = dict(start_message.get("headers", []))
+                content_type = headers.get(b"content-type", b"")
+                eligible = (
+                    not message.get("more_body", False)
+                    and len(body) >= self.minimum_size
+                    and b"content-encoding" not in headers
+                    and content_type.startswith(COMPRESSIBLE_RESPONSE_TYPES)
+                )
+                if not eligible:
+                    passthrough = True
+                    await send(start_message)
+                    return await send(message)
+
+                data = compress(body, encoding)
+                raw_headers = [
+                    (k, v) for k, v in start_message.get("headers", [])
+                    if k not in (b"content-length", b"vary")
+                ]
+                vary = headers.get(b"vary")
+                raw_headers += [
+                    (b"content-encoding", encoding.encode()),
+                    (b"content-length", str(len(data)).encode()),
+                    (b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding"),
+                ]
+                # A strong ETag describes the identity bytes; the encoded body only matches weakly
+                raw_headers = [
+                    (k, b"W/" + v if k == b"etag" and v.startswith(b'"') else v)
+                    for k, v in raw_headers
+                ]
+                passthrough = True
+                await send({**start_message, "headers": raw_headers})
+                return await send({"type": "http.response.body", "body": data})
+
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -14,101 +14,51 @@ database = Database(DATABASE_URL)
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 redis_client = redis.from_url(REDIS_URL, decode_responses=True)
 
-async def init_db_tables():
-    """
-    Creates tables if they don't exist and adds performance indices.
-    """
-    query_logs = """
-    CREATE TABLE IF NOT EXISTS logs (
-        id SERIAL PRIMARY KEY,
-        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        client_id TEXT,
-        ip_address TEXT,
-        input_icao TEXT,
-        resolved_icao TEXT,
-        plane_profile TEXT,
-        duration_seconds REAL,
-        status TEXT,
-        error_message TEXT,
-        model_used TEXT,
-        tokens_used INTEGER
-    );
-    """
-    
-    query_cache = """
-    CREATE TABLE IF NOT EXISTS flight_cache (
-        key TEXT PRIMARY KEY,
-        icao TEXT,
-        category TEXT,
-        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        data TEXT
-    );
-    """
-    
-    query_settings = """
-    CREATE TABLE IF NOT EXISTS system_settings (
-        key TEXT PRIMARY KEY,
-        value TEXT,
-        description TEXT
-    );
-    """
-    
-    query_notif = """
-    CREATE TABLE IF NOT EXISTS notification_rules (
-        event_type TEXT PRIMARY KEY,
-        channels TEXT,
-        enabled INTEGER DEFAULT 1
-    );
-    """
+# 3. HOURLY ROLLUPS (Admin Dashboard)
+# Maintained incrementally by the log writer (app.core.logger).
+# Table -> dimension column; one row per hour per dimension value.
+ROLLUP_TABLES = {
+    "logs_hourly": "status",
+    "logs_hourly_icao": "input_icao",
+    "logs_hourly_client": "client_id",
+}
+# Latency histogram per hour, so percentiles survive the rollup.
+# Bin i counts durations below LATENCY_BINS[i] (seconds); the last bin is everything above.
+LATENCY_ROLLUP_TABLE = "logs_hourly_latency"
+LATENCY_BINS = [0.1, 0.25, 0.5, 1, 2, 3, 5, 8, 13, 20, 30, 45, 60]
 
-    # --- NEW KIOSK TABLE (Client-Centric) ---
-    # We drop the old one to ensure clean migration as requested
-    await database.execute("DROP TABLE IF EXISTS kiosk_airports")
+# 4. REQUEST LOGS
+# Daily range partitions on `timestamp`; id comes from a shared sequence
+LOGS_PARENT_DDL = """
+CREATE TABLE IF NOT EXISTS logs (
+    id INTEGER NOT NULL DEFAULT nextval('logs_id_seq'),
+    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    client_id TEXT,
+    ip_address TEXT,
+    input_icao TEXT,
+    resolved_icao TEXT,
+    plane_profile TEXT,
+    duration_seconds REAL,
+    status TEXT,
+    error_message TEXT,
+    model_used TEXT,
+    tokens_used INTEGER,
+    weather_icao TEXT,
+    expiration_timestamp TIMESTAMP,
+    duration_wx REAL,
+    duration_notams REAL,
+    duration_ai REAL,
+    duration_alt REAL
+) PARTITION BY RANGE (timestamp);
+"""
 
-    query_kiosk = """
-    CREATE TABLE IF NOT EXISTS kiosk_profiles (
-        slug TEXT PRIMARY KEY,       -- The URL identifier (e.g. 'boston-flight-academy')
-        target_icao TEXT,            -- The actual airport (e.g. 'KBOS')
-        weather_override_icao TEXT,  -- Optional: Force weather from here (e.g. 'KJFK')
-        title_override TEXT,         -- Optional: 'Bob's Flight School'
-        default_profile TEXT DEFAULT 'small',
-        config_options TEXT,         -- JSON for flags (show_notams, etc)
-        subscriber_name TEXT,
-        is_active INTEGER DEFAULT 1,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    );
-    """
-    
-    # 1. Base Tables (Safe to run concurrently with IF NOT EXISTS)
-    try:
-        async with database.transaction():
-            await database.execute(query_logs)
-            await database.execute(query_cache)
-            await database.execute(query_settings)
-            await database.execute(query_notif)
-            await database.execute(query_kiosk)
-            
-            await database.execute("CREATE INDEX IF NOT EXISTS idx_logs_timestamp ON logs(timestamp)")
-            await database.execute("CREATE INDEX IF NOT EXISTS idx_logs_client_id ON logs(client_id)")
-            await database.execute("CREATE INDEX IF NOT EXISTS idx_logs_input_icao ON logs(input_icao)")
-    except Exception as e:
-        # It's fine if this fails on race conditions, tables likely exist
-        logger.info(f"Table Init Race Condition (Harmless): {e}")
-
-    # 2. Migrations (Run individually to prevent Deadlocks)
-    # We run these outside the transaction so if one blocks/fails, it doesn't kill the whole app boot
-    migration_queries = [
-        "ALTER TABLE logs ADD COLUMN IF NOT EXISTS weather_icao TEXT",
-        "ALTER TABLE logs ADD COLUMN IF NOT EXISTS expiration_timestamp TIMESTAMP",
-        "ALTER TABLE logs ADD COLUMN IF NOT EXISTS duration_wx REAL",
-        "ALTER TABLE logs ADD COLUMN IF NOT EXISTS duration_notams REAL",
-        "ALTER TABLE logs ADD COLUMN IF NOT EXISTS duration_ai REAL",
-        "ALTER TABLE logs ADD COLUMN IF NOT EXISTS duration_alt REAL"
-    ]
-
-    for q in migration_queries:
-        try:
-            await database.execute(q)
-        except Exception:
-            # If it fails (deadlock or already done), just ignore and move on
-            pass
\ No newline at end of file
+LOG_INDEXES = {
+    "idx_logs_id": "id",
+    "idx_logs_timestamp": "timestamp",
+    "idx_logs_client_id": "client_id",
+    "idx_logs_input_icao": "input_icao",
+    # Keyset pagination: equality filter + (timestamp, id) DESC cursor (admin logs viewer)
+    "idx_logs_status_ts": "status, timestamp",
+    "idx_logs_input_icao_ts": "input_icao, timestamp",
+    "idx_logs_client_id_ts": "client_id, timestamp",
+}
@@ -0,0 +1,130 @@
+import re
+import time
+import datetime
+import logging
+from app.core.db import database
+from app.core.weather import get_bulk_weather_data
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on a report's life if the watcher never sees a change
+# (quiet station, or the watcher itself is down)
+REPORT_MAX_TTL = 2 * 60 * 60
+# Reports built without any observation can't be watched
+REPORT_NO_OBS_TTL = 5 * 60
+# A METAR older than this missed its routine hourly issue: the station may have
+# stopped reporting, so the watcher can't be relied on to replace the report
+OBS_STALE_AFTER = 75 * 60
+# Stations per AviationWeather bulk request
+WATCH_BATCH_SIZE = 100
+
+ISSUE_TIME = re.compile(r"\b(\d{6})Z\b")
+
+def _issue_time(raw):
+    if not raw:
+        return ""
+    match = ISSUE_TIME.search(raw)
+    return match.group(1) if match else ""
+
+def _issued_at(stamp, now=None):
+    """Epoch seconds of a DDHHMM issue time (None if empty or unplaceable)."""
+    if not stamp:
+        return None
+    now = datetime.datetime.fromtimestamp(now if now is not None else time.time(), datetime.timezone.utc)
+    day, hour, minute = int(stamp[:2]), int(stamp[2:4]), int(stamp[4:])
+    # Issued this month, or last month if that would put it in the future
+    year, month = now.year, now.month
+    for _ in range(2):
+        try:
+            issued = datetime.datetime(year, month, day, hour, minute, tzinfo=datetime.timezone.utc)
+            if issued <= now + datetime.timedelta(hours=1):
+                return issued.timestamp()
+        except ValueError:
+            pass
+        year, month = (year - 1, 12) if month == 1 else (year, month - 1)
+    return None
+
+def observation_age(raw, now=None):
+    """Seconds since the METAR's DDHHMMZ issue time (None if it has none)."""
+    now = now if now is not None else time.time()
+    issued = _issued_at(_issue_time(raw), now)
+    return None if issued is None else max(0, now - issued)
+
+def _newer(stamp, than, now):
+    issued, reference = _issued_at(stamp, now), _issued_at(than, now)
+    return issued is not None and reference is not None and issued > reference
+
+def is_superseded(fingerprint, weather_data, now=None):
+    """
+    True if the feed has a strictly newer METAR, or a newer TAF, than the
+    report was built from. A feed without a TAF (or lagging behind) proves nothing.
+    """
+    if not weather_data or not weather_data.get("metar"):
+        return False
+    now = now if now is not None else time.time()
+    built_metar, _, built_taf = fingerprint.partition("|")
+    feed_metar, feed_taf = _issue_time(weather_data.get("metar")), _issue_time(weather_data.get("taf"))
+    if _newer(feed_metar, built_metar, now):
+        return True
+    # Built without a TAF and one is out now: that's new information too
+    return bool(feed_taf) and (not built_taf or _newer(feed_taf, built_taf, now))
+
+def report_ttl(weather_data, now=None):
+    """
+    REPORT_MAX_TTL for a report built from a current observation (the watcher
+    drops it on the next METAR/TAF); REPORT_NO_OBS_TTL without one, or when the
+    observation is already stale.
+    """
+    if not observation_fingerprint(weather_data):
+        return REPORT_NO_OBS_TTL
+    age = observation_age(weather_data.get("metar"), now)
+    if age is None or age > OBS_STALE_AFTER:
+        return REPORT_NO_OBS_TTL
+    return REPORT_MAX_TTL
+
+def observation_fingerprint(weather_data):
+    """
+    'METAR time|TAF issue time' (DDHHMM each) of the data a report was
+    built from. A SPECI or an amended TAF changes it.
+    """
+    if not weather_data or not weather_data.get("metar"):
+        return None
+    return f"{_issue_time(weather_data.get('metar'))}|{_issue_time(weather_data.get('taf'))}"
+
+async def watch_report_freshness():
+    """
+    Scheduler job: compares each cached station's latest METAR/TAF times
+    with what its reports were built from, and drops only the stale keys.
+    """
+    query = """
+        SELECT DISTINCT weather_source, wx_fingerprint FROM flight_cache
+        WHERE valid_until > :now AND weather_source IS NOT NULL AND wx_fingerprint IS NOT NULL
+    """
+    rows = await database.fetch_all(query, values={"now": time.time()})
+    cached = {}
+    for row in rows:
+        cached.setdefault(row["weather_source"], set()).add(row["wx_fingerprint"])
+    if not cached:
+        return
+
+    stations = sorted(cached)
+    latest = {}
+    for i in range(0, len(stations), WATCH_BATCH_SIZE):
+        latest.update(await get_bulk_weather_data(stations[i:i + WATCH_BATCH_SIZE]))
+
+    invalidated = 0
+    now = time.time()
+    for station, fingerprints in cached.items():
+        # Fetch failed or station not in the feed: nothing is superseded, keep until REPORT_MAX_TTL
+        stale = sorted(fp for fp in fingerprints if is_superseded(fp, latest.get(station), now))
+        if stale:
+            values = {"station": station, **{f"fp_{i}": fp for i, fp in enumerate(stale)}}
+            deleted = await database.fetch_all(
+                f"DELETE FROM flight_cache WHERE weather_source = :station "
+                f"AND wx_fingerprint IN ({', '.join(f':fp_{i}' for i in range(len(stale)))}) RETURNING key",
+                values=values
+            )
+            invalidated += len(deleted)
+
+    if invalidated:
+        logger.info(f"🔄 REPORT FRESHNESS: Invalidated {invalidated} cached reports on new observations.")
@@ -1,70 +1,104 @@
 import airportsdata
 import math
+import time
+import logging
+import threading
 import httpx
 import aeronavx
+from collections.abc import Mapping
+from app.core.airspace import airspace, airspace_table, format_warning
+from app.core.tfr import tfr_store
 
-# Load Databases
-print("DEBUG: Loading airport databases...")
-airports_icao = airportsdata.load('ICAO')
-airports_lid = airportsdata.load('LID')
-print(f"DEBUG: Loaded {len(airports_icao)} ICAO and {len(airports_lid)} LID airports.")
-
-# --- DEFINED AIRSPACE ZONES ---
-RESTRICTED_ZONES = {
-    "DC_SFRA": {
-        "name": "Washington DC SFRA",
-        "lat": 38.8512, "lon": -77.0377, "radius": 30, "type": "RESTRICTED"
-    },
-    "DC_FRZ": {
-        "name": "Washington DC Flight Restricted Zone (FRZ)",
-        "lat": 38.8512, "lon": -77.0377, "radius": 13, "type": "PROHIBITED"
-    },
-    "P_40": {
-        "name": "P-40 (Camp David)",
-        "lat": 39.6483, "lon": -77.4636, "radius": 5, "type": "PROHIBITED"
-    },
-    "P_47": {
-        "name": "P-47 (Pantex Nuclear Facility, TX)",
-        "lat": 35.3130, "lon": -101.5580, "radius": 4, "type": "PROHIBITED"
-    },
-    "P_49": {
-        "name": "P-49 (Crawford, TX)",
-        "lat": 31.5800, "lon": -97.4100, "radius": 5, "type": "PROHIBITED"
-    },
-    "P_50": {
-        "name": "P-50 (Kings Bay Sub Base, GA)",
-        "lat": 30.7967, "lon": -81.5200, "radius": 3, "type": "PROHIBITED"
-    },
-    "P_51": {
-        "name": "P-51 (Bangor Sub Base, WA)",
-        "lat": 47.7300, "lon": -122.7200, "radius": 4, "type": "PROHIBITED"
-    },
-    "DISNEY_FL": {
-        "name": "Disney World (The Mouse)",
-        "lat": 28.4179, "lon": -81.5812, "radius": 3, "type": "RESTRICTED"
-    },
-    "DISNEY_CA": {
-        "name": "Disneyland",
-        "lat": 33.8121, "lon": -117.9190, "radius": 3, "type": "RESTRICTED"
-    }
-}
-
-async def get_coords_from_awc(icao):
-    """Fallback: Ask FAA API (Async)."""
+logger = logging.getLogger(__name__)
+
+# --- AIRPORT DATABASES (Loaded on first use) ---
+class _LazyAirportDB(Mapping):
+    """
+    Read-only dict stand-in that parses the airportsdata table the first
+    time it is touched. Startup warms it in a thread (warm_airports) so the
+    event loop and the DB connect don't wait on it.
+    """
+    _lock = threading.Lock()
+
+    def __init__(self, code_type):
+        self.code_type = code_type
+        self._data = None
+
+    def _load(self):
+        if self._data is None:
+            with self._lock:
+                if self._data is None:
+                    started = time.perf_counter()
+                    self._data = airportsdata.load(self.code_type)
+                    logger.info(f"✈️  AIRPORTS: Loaded {len(self._data)} {self.code_type} airports in {time.perf_counter() - started:.2f}s")
+        return self._data
+
+    @property
+    def loaded(self):
+        return self._data is not None
+
+    def __getitem__(self, key):
+        return self._load()[key]
+
+    def __iter__(self):
+        return iter(self._load())
+
+    def __len__(self):
+        return len(self._load())
+
+    def __contains__(self, key):
+        return key in self._load()
+
+    def get(self, key, default=None):
+        return self._load().get(key, default)
+
+airports_icao = _LazyAirportDB('ICAO')
+airports_lid = _LazyAirportDB('LID')
+
+def warm_airports():
+    """Blocking: load both tables now (call via asyncio.to_thread)."""
+    airports_icao._load()
+    airports_lid._load()
+
+def airports_loaded():
+    return airports_icao.loaded and airports_lid.loaded
+
+def catalog_version():
+    return getattr(airportsdata, "__version__", "unknown")
+
+def warm_airspace():
+    """Blocking: zone index plus the per-airport zone table (waits for the airport tables)."""
+    airspace.load()
+    airspace_table.load_or_build(airspace, (airports_icao, airports_lid), catalog_version())
+
+async def get_coords_from_awc(icao, raise_errors=False):
+    """
+    Fallback: Ask FAA API (Async).
+    raise_errors lets callers tell 'unknown station' (None) from a failed lookup.
+    Prefer resolver.lookup_remote(), which caches this across workers.
+    """
     try:
         url = f"https://aviationweather.gov/api/data/station?ids={icao}&format=json"
         async with httpx.AsyncClient(timeout=5.0) as client:
             response = await client.get(url)
-            if response.status_code == 200:
-                data = response.json()
-                if data and isinstance(data, list) and len(data) > 0:
-                    return {
-                        "lat": float(data[0]["lat"]), 
-                        "lon": float(data[0]["lon"]),
-                        "name": data[0].get("site", icao)
-                    }
+            # Only a clean answer means "no such station": 429/403/5xx say nothing about it
+            if response.status_code == 204:
+                return None
+            if response.status_code != 200:
+                raise httpx.HTTPStatusError(f"AWC station lookup returned {response.status_code}", request=response.request, response=response)
+            data = response.json()
+            if not isinstance(data, list):
+                raise ValueError(f"Unexpected AWC station response: {type(data).__name__}")
+            if data:
+                return {
+                    "lat": float(data[0]["lat"]), 
+                    "lon": float(data[0]["lon"]),
+                    "name": data[0].get("site", icao)
+                }
     except Exception as e:
         print(f"DEBUG: API Lookup Error: {e}")
+        if raise_errors:
+            raise
     return None
 
 def calculate_distance(lat1, lon1, lat2, lon2):
@@ -79,24 +113,18 @@ def check_airspace_zones(target_code, target_lat, target_lon):
     """
     Checks if coordinates fall inside or near known restricted zones.
     Returns a list of warning strings using the target_code.
+    Zone shapes live in app/data/airspace.geojson (see app.core.airspace);
+    catalog airports read their precomputed hits, other points query the index.
+    Active TFRs come from the ingested FAA feed (see app.core.tfr).
     """
-    warnings = []
-    
-    for zone_id, zone in RESTRICTED_ZONES.items():
-        dist = calculate_distance(target_lat, target_lon, zone['lat'], zone['lon'])
-        
-        # 1. DIRECT HIT
-        if dist <= zone['radius']:
-            if zone['type'] == "PROHIBITED":
-                warnings.append(f"CRITICAL: {target_code} is located within the {zone['name']} ({dist:.1f}nm from center). Flight strictly restricted; special procedures required.")
-            else:
-                warnings.append(f"WARNING: {target_code} is located within the {zone['name']}. Special procedures required.")
-        
-        # 2. PROXIMITY WARNING (5nm Buffer)
-        elif dist <= (zone['radius'] + 5):
-             warnings.append(f"ADVISORY: {target_code} is just outside ({dist:.1f}nm from the center) of the {zone['name']}. Exercise caution near boundary.")
-
-    return warnings
+    if airspace_table.is_current(airspace) and (target_code in airports_icao or target_code in airports_lid):
+        warnings = [
+            format_warning(airspace.zones[zone_id], inside, dist, target_code)
+            for zone_id, inside, dist in airspace_table.lookup(target_code)
+        ]
+    else:
+        warnings = airspace.warnings(target_code, target_lat, target_lon)
+    return warnings + tfr_store.warnings(target_code, target_lat, target_lon)
 
 async def get_nearest_reporting_stations(target_code, limit=15):
     """
@@ -109,7 +137,11 @@ async def get_nearest_reporting_stations(target_code, limit=15):
     target = airports_icao.get(target_code) or airports_lid.get(target_code)
     
     if not target:
-        target = await get_coords_from_awc(target_code)
+        from app.core.resolver import resolver, RemoteLookupError
+        try:
+            target = await resolver.lookup_remote(target_code)
+        except RemoteLookupError:
+            target = None
 
     if not target:
         return []
@@ -1,27 +1,215 @@
+import json
+import bisect
+import asyncio
 import datetime
 import logging
-from app.core.db import database
+from app.core.db import database, redis_client, ROLLUP_TABLES, LATENCY_ROLLUP_TABLE, LATENCY_BINS
 
 logger = logging.getLogger(__name__)
 
-async def log_attempt(client_id, ip, input_icao, resolved_icao, plane, duration, status, error_msg=None, model=None, tokens=0, weather_icao=None, expiration=None, t_wx=0, t_notams=0, t_ai=0, t_alt=0):
-    query = """
-        INSERT INTO logs (
-            timestamp, client_id, ip_address, input_icao, resolved_icao, 
-            plane_profile, duration_seconds, status, error_message,
-            model_used, tokens_used, weather_icao, expiration_timestamp,
-            duration_wx, duration_notams, duration_ai, duration_alt
-        ) VALUES (
-            :timestamp, :client_id, :ip_address, :input_icao, :resolved_icao, 
-            :plane_profile, :duration_seconds, :status, :error_message, 
-            :model_used, :tokens_used, :weather_icao, :expiration_timestamp,
-            :t_wx, :t_notams, :t_ai, :t_alt
-        )
+LOG_COLUMNS = [
+    "timestamp", "client_id", "ip_address", "input_icao", "resolved_icao",
+    "plane_profile", "duration_seconds", "status", "error_message",
+    "model_used", "tokens_used", "weather_icao", "expiration_timestamp",
+    "duration_wx", "duration_notams", "duration_ai", "duration_alt"
+]
+
+# Flush triggers: whichever comes first
+BATCH_SIZE = 200
+FLUSH_INTERVAL = 1.0
+# Backpressure: rows beyond this are dropped (and counted) instead of blocking requests
+MAX_QUEUE = 10000
+
+# Live tail for the admin LiveLogs view (capped, approximate trimming)
+LOG_STREAM_KEY = "logs:stream"
+LOG_STREAM_MAXLEN = 5000
+
+class LogPipeline:
+    """
+    Per-worker write-behind buffer for the `logs` table.
+    Requests enqueue rows without awaiting Postgres; a background task
+    flushes them as multi-row INSERTs on a size or time trigger.
     """
-    
+    def __init__(self):
+        self.queue = asyncio.Queue(maxsize=MAX_QUEUE)
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flusher and write out whatever is still buffered."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        while not self.queue.empty():
+            await self.flush()
+
+    def enqueue(self, row):
+        try:
+            self.queue.put_nowait(row)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            if self.dropped % 1000 == 1:
+                logger.warning(f"⚠️  LOG QUEUE FULL: {self.dropped} rows dropped so far.")
+            return
+        if self.queue.qsize() >= BATCH_SIZE:
+            self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            while not self.queue.empty():
+                await self.flush()
+
+    async def flush(self):
+        batch = []
+        while len(batch) < BATCH_SIZE and not self.queue.empty():
+            batch.append(self.queue.get_nowait())
+        if not batch:
+            return
+
+        placeholders = []
+        values = {}
+        for i, row in enumerate(batch):
+            placeholders.append("(" + ", ".join(f":{col}_{i}" for col in LOG_COLUMNS) + ")")
+            for col in LOG_COLUMNS:
+                values[f"{col}_{i}"] = row[col]
+
+        query = f"INSERT INTO logs ({', '.join(LOG_COLUMNS)}) VALUES {', '.join(placeholders)} RETURNING id"
+
+        try:
+            async with database.transaction():
+                inserted = await database.fetch_all(query=query, values=values)
+                await update_rollups(batch)
+            self.written += len(batch)
+        except Exception as e:
+            self.failed += len(batch)
+            logger.error(f"❌ LOGGING FAILURE ({len(batch)} rows): {e}")
+            return
+
+        await publish_to_stream(batch, [r["id"] for r in inserted])
+
+    def stats(self):
+        return {
+            "queued": self.queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed
+        }
+
+log_pipeline = LogPipeline()
+
+async def publish_to_stream(batch, ids):
+    """Fan the committed rows out to the Redis stream read by /api/admin/logs/stream."""
+    def encode(value):
+        if isinstance(value, datetime.datetime):
+            return value.replace(tzinfo=datetime.timezone.utc).isoformat()
+        return value
+
+    try:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for row, row_id in zip(batch, ids):
+                payload = {col: encode(row[col]) for col in LOG_COLUMNS}
+                payload["id"] = row_id
+                pipe.xadd(LOG_STREAM_KEY, {"data": json.dumps(payload, default=str)}, maxlen=LOG_STREAM_MAXLEN, approximate=True)
+            await pipe.execute()
+    except Exception as e:
+        logger.warning(f"LOG STREAM PUBLISH FAILED: {e}")
+
+def latency_bin(seconds):
+    return bisect.bisect_right(LATENCY_BINS, seconds)
+
+def latency_percentile(bin_counts, q):
+    """
+    Upper bound (seconds) of the histogram bin holding the q-quantile, from
+    {bin: requests}. The open-ended last bin reports the largest bound.
+    """
+    total = sum(bin_counts.values())
+    if not total:
+        return None
+    seen = 0
+    for b in sorted(bin_counts):
+        seen += bin_counts[b]
+        if seen >= q * total:
+            return LATENCY_BINS[min(b, len(LATENCY_BINS) - 1)]
+
+async def update_rollups(batch):
+    """
+    Folds a batch of log rows into the hourly rollup tables.
+    Aggregated in Python first so each upsert touches every (bucket, value) once,
+    in sorted order so concurrent workers lock rows consistently.
+    """
+    for table, dim in ROLLUP_TABLES.items():
+        totals = {}
+        for row in batch:
+            bucket = row["timestamp"].replace(minute=0, second=0, microsecond=0)
+            key = (bucket, row[dim] or "")
+            agg = totals.setdefault(key, [0, 0.0, 0])
+            agg[0] += 1
+            agg[1] += row["duration_seconds"] or 0
+            if row["status"] == "RATE_LIMIT":
+                agg[2] += 1
+
+        placeholders = []
+        values = {}
+        for i, ((bucket, dim_val), (requests, latency_sum, rate_limited)) in enumerate(sorted(totals.items())):
+            placeholders.append(f"(:b_{i}, :d_{i}, :r_{i}, :l_{i}, :x_{i})")
+            values.update({
+                f"b_{i}": bucket, f"d_{i}": dim_val,
+                f"r_{i}": requests, f"l_{i}": latency_sum, f"x_{i}": rate_limited
+            })
+
+        query = f"""
+            INSERT INTO {table} (bucket, {dim}, requests, latency_sum, rate_limited)
+            VALUES {', '.join(placeholders)}
+            ON CONFLICT (bucket, {dim}) DO UPDATE SET
+            requests = {table}.requests + EXCLUDED.requests,
+            latency_sum = {table}.latency_sum + EXCLUDED.latency_sum,
+            rate_limited = {table}.rate_limited + EXCLUDED.rate_limited
+        """
+        await database.execute(query=query, values=values)
+
+    bins = {}
+    for row in batch:
+        if row["duration_seconds"] is None:
+            continue
+        bucket = row["timestamp"].replace(minute=0, second=0, microsecond=0)
+        key = (bucket, latency_bin(row["duration_seconds"]))
+        bins[key] = bins.get(key, 0) + 1
+    if not bins:
+        return
+
+    placeholders = []
+    values = {}
+    for i, ((bucket, b), requests) in enumerate(sorted(bins.items())):
+        placeholders.append(f"(:b_{i}, :n_{i}, :r_{i})")
+        values.update({f"b_{i}": bucket, f"n_{i}": b, f"r_{i}": requests})
+    query = f"""
+        INSERT INTO {LATENCY_ROLLUP_TABLE} (bucket, bin, requests)
+        VALUES {', '.join(placeholders)}
+        ON CONFLICT (bucket, bin) DO UPDATE SET
+        requests = {LATENCY_ROLLUP_TABLE}.requests + EXCLUDED.requests
+    """
+    await database.execute(query=query, values=values)
+
+async def log_attempt(client_id, ip, input_icao, resolved_icao, plane, duration, status, error_msg=None, model=None, tokens=0, weather_icao=None, expiration=None, t_wx=0, t_notams=0, t_ai=0, t_alt=0):
     # FIX: Use Naive UTC to match the "TIMESTAMP" column in Postgres (No Timezone)
     now_naive = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
-    
+
     # Ensure expiration is also Naive UTC if provided
     exp_naive = None
     if expiration:
@@ -30,7 +218,7 @@ async def log_attempt(client_id, ip, input_icao, resolved_icao, plane, duration,
         else:
              exp_naive = expiration
 
-    values = {
+    row = {
         "timestamp": now_naive,
         "client_id": client_id,
         "ip_address": ip,
@@ -44,15 +232,13 @@ async def log_attempt(client_id, ip, input_icao, resolved_icao, plane, duration,
         "tokens_used": tokens,
         "weather_icao": weather_icao,
         "expiration_timestamp": exp_naive,
-        "t_wx": t_wx,
-        "t_notams": t_notams,
-        "t_ai": t_ai,
-        "t_alt": t_alt
+        "duration_wx": t_wx,
+        "duration_notams": t_notams,
+        "duration_ai": t_ai,
+        "duration_alt": t_alt
     }
 
-    try:
-        await database.execute(query=query, values=values)
-        # Use logger but KEEP the exact emoji format
-        logger.info(f"📝 LOGGED: {input_icao} | {status}") 
-    except Exception as e:
-        logger.error(f"❌ LOGGING FAILURE: {e}")
\ No newline at end of file
+    # No I/O here: the row is written by the LogPipeline flusher
+    log_pipeline.enqueue(row)
+    # Use logger but KEEP the exact emoji format
+    logger.info(f"📝 LOGGED: {input_icao} | {status}")
@@ -0,0 +1,242 @@
+import time
+import asyncio
+import logging
+from app.core.db import database, ROLLUP_TABLES, LOGS_PARENT_DDL, LOG_INDEXES, LATENCY_ROLLUP_TABLE, LATENCY_BINS
+
+logger = logging.getLogger(__name__)
+
+# Serialises migrations across workers (and containers sharing the database)
+MIGRATION_LOCK_ID = 4642_0037
+
+# --- 1. MIGRATIONS ---
+# Append-only: never edit a shipped step, add a new version instead.
+
+async def _base_schema():
+    await database.execute("CREATE SEQUENCE IF NOT EXISTS logs_id_seq")
+    await database.execute(LOGS_PARENT_DDL)
+    await database.execute("ALTER SEQUENCE logs_id_seq OWNED BY logs.id")
+
+    await database.execute("""
+    CREATE TABLE IF NOT EXISTS flight_cache (
+        key TEXT PRIMARY KEY,
+        icao TEXT,
+        category TEXT,
+        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        data TEXT
+    );
+    """)
+
+    await database.execute("""
+    CREATE TABLE IF NOT EXISTS system_settings (
+        key TEXT PRIMARY KEY,
+        value TEXT,
+        description TEXT
+    );
+    """)
+
+    await database.execute("""
+    CREATE TABLE IF NOT EXISTS notification_rules (
+        event_type TEXT PRIMARY KEY,
+        channels TEXT,
+        enabled INTEGER DEFAULT 1
+    );
+    """)
+
+    # Old airport-centric kiosk table, replaced by kiosk_profiles
+    await database.execute("DROP TABLE IF EXISTS kiosk_airports")
+    await database.execute("""
+    CREATE TABLE IF NOT EXISTS kiosk_profiles (
+        slug TEXT PRIMARY KEY,       -- The URL identifier (e.g. 'boston-flight-academy')
+        target_icao TEXT,            -- The actual airport (e.g. 'KBOS')
+        weather_override_icao TEXT,  -- Optional: Force weather from here (e.g. 'KJFK')
+        title_override TEXT,         -- Optional: 'Bob's Flight School'
+        default_profile TEXT DEFAULT 'small',
+        config_options TEXT,         -- JSON for flags (show_notams, etc)
+        subscriber_name TEXT,
+        is_active INTEGER DEFAULT 1,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    """)
+
+    for table, dim in ROLLUP_TABLES.items():
+        await database.execute(f"""
+        CREATE TABLE IF NOT EXISTS {table} (
+            bucket TIMESTAMP NOT NULL,
+            {dim} TEXT NOT NULL,
+            requests INTEGER DEFAULT 0,
+            latency_sum REAL DEFAULT 0,
+            rate_limited INTEGER DEFAULT 0,
+            PRIMARY KEY (bucket, {dim})
+        );
+        """)
+
+    for name, cols in LOG_INDEXES.items():
+        await database.execute(f"CREATE INDEX IF NOT EXISTS {name} ON logs({cols})")
+
+async def _log_timing_columns():
+    # Databases created before these columns were part of the logs DDL
+    for column, col_type in [
+        ("weather_icao", "TEXT"),
+        ("expiration_timestamp", "TIMESTAMP"),
+        ("duration_wx", "REAL"),
+        ("duration_notams", "REAL"),
+        ("duration_ai", "REAL"),
+        ("duration_alt", "REAL"),
+    ]:
+        await database.execute(f"ALTER TABLE logs ADD COLUMN IF NOT EXISTS {column} {col_type}")
+
+async def _partition_logs():
+    from app.core.partitions import convert_legacy_table
+    await convert_legacy_table()
+
+async def _backfill_rollups():
+    has_rollups = await database.fetch_val("SELECT EXISTS (SELECT 1 FROM logs_hourly)")
+    if has_rollups:
+        return
+    for table, dim in ROLLUP_TABLES.items():
+        await database.execute(f"""
+            INSERT INTO {table} (bucket, {dim}, requests, latency_sum, rate_limited)
+            SELECT date_trunc('hour', timestamp), COALESCE({dim}, ''), COUNT(*),
+                   COALESCE(SUM(duration_seconds), 0),
+                   SUM(CASE WHEN status = 'RATE_LIMIT' THEN 1 ELSE 0 END)
+            FROM logs WHERE timestamp IS NOT NULL
+            GROUP BY 1, 2
+            ON CONFLICT DO NOTHING
+        """)
+
+async def _cache_body_columns():
+    # Reports are stored pre-serialized (gzip JSON); old rows only have `data`
+    await database.execute("ALTER TABLE flight_cache ADD COLUMN IF NOT EXISTS body BYTEA")
+    await database.execute("ALTER TABLE flight_cache ADD COLUMN IF NOT EXISTS etag TEXT")
+    await database.execute("ALTER TABLE flight_cache ADD COLUMN IF NOT EXISTS valid_until DOUBLE PRECISION")
+    await database.execute("ALTER TABLE flight_cache ADD COLUMN IF NOT EXISTS weather_source TEXT")
+    await database.execute("DELETE FROM flight_cache WHERE body IS NULL")
+
+async def _cache_fingerprints():
+    # What each report was built from (app.core.freshness)
+    await database.execute("ALTER TABLE flight_cache ADD COLUMN IF NOT EXISTS wx_fingerprint TEXT")
+    await database.execute("CREATE INDEX IF NOT EXISTS idx_flight_cache_weather_source ON flight_cache(weather_source)")
+
+async def _nearest_stations():
+    # Best reporting stations per catalog airport (app.core.stations)
+    await database.execute("""
+    CREATE TABLE IF NOT EXISTS nearest_stations (
+        airport TEXT PRIMARY KEY,
+        stations TEXT NOT NULL
+    );
+    """)
+
+async def _tfrs():
+    # Ingested FAA TFRs (app.core.tfr); workers index them in memory
+    await database.execute("""
+    CREATE TABLE IF NOT EXISTS tfrs (
+        notam_id TEXT PRIMARY KEY,
+        name TEXT,
+        type TEXT,
+        areas TEXT NOT NULL,
+        effective DOUBLE PRECISION,
+        expires DOUBLE PRECISION,
+        fetched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    """)
+
+async def _kiosk_boards():
+    # 'single' (target_icao) or 'board' (JSON list of airports, served by /api/analyze/batch)
+    await database.execute("ALTER TABLE kiosk_profiles ADD COLUMN IF NOT EXISTS profile_type TEXT DEFAULT 'single'")
+    await database.execute("ALTER TABLE kiosk_profiles ADD COLUMN IF NOT EXISTS airports TEXT")
+
+async def _latency_histogram():
+    # Hourly latency bins next to logs_hourly (app.core.logger.update_rollups)
+    await database.execute(f"""
+    CREATE TABLE IF NOT EXISTS {LATENCY_ROLLUP_TABLE} (
+        bucket TIMESTAMP NOT NULL,
+        bin INTEGER NOT NULL,
+        requests INTEGER DEFAULT 0,
+        PRIMARY KEY (bucket, bin)
+    );
+    """)
+    # width_bucket over the bounds array is the same binning as latency_bin()
+    bounds = ", ".join(str(b) for b in LATENCY_BINS)
+    await database.execute(f"""
+        INSERT INTO {LATENCY_ROLLUP_TABLE} (bucket, bin, requests)
+        SELECT date_trunc('hour', timestamp), width_bucket(duration_seconds::float8, ARRAY[{bounds}]::float8[]), COUNT(*)
+        FROM logs WHERE timestamp IS NOT NULL AND duration_seconds IS NOT NULL
+        GROUP BY 1, 2
+        ON CONFLICT DO NOTHING
+    """)
+
+MIGRATIONS = [
+    (1, "base schema", _base_schema),
+    (2, "log timing columns", _log_timing_columns),
+    (3, "partition logs by day", _partition_logs),
+    (4, "backfill hourly rollups", _backfill_rollups),
+    (5, "pre-serialized cache bodies", _cache_body_columns),
+    (6, "cache observation fingerprints", _cache_fingerprints),
+    (7, "nearest reporting stations", _nearest_stations),
+    (8, "temporary flight restrictions", _tfrs),
+    (9, "multi-airport kiosk profiles", _kiosk_boards),
+    (10, "hourly latency histogram", _latency_histogram),
+]
+
+# --- 2. RUNNER ---
+
+async def _applied_versions():
+    try:
+        rows = await database.fetch_all("SELECT version FROM schema_migrations")
+    except Exception:
+        return set()  # First boot: table not created yet
+    return {row["version"] for row in rows}
+
+async def run_migrations():
+    """
+    Applies pending migrations, each in its own transaction under an
+    advisory lock. When the schema is current (every boot but the first
+    after a deploy) this is a single SELECT.
+    """
+    if {v for v, _, _ in MIGRATIONS} <= await _applied_versions():
+        return 0
+
+    async with database.transaction():
+        await database.execute(f"SELECT pg_advisory_xact_lock({MIGRATION_LOCK_ID})")
+        await database.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name TEXT,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        """)
+
+    applied = 0
+    for version, name, step in MIGRATIONS:
+        async with database.transaction():
+            await database.execute(f"SELECT pg_advisory_xact_lock({MIGRATION_LOCK_ID})")
+            # Re-check under the lock: another worker may have just applied it
+            done = await database.fetch_val(
+                "SELECT 1 FROM schema_migrations WHERE version = :v", values={"v": version}
+            )
+            if done:
+                continue
+            started = time.perf_counter()
+            await step()
+            await database.execute(
+                "INSERT INTO schema_migrations (version, name) VALUES (:v, :name)",
+                values={"v": version, "name": name}
+            )
+            applied += 1
+            logger.info(f"🛠️  MIGRATION {version} ({name}) applied in {time.perf_counter() - started:.2f}s")
+    return applied
+
+async def _main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+    from app.core.partitions import create_log_partitions
+    await database.connect()
+    try:
+        applied = await run_migrations()
+        await create_log_partitions()
+        logger.info(f"Migrations complete ({applied} applied).")
+    finally:
+        await database.disconnect()
+
+if __name__ == "__main__":
+    # One-shot (e.g. a pre-deploy step): python -m app.core.migrations
+    asyncio.run(_main())
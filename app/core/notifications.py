@@ -1,14 +1,31 @@
 import os
+import time
+import socket
 import smtplib
 import json
+import asyncio
+import secrets
 import httpx
 from email.message import EmailMessage
 from dotenv import load_dotenv
-from app.core.db import database
+from app.core.db import redis_client
 from app.core.settings import settings
 
 load_dotenv()
 
+# --- OUTBOX (Redis Stream + Consumer Group) ---
+# send_alert() only appends here; each worker runs a dispatcher in the group,
+# so every alert is delivered once and survives a worker restart (pending entries are reclaimed).
+OUTBOX_STREAM = "notifications:outbox"
+OUTBOX_GROUP = "dispatchers"
+OUTBOX_MAXLEN = 10000
+RECLAIM_IDLE_MS = 60000
+
+# Failed channels are parked in a ZSET scored by their next attempt time
+RETRY_ZSET = "notifications:retry"
+MAX_ATTEMPTS = 5
+RETRY_BASE_SECONDS = 10
+
 class NotificationManager:
     def __init__(self):
         self.smtp_host = os.getenv("SMTP_HOST")
@@ -18,102 +35,209 @@ class NotificationManager:
         self.smtp_pass = os.getenv("SMTP_PASS")
         self.discord_url = os.getenv("DISCORD_WEBHOOK_URL")
         self.slack_url = os.getenv("SLACK_WEBHOOK_URL")
+        self.consumer = f"{socket.gethostname()}:{os.getpid()}"
+        self._http = None
 
     async def get_rules(self, event_type):
+        # Rules live in the settings snapshot (refreshed via settings pub/sub)
+        rule = settings.get_rule(event_type)
+        if rule and rule.get("enabled") == 1:
+            try:
+                return json.loads(rule["channels"])
+            except Exception as e:
+                print(f"DEBUG: Bad channel list for '{event_type}': {e}")
+                return []
+
+        # FALLBACK: If 'user_report' has no rule yet, default to SMTP (Email)
+        if event_type == "user_report":
+            print("DEBUG: No rule for 'user_report', defaulting to SMTP.")
+            return ["smtp"]
+
+        print(f"DEBUG: No enabled rules found for event '{event_type}'")
+        return []
+
+    async def send_alert(self, event_type, subject, message):
+        """Queues an alert in the outbox. Delivery happens in run_dispatcher()."""
         try:
-            query = "SELECT channels FROM notification_rules WHERE event_type = :type AND enabled = 1"
-            row = await database.fetch_one(query=query, values={"type": event_type})
-            
-            if row:
-                channels = json.loads(row['channels'])
-                return channels
-            
-            # FALLBACK: If 'user_report' has no rule yet, default to SMTP (Email)
-            if event_type == "user_report":
-                print("DEBUG: No rule for 'user_report', defaulting to SMTP.")
-                return ["smtp"]
-
-            print(f"DEBUG: No enabled rules found in DB for event '{event_type}'")
-            return []
+            await redis_client.xadd(
+                OUTBOX_STREAM,
+                {"event_type": event_type, "subject": subject, "message": message, "attempt": 0},
+                maxlen=OUTBOX_MAXLEN, approximate=True
+            )
         except Exception as e:
-            print(f"DEBUG: DB Read Error in Notifications: {e}")
-            return []
+            print(f"DEBUG: Outbox unavailable ({e}), delivering inline.")
+            await self.deliver(event_type, subject, message)
+
+    async def deliver(self, event_type, subject, message, channels=None):
+        """
+        Sends to all channels concurrently.
+        Returns the channels that failed (empty list on full success).
+        """
+        if channels is None:
+            channels = await self.get_rules(event_type)
 
-    async def send_alert(self, event_type, subject, message):
-        channels = await self.get_rules(event_type)
-        
         if not channels:
             print(f"DEBUG: Alert skipped. No channels enabled for '{event_type}'.")
-            return
+            return []
 
         print(f"DEBUG: Sending '{event_type}' alert via: {channels}")
 
+        senders = {}
         if "smtp" in channels and self.smtp_host:
             # FIX: Pass event_type to _send_email so the subject prefix works
-            await self._send_email(subject, message, event_type)
-        
+            senders["smtp"] = self._send_email(subject, message, event_type)
         if "discord" in channels and self.discord_url:
-            await self._send_discord(subject, message)
-            
+            senders["discord"] = self._send_discord(subject, message)
         if "slack" in channels and self.slack_url:
-            await self._send_slack(subject, message)
+            senders["slack"] = self._send_slack(subject, message)
+
+        results = await asyncio.gather(*senders.values(), return_exceptions=True)
+        failed = []
+        for name, res in zip(senders, results):
+            if isinstance(res, Exception):
+                print(f"NOTIFY: '{subject}' via {name} failed: {type(res).__name__}: {res}")
+                failed.append(name)
+        return failed
+
+    # --- DISPATCHER ---
+
+    async def run_dispatcher(self):
+        """Background task (one per worker) draining the outbox."""
+        group_ready = False
+        while True:
+            try:
+                # Inside the retry loop: Redis may be down at boot, or restarted without the group
+                if not group_ready:
+                    await self._ensure_group()
+                    group_ready = True
+                await self._promote_retries()
+
+                # Entries a dead worker read but never acknowledged
+                _, claimed, *_ = await redis_client.xautoclaim(
+                    OUTBOX_STREAM, OUTBOX_GROUP, self.consumer,
+                    min_idle_time=RECLAIM_IDLE_MS, start_id="0-0", count=10
+                )
+                fresh = await redis_client.xreadgroup(
+                    OUTBOX_GROUP, self.consumer, {OUTBOX_STREAM: ">"}, count=10, block=5000
+                )
+                entries = list(claimed) + [e for _, msgs in (fresh or []) for e in msgs]
+                await asyncio.gather(*(self._handle(entry_id, fields) for entry_id, fields in entries))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"NOTIFY DISPATCHER ERROR: {e}")
+                group_ready = False
+                await asyncio.sleep(5)
+
+    async def _ensure_group(self):
+        try:
+            await redis_client.xgroup_create(OUTBOX_STREAM, OUTBOX_GROUP, id="0", mkstream=True)
+        except Exception as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def _handle(self, entry_id, fields):
+        if not fields:
+            # Trimmed from the stream before it was reclaimed
+            await redis_client.xack(OUTBOX_STREAM, OUTBOX_GROUP, entry_id)
+            return
+        event_type = fields.get("event_type")
+        subject = fields.get("subject", "")
+        message = fields.get("message", "")
+        attempt = int(fields.get("attempt", 0))
+        try:
+            channels = json.loads(fields["channels"]) if fields.get("channels") else None
+            failed = await self.deliver(event_type, subject, message, channels)
+            if failed:
+                await self._schedule_retry(fields, failed, attempt)
+        except Exception as e:
+            print(f"NOTIFY HANDLER ERROR: {e}")
+        finally:
+            await redis_client.xack(OUTBOX_STREAM, OUTBOX_GROUP, entry_id)
+
+    async def _schedule_retry(self, fields, failed_channels, attempt):
+        if attempt + 1 >= MAX_ATTEMPTS:
+            print(f"NOTIFY: Giving up on '{fields.get('subject')}' via {failed_channels} after {MAX_ATTEMPTS} attempts.")
+            return
+        retry = dict(fields)
+        retry["attempt"] = attempt + 1
+        retry["channels"] = json.dumps(failed_channels)
+        retry["token"] = secrets.token_hex(6)  # Keeps identical retries distinct in the ZSET
+        due = time.time() + RETRY_BASE_SECONDS * (2 ** attempt)
+        await redis_client.zadd(RETRY_ZSET, {json.dumps(retry): due})
+
+    async def _promote_retries(self):
+        due = await redis_client.zrangebyscore(RETRY_ZSET, "-inf", time.time(), start=0, num=50)
+        for member in due:
+            # ZREM decides which worker owns the retry
+            if await redis_client.zrem(RETRY_ZSET, member):
+                fields = json.loads(member)
+                fields.pop("token", None)
+                await redis_client.xadd(OUTBOX_STREAM, fields, maxlen=OUTBOX_MAXLEN, approximate=True)
+
+    # --- CHANNELS (raise on failure so the dispatcher can retry) ---
+
+    def _client(self):
+        if self._http is None:
+            self._http = httpx.AsyncClient(timeout=10.0)
+        return self._http
 
     async def _send_email(self, subject, body, event_type=None):
+        from_addr = await settings.get("smtp_from_email")
+        to_addr = await settings.get("admin_alert_email")
+
+        if not from_addr or not to_addr:
+            print("DEBUG: Email skipped. Check 'smtp_from_email' and 'admin_alert_email' in Settings.")
+            return
+
+        print(f"DEBUG: Emailing {to_addr}...")
+
+        # Subject Logic
+        prefix = "[WxDecoder]"
+        if event_type == "api_outage":
+            prefix = "[WxDecoder CRITICAL]"
+        elif subject.startswith("Test"):
+            prefix = "[WxDecoder Test]"
+        elif subject.startswith("Kiosk Inquiry"):
+            prefix = "[WxDecoder Sales]"
+        elif event_type == "user_report":
+            prefix = "[WxDecoder Feedback]"
+
+        msg = EmailMessage()
+        msg.set_content(body)
+        msg['Subject'] = f"{prefix} {subject}"
+        msg['From'] = from_addr
+        msg['To'] = to_addr
+
         try:
-            from_addr = await settings.get("smtp_from_email")
-            to_addr = await settings.get("admin_alert_email")
-
-            if not from_addr or not to_addr:
-                print("DEBUG: Email skipped. Check 'smtp_from_email' and 'admin_alert_email' in Settings.")
-                return
-
-            print(f"DEBUG: Emailing {to_addr}...")
-
-            # Subject Logic
-            prefix = "[WxDecoder]"
-            if event_type == "api_outage":
-                prefix = "[WxDecoder CRITICAL]"
-            elif subject.startswith("Test"):
-                prefix = "[WxDecoder Test]"
-            elif subject.startswith("Kiosk Inquiry"):
-                prefix = "[WxDecoder Sales]"
-            elif event_type == "user_report":
-                prefix = "[WxDecoder Feedback]"
-
-            msg = EmailMessage()
-            msg.set_content(body)
-            msg['Subject'] = f"{prefix} {subject}"
-            msg['From'] = from_addr
-            msg['To'] = to_addr
-
-            s = smtplib.SMTP(self.smtp_host, self.smtp_port)
-            s.starttls()
-            s.login(self.smtp_user, self.smtp_pass)
-            s.send_message(msg)
-            s.quit()
+            # smtplib blocks; keep it off the event loop
+            await asyncio.to_thread(self._smtp_send, msg)
             print("DEBUG: Email Sent Successfully.")
         except Exception as e:
             print(f"SMTP ERROR: {e}")
+            raise
+
+    def _smtp_send(self, msg):
+        with smtplib.SMTP(self.smtp_host, self.smtp_port, timeout=20) as s:
+            s.starttls()
+            s.login(self.smtp_user, self.smtp_pass)
+            s.send_message(msg)
 
     async def _send_discord(self, subject, body):
-        try:
-            payload = {
-                "username": "WxDecoder Watchdog",
-                "embeds": [{
-                    "title": subject,
-                    "description": body,
-                    "color": 15158332
-                }]
-            }
-            async with httpx.AsyncClient() as client:
-                await client.post(self.discord_url, json=payload)
-        except Exception: pass
+        payload = {
+            "username": "WxDecoder Watchdog",
+            "embeds": [{
+                "title": subject,
+                "description": body[:4000],
+                "color": 15158332
+            }]
+        }
+        resp = await self._client().post(self.discord_url, json=payload)
+        resp.raise_for_status()
 
     async def _send_slack(self, subject, body):
-        try:
-            payload = {"text": f"*{subject}*\n{body}"}
-            async with httpx.AsyncClient() as client:
-                await client.post(self.slack_url, json=payload)
-        except Exception: pass
+        payload = {"text": f"*{subject}*\n{body}"}
+        resp = await self._client().post(self.slack_url, json=payload)
+        resp.raise_for_status()
 
-notifier = NotificationManager()
\ No newline at end of file
+notifier = NotificationManager()
@@ -0,0 +1,192 @@
+import re
+import logging
+import datetime
+from app.core.db import database, LOGS_PARENT_DDL, LOG_INDEXES
+
+logger = logging.getLogger(__name__)
+
+LOG_RETENTION_DAYS = 90
+# Partitions are created this many days ahead so inserts never miss one
+PARTITION_DAYS_AHEAD = 3
+# Serialises the one-time conversion across workers
+PARTITION_LOCK_ID = 4642_0033
+
+PARTITION_NAME = re.compile(r"^logs_p(\d{8})$")
+# Upper bound of the legacy partition, from pg_get_expr(relpartbound)
+LEGACY_BOUND = re.compile(r"TO \('(\d{4}-\d{2}-\d{2})")
+
+def _partition_name(day):
+    return f"logs_p{day:%Y%m%d}"
+
+def _today():
+    return datetime.datetime.now(datetime.timezone.utc).date()
+
+async def _relkind(name):
+    query = "SELECT relkind FROM pg_class WHERE relname = :name AND relnamespace = 'public'::regnamespace"
+    return await database.fetch_val(query, values={"name": name})
+
+async def convert_legacy_table():
+    """
+    One-time swap of a plain `logs` table for the partitioned parent.
+    The old table is attached as-is as `logs_legacy` (everything before
+    tomorrow) and ages out as a single partition.
+    Runs as migration 3 (app.core.migrations); a no-op if already partitioned.
+    """
+    boundary = _today() + datetime.timedelta(days=1)
+
+    async with database.transaction():
+        await database.execute(f"SELECT pg_advisory_xact_lock({PARTITION_LOCK_ID})")
+        if await _relkind("logs") != "r":
+            return  # Another worker got here first
+
+        await database.execute("ALTER TABLE logs RENAME TO logs_legacy")
+        # Free the index names for the parent (also renames logs_pkey)
+        rows = await database.fetch_all("SELECT indexname FROM pg_indexes WHERE tablename = 'logs_legacy'")
+        for row in rows:
+            await database.execute(f"ALTER INDEX {row['indexname']} RENAME TO legacy_{row['indexname']}")
+
+        await database.execute(LOGS_PARENT_DDL)
+        # The sequence must outlive logs_legacy
+        await database.execute("ALTER SEQUENCE logs_id_seq OWNED BY logs.id")
+        for name, cols in LOG_INDEXES.items():
+            await database.execute(f"CREATE INDEX IF NOT EXISTS {name} ON logs({cols})")
+
+        # Range partitions cannot hold NULL keys
+        await database.execute("DELETE FROM logs_legacy WHERE timestamp IS NULL")
+        await database.execute(
+            f"ALTER TABLE logs ATTACH PARTITION logs_legacy FOR VALUES FROM (MINVALUE) TO ('{boundary}')"
+        )
+
+    logger.info(f"🗂️  PARTITIONS: Converted logs to daily partitions (legacy rows before {boundary}).")
+
+async def _legacy_upper_bound():
+    """First day not covered by logs_legacy (None once it has been dropped)."""
+    bound = await database.fetch_val(
+        "SELECT pg_get_expr(relpartbound, oid) FROM pg_class WHERE relname = 'logs_legacy' AND relnamespace = 'public'::regnamespace"
+    )
+    match = LEGACY_BOUND.search(bound or "")
+    return datetime.date.fromisoformat(match.group(1)) if match else None
+
+async def _create_partition(day):
+    """
+    Creates one day's partition. Rows that already landed in logs_default for
+    that day (which would make CREATE ... PARTITION OF fail) are moved into it
+    in the same transaction, with the default partition locked meanwhile.
+    """
+    name = _partition_name(day)
+    bounds = {
+        "start": datetime.datetime.combine(day, datetime.time()),
+        "end": datetime.datetime.combine(day + datetime.timedelta(days=1), datetime.time()),
+    }
+    range_sql = f"FOR VALUES FROM ('{day}') TO ('{day + datetime.timedelta(days=1)}')"
+
+    async with database.transaction():
+        await database.execute(f"SELECT pg_advisory_xact_lock({PARTITION_LOCK_ID})")
+        if await _relkind(name):
+            return  # Another worker got here first
+
+        stranded = 0
+        if await _relkind("logs_default"):
+            await database.execute("LOCK TABLE logs_default IN ACCESS EXCLUSIVE MODE")
+            stranded = await database.fetch_val(
+                "SELECT COUNT(*) FROM logs_default WHERE timestamp >= :start AND timestamp < :end", values=bounds
+            )
+
+        if not stranded:
+            await database.execute(f"CREATE TABLE {name} PARTITION OF logs {range_sql}")
+            return
+
+        # Same column order as the parent, so the moved rows line up
+        await database.execute(f"CREATE TABLE {name} (LIKE logs INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+        await database.execute(f"""
+            WITH moved AS (
+                DELETE FROM logs_default WHERE timestamp >= :start AND timestamp < :end RETURNING *
+            )
+            INSERT INTO {name} SELECT * FROM moved
+        """, values=bounds)
+        # Indexes are created to match the parent's on attach
+        await database.execute(f"ALTER TABLE logs ATTACH PARTITION {name} {range_sql}")
+
+    logger.warning(f"🗂️  PARTITIONS: Moved {stranded} rows for {day} out of logs_default into {name}.")
+
+async def create_log_partitions(days_ahead=PARTITION_DAYS_AHEAD):
+    """
+    Creates today's partition plus the next `days_ahead` days, and a partition
+    for any recent day whose rows were written to logs_default (idempotent).
+    """
+    # Catch-all for NULL or far-off timestamps
+    if not await _relkind("logs_default"):
+        try:
+            await database.execute("CREATE TABLE IF NOT EXISTS logs_default PARTITION OF logs DEFAULT")
+        except Exception as e:
+            logger.debug(f"Default partition skipped: {e}")
+
+    today = _today()
+    last_day = today + datetime.timedelta(days=days_ahead)
+    days = {today + datetime.timedelta(days=offset) for offset in range(days_ahead + 1)}
+    # Days that fell into the default partition (app down past PARTITION_DAYS_AHEAD,
+    # or creation kept failing): partition pruning and DROP retention skip them
+    if await _relkind("logs_default"):
+        rows = await database.fetch_all(
+            "SELECT DISTINCT timestamp::date AS day FROM logs_default WHERE timestamp >= :since AND timestamp < :until",
+            values={
+                "since": datetime.datetime.combine(today - datetime.timedelta(days=LOG_RETENTION_DAYS), datetime.time()),
+                "until": datetime.datetime.combine(last_day + datetime.timedelta(days=1), datetime.time()),
+            }
+        )
+        days.update(row["day"] for row in rows)
+
+    # logs_legacy covers everything before its bound (conversion day)
+    legacy_bound = await _legacy_upper_bound()
+    for day in sorted(days):
+        if legacy_bound and day < legacy_bound:
+            continue
+        if await _relkind(_partition_name(day)):
+            continue
+        try:
+            await _create_partition(day)
+        except Exception as e:
+            logger.warning(f"PARTITIONS: Could not create {_partition_name(day)}, its rows stay in logs_default: {e}")
+
+async def drop_expired_log_partitions(retention_days=LOG_RETENTION_DAYS):
+    """
+    Retention by DROP instead of DELETE: whole days fall off in O(1)
+    with no table bloat.
+    """
+    cutoff_day = _today() - datetime.timedelta(days=retention_days)
+    cutoff = datetime.datetime.combine(cutoff_day, datetime.time())
+    query = """
+        SELECT c.relname FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        JOIN pg_class p ON p.oid = i.inhparent
+        WHERE p.relname = 'logs'
+    """
+    rows = await database.fetch_all(query)
+
+    dropped = 0
+    for row in rows:
+        name = row["relname"]
+        match = PARTITION_NAME.match(name)
+        if match:
+            day = datetime.datetime.strptime(match.group(1), "%Y%m%d").date()
+            if day < cutoff_day:
+                await database.execute(f"DROP TABLE IF EXISTS {name}")
+                dropped += 1
+        elif name == "logs_legacy":
+            newest = await database.fetch_val("SELECT MAX(timestamp) FROM logs_legacy")
+            if newest is None or newest < cutoff:
+                await database.execute("DROP TABLE IF EXISTS logs_legacy")
+                dropped += 1
+            else:
+                # Transition period only: the pre-partitioning rows still need trimming
+                await database.execute("DELETE FROM logs_legacy WHERE timestamp < :cutoff", values={"cutoff": cutoff})
+        elif name == "logs_default":
+            await database.execute("DELETE FROM logs_default WHERE timestamp < :cutoff OR timestamp IS NULL", values={"cutoff": cutoff})
+
+    if dropped:
+        logger.info(f"🧹 LOG RETENTION: Dropped {dropped} partitions older than {cutoff_day}.")
+
+async def maintain_log_partitions():
+    """Periodic hook (run_probes): keep partitions ahead of time and drop expired days."""
+    await create_log_partitions()
+    await drop_expired_log_partitions()
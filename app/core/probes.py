@@ -1,8 +1,8 @@
 import asyncio
 import httpx
 from app.core.notifications import notifier
-from app.core.ai import client as ai_client
-from app.core.db import database
+from app.core.ai import get_client as get_ai_client
+from app.core.db import database, ROLLUP_TABLES, LATENCY_ROLLUP_TABLE
 
 async def check_faa():
     try:
@@ -16,41 +16,52 @@ async def check_faa():
 
 async def check_openai():
     try:
-        await ai_client.models.list()
+        await get_ai_client().models.list()
         return True
     except: pass
     return False
 
-async def run_probes():
-    """
-    Runs periodically in background.
-    - Health checks every 15 mins.
-    - Surgical Cache cleanup and Log pruning once per hour at :51.
-    """
-    import datetime
+async def run_cleanup():
+    """Surgical cache cleanup and log pruning (after METARs typically update)."""
     from app.core.cache import clear_expired_cache
+    from app.core.partitions import maintain_log_partitions
+
+    await clear_expired_cache()
+    # Clean logs older than 90 days (drops whole daily partitions)
+    try:
+        await maintain_log_partitions()
+        for table in [*ROLLUP_TABLES, LATENCY_ROLLUP_TABLE]:
+            await database.execute(f"DELETE FROM {table} WHERE bucket < NOW() - INTERVAL '90 days'")
+    except Exception as e:
+        print(f"LOG CLEANUP ERROR: {e}")
 
-    while True:
-        now = datetime.datetime.now(datetime.timezone.utc)
-        
-        # 1. SURGICAL CLEANUP
-        # Only run at :51 past the hour (after METARs typically update)
-        if now.minute == 59:
-            await clear_expired_cache()
-            # Clean logs older than 90 days
-            try:
-                await database.execute("DELETE FROM logs WHERE timestamp < NOW() - INTERVAL '90 days'")
-            except Exception as e:
-                print(f"LOG CLEANUP ERROR: {e}")
+async def run_health_checks():
+    """OpenAI/FAA reachability, alerting on failure."""
+    if not await check_faa():
+        await notifier.send_alert("api_outage", "FAA API Down", "The AviationWeather API is failing to respond.")
+    
+    if not await check_openai():
+        await notifier.send_alert("api_outage", "OpenAI API Down", "Cannot connect to OpenAI API.")
 
-        # 2. API HEALTH CHECKS
-        # Run every 15 minutes (0, 15, 30, 45)
-        if now.minute % 15 == 0:
-            if not await check_faa():
-                await notifier.send_alert("api_outage", "FAA API Down", "The AviationWeather API is failing to respond.")
-            
-            if not await check_openai():
-                await notifier.send_alert("api_outage", "OpenAI API Down", "Cannot connect to OpenAI API.")
+def register_probe_jobs(scheduler):
+    """
+    Periodic jobs, run once per cluster by the elected scheduler leader.
+    - Health checks every 15 mins.
+    - Cleanup once per hour at :59.
+    - Aggregated rate_limit/error summaries every minute (for closed windows).
+    - Report freshness every minute (drops reports superseded by a new METAR/SPECI/TAF).
+    - Reporting-station table rebuilt daily (bootstrap check every 10 mins until first build).
+    - FAA TFR feed ingested every 15 mins.
+    """
+    from app.core.alerts import alert_aggregator
+    from app.core.freshness import watch_report_freshness
+    from app.core.stations import refresh_station_table, ensure_station_table
+    from app.core.tfr import ingest_tfrs
 
-        # Sleep for 60 seconds to check again the next minute
-        await asyncio.sleep(60)
\ No newline at end of file
+    scheduler.add_job("health_checks", "*/15 * * * *", run_health_checks, jitter=20)
+    scheduler.add_job("cleanup", "59 * * * *", run_cleanup, jitter=30)
+    scheduler.add_job("alert_summaries", "* * * * *", alert_aggregator.emit_summaries)
+    scheduler.add_job("report_freshness", "* * * * *", watch_report_freshness, jitter=10)
+    scheduler.add_job("station_table", "17 4 * * *", refresh_station_table, jitter=60)
+    scheduler.add_job("station_table_bootstrap", "*/10 * * * *", ensure_station_table)
+    scheduler.add_job("tfr_ingest", "*/15 * * * *", ingest_tfrs, jitter=30)
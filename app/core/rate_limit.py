@@ -1,20 +1,67 @@
 import ipaddress
+import secrets
 from fastapi import Request, HTTPException
 from app.core.settings import settings
 from app.core.db import redis_client
 
+# Sliding-window log limiter, evaluated server-side in one round trip.
+# Each allowed call is a ZSET member scored by Redis server time (ms), so every
+# worker shares the same clock and the key always carries a TTL.
+#   KEYS[1] = rate_limit:<identifier>
+#   ARGV    = limit, window_ms, unique member id, cost (calls wanted, default 1)
+# Returns {granted (0..cost, as many as fit), remaining, reset_ms}
+SLIDING_WINDOW_LUA = """
+local key = KEYS[1]
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local cost = tonumber(ARGV[4] or '1')
+
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+
+-- Legacy INCR counters (plain strings) are replaced by the ZSET log
+local ktype = redis.call('TYPE', key)['ok']
+if ktype ~= 'zset' and ktype ~= 'none' then
+    redis.call('DEL', key)
+end
+
+redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+local count = redis.call('ZCARD', key)
+
+local granted = math.min(cost, math.max(0, limit - count))
+for i = 1, granted do
+    redis.call('ZADD', key, now, ARGV[3] .. ':' .. i)
+end
+count = count + granted
+redis.call('PEXPIRE', key, window)
+
+local reset = window
+local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+if oldest[2] then
+    reset = tonumber(oldest[2]) + window - now
+end
+
+return {granted, limit - count, reset}
+"""
+
+sliding_window = redis_client.register_script(SLIDING_WINDOW_LUA)
+
 class RateLimiter:
     def __init__(self):
         # Hardcoded Exemptions
         self.exempt_networks = [
             ipaddress.ip_network("127.0.0.0/8"),
             ipaddress.ip_network("::1/128"),
-            ipaddress.ip_network("10.0.0.0/8"), 
+            ipaddress.ip_network("10.0.0.0/8"),
         ]
 
-    async def __call__(self, request: Request):
+    async def __call__(self, request: Request, cost: int = 1):
+        """
+        Charges `cost` calls (e.g. one per model call) to the client's window.
+        Grants as many as fit, raises 429 if none do; returns the number granted.
+        """
         try:
-            # Force refresh from cache to ensure "1" applies instantly
+            # Snapshot lookups; admin changes arrive via settings pub/sub
             max_calls_val = await settings.get("rate_limit_calls", 5)
             period_val = await settings.get("rate_limit_period", 300)
             max_calls = int(max_calls_val)
@@ -24,7 +71,7 @@ class RateLimiter:
             period = 300
 
         if max_calls <= 0:
-             return
+             return cost
 
         # 1. Identify User (Prioritize IP, handle Docker NAT)
         forwarded = request.headers.get("X-Forwarded-For")
@@ -32,31 +79,46 @@ class RateLimiter:
             client_ip = forwarded.split(',')[0].strip()
         else:
             client_ip = request.client.host
-            
+
         identifier = client_ip
-        
+
         # 2. Check Exemptions
         try:
             ip_obj = ipaddress.ip_address(client_ip)
             for network in self.exempt_networks:
-                if ip_obj in network: 
-                    return 
+                if ip_obj in network:
+                    return cost
         except ValueError: pass
 
-        # 3. REDIS CHECK
-        redis_key = f"rate_limit:{identifier}"
+        # 3. REDIS CHECK (Single atomic round trip)
+        return await self.consume(f"rate_limit:{identifier}", max_calls, period, cost, request)
 
-        # Increment counter (Atomic)
-        current_count = await redis_client.incr(redis_key)
+    async def consume(self, redis_key, max_calls, period, cost=1, request=None):
+        """Charges `cost` calls against any sliding window key; see __call__."""
+        granted, remaining, reset_ms = await sliding_window(
+            keys=[redis_key],
+            args=[max_calls, period * 1000, secrets.token_hex(8), cost]
+        )
 
-        # Set expiration on first hit
-        if current_count == 1:
-            await redis_client.expire(redis_key, period)
+        # Seconds until the oldest call in the window ages out (rounded up)
+        reset_seconds = max(1, -(-int(reset_ms) // 1000))
+        headers = {
+            "X-RateLimit-Limit": str(max_calls),
+            "X-RateLimit-Remaining": str(max(0, int(remaining))),
+            "X-RateLimit-Reset": str(reset_seconds),
+        }
 
-        if current_count > max_calls:
+        if not granted:
+            headers["Retry-After"] = str(reset_seconds)
             raise HTTPException(
-                status_code=429, 
-                detail="Rate limit exceeded."
+                status_code=429,
+                detail="Rate limit exceeded.",
+                headers=headers
             )
 
-limiter = RateLimiter()
\ No newline at end of file
+        # Picked up by the response middleware in app.main
+        if request is not None:
+            request.state.rate_limit_headers = headers
+        return int(granted)
+
+limiter = RateLimiter()
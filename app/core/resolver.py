@@ -0,0 +1,244 @@
+import json
+import time
+import difflib
+import logging
+from collections import OrderedDict
+from app.core.db import redis_client
+from app.core.geography import airports_icao, airports_lid, get_coords_from_awc
+
+logger = logging.getLogger(__name__)
+
+POSITIVE_CACHE_SIZE = 8192
+NEGATIVE_CACHE_SIZE = 8192
+NEGATIVE_TTL = 10 * 60
+# Shared across workers: AWC station lookups and unknown identifiers
+REMOTE_KEY = "resolve:awc:{}"
+REMOTE_FOUND_TTL = 7 * 24 * 3600
+REMOTE_MISSING_TTL = 60 * 60
+NEGATIVE_KEY = "resolve:neg:{}"
+# Longer inputs are junk, not typos: skip the fuzzy scan entirely
+MAX_FUZZY_INPUT = 32
+MAX_INPUT_LENGTH = 64
+
+class AirportNotFound(Exception):
+    def __init__(self, raw_input, suggestions):
+        super().__init__(raw_input)
+        self.raw_input = raw_input
+        self.suggestions = suggestions
+
+class RemoteLookupError(Exception):
+    """AWC couldn't be asked (timeout, 5xx): says nothing about whether the station exists."""
+
+class _LRU(OrderedDict):
+    def __init__(self, size):
+        super().__init__()
+        self.size = size
+
+    def get(self, key, default=None):
+        if key in self:
+            self.move_to_end(key)
+            return self[key]
+        return default
+
+    def put(self, key, value):
+        self[key] = value
+        self.move_to_end(key)
+        if len(self) > self.size:
+            self.popitem(last=False)
+
+class IdentifierResolver:
+    """
+    Turns user input into an airport identifier.
+    Order: positive cache -> local catalog (ICAO, LID, K+LID) -> negative
+    cache -> AWC station lookup (Redis-shared) -> fuzzy suggestions.
+    Unknown inputs are remembered with their suggestions, so repeats cost
+    neither an upstream request nor a difflib scan.
+    """
+    def __init__(self):
+        self._positive = _LRU(POSITIVE_CACHE_SIZE)
+        self._negative = _LRU(NEGATIVE_CACHE_SIZE)
+        self._all_keys = None
+        self.metrics = {
+            "positive_hits": 0, "catalog": 0, "negative_hits": 0,
+            "remote_cache_hits": 0, "remote_lookups": 0, "remote_errors": 0, "not_found": 0
+        }
+
+    async def resolve(self, raw_input):
+        """Returns (icao, remote_data); remote_data is set only for AWC-only stations."""
+        if not raw_input or len(raw_input) > MAX_INPUT_LENGTH:
+            self.metrics["not_found"] += 1
+            raise AirportNotFound(raw_input, [])
+
+        cached = self._positive.get(raw_input)
+        if cached:
+            self.metrics["positive_hits"] += 1
+            return cached
+
+        result = self._from_catalog(raw_input)
+        if result:
+            self.metrics["catalog"] += 1
+            self._positive.put(raw_input, result)
+            return result
+
+        await self._check_negative(raw_input)
+
+        try:
+            remote = await self.lookup_remote(raw_input)
+        except RemoteLookupError:
+            # Not found *for now*: no negative entry, or an AWC blip 404s real stations for NEGATIVE_TTL
+            raise AirportNotFound(raw_input, self.suggest(raw_input))
+        if remote:
+            result = (raw_input, remote)
+            self._positive.put(raw_input, result)
+            return result
+
+        self.metrics["not_found"] += 1
+        suggestions = self.suggest(raw_input)
+        await self._remember_missing(raw_input, suggestions)
+        raise AirportNotFound(raw_input, suggestions)
+
+    def _from_catalog(self, raw_input):
+        # 1. Try exact match
+        if raw_input in airports_icao:
+            return (raw_input, None)
+        # 2. Try LID match
+        if raw_input in airports_lid:
+            return (airports_lid[raw_input].get('icao') or raw_input, None)
+        # 3. Lazy US Pilot Logic
+        if len(raw_input) == 3 and ("K" + raw_input) in airports_icao:
+            return ("K" + raw_input, None)
+        return None
+
+    async def _check_negative(self, raw_input):
+        entry = self._negative.get(raw_input)
+        if entry and entry[0] > time.time():
+            self.metrics["negative_hits"] += 1
+            raise AirportNotFound(raw_input, entry[1])
+        try:
+            shared = await redis_client.get(NEGATIVE_KEY.format(raw_input))
+        except Exception:
+            shared = None
+        if shared is not None:
+            suggestions = json.loads(shared)
+            self._negative.put(raw_input, (time.time() + NEGATIVE_TTL, suggestions))
+            self.metrics["negative_hits"] += 1
+            raise AirportNotFound(raw_input, suggestions)
+
+    async def _remember_missing(self, raw_input, suggestions):
+        self._negative.put(raw_input, (time.time() + NEGATIVE_TTL, suggestions))
+        try:
+            await redis_client.set(NEGATIVE_KEY.format(raw_input), json.dumps(suggestions), ex=NEGATIVE_TTL)
+        except Exception: pass
+
+    async def lookup_remote(self, code):
+        """
+        AWC station coordinates ({lat, lon, name}) or None if AWC has no such
+        station, cached in Redis for all workers. Raises RemoteLookupError
+        when AWC couldn't answer.
+        """
+        key = REMOTE_KEY.format(code)
+        try:
+            cached = await redis_client.get(key)
+            if cached is not None:
+                self.metrics["remote_cache_hits"] += 1
+                return json.loads(cached)
+        except Exception:
+            pass
+
+        self.metrics["remote_lookups"] += 1
+        try:
+            data = await get_coords_from_awc(code, raise_errors=True)
+        except Exception as e:
+            # Upstream trouble is not proof the station doesn't exist: don't cache
+            self.metrics["remote_errors"] += 1
+            raise RemoteLookupError(code) from e
+
+        try:
+            ttl = REMOTE_FOUND_TTL if data else REMOTE_MISSING_TTL
+            await redis_client.set(key, json.dumps(data), ex=ttl)
+        except Exception: pass
+        return data
+
+    def suggest(self, raw_input):
+        suggestions = []
+        raw_upper = raw_input.upper()
+        if len(raw_upper) > MAX_FUZZY_INPUT:
+            return suggestions
+
+        # --- 1. GATHER KEYS ---
+        # Merge ICAO and LID keys for searching (built once per worker)
+        if self._all_keys is None:
+            self._all_keys = list(airports_icao.keys()) + list(airports_lid.keys())
+
+        # --- 2. FUZZY CODE MATCHING (Handles "KFFAA" -> "KFFA" & "FFAA" -> "KFFA") ---
+        # Only run fuzzy match if input is code-like (short, no spaces)
+        if len(raw_upper) <= 7 and " " not in raw_upper:
+            # cutoff=0.6 allows for 1-2 character differences/typos
+            close_matches = difflib.get_close_matches(raw_upper, self._all_keys, n=3, cutoff=0.6)
+            for m in close_matches:
+                data = airports_icao.get(m) or airports_lid.get(m)
+                if data: suggestions.append({"icao": m, "name": data['name']})
+
+        # --- 3. CONFUSABLES (Handles 1 vs I vs L, 0 vs O) ---
+        # Explicitly check for common visual swaps
+        def get_variants(s):
+            vars = set()
+            # 1 <-> I <-> L
+            if '1' in s: vars.add(s.replace('1', 'I')); vars.add(s.replace('1', 'L'))
+            if 'I' in s: vars.add(s.replace('I', '1'))
+            if 'L' in s: vars.add(s.replace('L', '1'))
+            # 0 <-> O
+            if '0' in s: vars.add(s.replace('0', 'O'))
+            if 'O' in s: vars.add(s.replace('O', '0'))
+            return vars
+
+        for v in get_variants(raw_upper):
+            if v == raw_upper: continue
+            if v in airports_icao:
+                suggestions.append({"icao": v, "name": airports_icao[v]['name']})
+            elif v in airports_lid:
+                suggestions.append({"icao": v, "name": airports_lid[v]['name']})
+
+        # --- 4. NAME SEARCH (STRICTER) ---
+        # Fixes "CIA" matching "Social Circle" (1OL2)
+        # Only scan names if we don't have enough suggestions yet
+        if len(suggestions) < 5:
+            count = 0
+            for code, data in airports_icao.items():
+                if count >= 5: break
+                name_up = data['name'].upper()
+
+                # LOGIC:
+                # If input is short (<=3), MUST start with input (e.g. "CIA" -> "CIA Field")
+                # If input is long (>3), can be contained in (e.g. "KENNEDY" -> "John F Kennedy")
+                is_match = False
+                if len(raw_upper) <= 3:
+                    if name_up.startswith(raw_upper): is_match = True
+                else:
+                    if raw_upper in name_up: is_match = True
+
+                if is_match:
+                    suggestions.append({"icao": code, "name": data['name']})
+                    count += 1
+
+        # --- DEDUPLICATE & FORMAT ---
+        seen = set()
+        final_suggestions = []
+        for s in suggestions:
+            if s['icao'] not in seen:
+                final_suggestions.append(s)
+                seen.add(s['icao'])
+        return final_suggestions[:5]
+
+    def stats(self):
+        m = self.metrics
+        lookups = m["positive_hits"] + m["catalog"] + m["negative_hits"] + m["remote_lookups"] + m["remote_cache_hits"]
+        hits = m["positive_hits"] + m["negative_hits"] + m["remote_cache_hits"]
+        return {
+            **m,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "positive_size": len(self._positive),
+            "negative_size": len(self._negative)
+        }
+
+resolver = IdentifierResolver()
@@ -0,0 +1,39 @@
+import gzip
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+from app.core.compression import negotiate_encoding
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+def _default(obj):
+    # Anything orjson doesn't know natively (pydantic models, Decimal, sets...)
+    return jsonable_encoder(obj)
+
+def dumps(content):
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+class FastJSONResponse(JSONResponse):
+    """
+    orjson-rendered JSON. Return it directly from hot endpoints: a plain
+    dict return still goes through FastAPI's jsonable_encoder first.
+    """
+    def render(self, content):
+        return dumps(content)
+
+def cached_report_response(request, entry):
+    """
+    Serves a stored report body (gzip JSON bytes) without decoding it.
+    ETag is the hash of the JSON, so an unchanged report is a 304.
+    """
+    etag = entry["etag"]
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Accept-Encoding"}
+
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (t.strip().removeprefix("W/") for t in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+
+    if negotiate_encoding(request.headers.get("accept-encoding"), ("gzip",)):
+        headers["Content-Encoding"] = "gzip"
+        return Response(entry["body"], media_type="application/json", headers=headers)
+    return Response(gzip.decompress(entry["body"]), media_type="application/json", headers=headers)
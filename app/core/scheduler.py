@@ -0,0 +1,157 @@
+import os
+import json
+import time
+import random
+import socket
+import asyncio
+import logging
+import secrets
+import datetime
+from app.core.db import redis_client
+
+logger = logging.getLogger(__name__)
+
+LEADER_KEY = "scheduler:leader"
+LEASE_TTL_MS = 15000
+TICK_SECONDS = 5
+HISTORY_LENGTH = 50
+
+# Extend the lease only if we still hold it (atomic check-and-set)
+RENEW_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+def _parse_cron_field(spec, lo, hi):
+    """Supports '*', '*/n', 'a-b', 'a-b/n' and comma lists."""
+    values = set()
+    for part in spec.split(","):
+        step = 1
+        if "/" in part:
+            part, step_str = part.split("/", 1)
+            step = int(step_str)
+        if part == "*":
+            start, end = lo, hi
+        elif "-" in part:
+            start, end = map(int, part.split("-", 1))
+        else:
+            start = end = int(part)
+        values.update(range(start, end + 1, step))
+    return values
+
+class CronSchedule:
+    """Five-field cron expression (minute hour day month weekday), evaluated in UTC."""
+    def __init__(self, expr):
+        fields = expr.split()
+        if len(fields) != 5:
+            raise ValueError(f"Invalid cron expression: '{expr}'")
+        self.expr = expr
+        self.minute = _parse_cron_field(fields[0], 0, 59)
+        self.hour = _parse_cron_field(fields[1], 0, 23)
+        self.day = _parse_cron_field(fields[2], 1, 31)
+        self.month = _parse_cron_field(fields[3], 1, 12)
+        self.weekday = _parse_cron_field(fields[4], 0, 6)  # 0 = Sunday
+
+    def matches(self, dt):
+        return (
+            dt.minute in self.minute and dt.hour in self.hour and dt.day in self.day
+            and dt.month in self.month and (dt.isoweekday() % 7) in self.weekday
+        )
+
+class Scheduler:
+    """
+    Cluster-wide periodic jobs.
+    Every worker runs `run()`, but only the holder of the Redis lease fires
+    jobs, and a per-slot NX key makes each cron slot run once even across
+    a leader handover.
+    """
+    def __init__(self):
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{secrets.token_hex(4)}"
+        self.jobs = {}
+        self.is_leader = False
+        self._renew = redis_client.register_script(RENEW_LUA)
+        self._running = set()
+
+    def add_job(self, name, cron, func, jitter=0):
+        self.jobs[name] = {"schedule": CronSchedule(cron), "func": func, "jitter": jitter}
+
+    async def _hold_lease(self):
+        if self.is_leader:
+            self.is_leader = bool(await self._renew(keys=[LEADER_KEY], args=[self.worker_id, LEASE_TTL_MS]))
+        if not self.is_leader:
+            self.is_leader = bool(await redis_client.set(LEADER_KEY, self.worker_id, nx=True, px=LEASE_TTL_MS))
+            if self.is_leader:
+                logger.info(f"👑 SCHEDULER: {self.worker_id} is now the leader.")
+
+    async def _claim_slot(self, name, slot):
+        key = f"scheduler:slot:{name}:{slot:%Y%m%d%H%M}"
+        return await redis_client.set(key, self.worker_id, nx=True, ex=3600)
+
+    async def _execute(self, name, job):
+        try:
+            if job["jitter"]:
+                await asyncio.sleep(random.uniform(0, job["jitter"]))
+            started = time.time()
+            status, error = "SUCCESS", None
+            try:
+                await job["func"]()
+            except Exception as e:
+                status, error = "ERROR", str(e)
+                logger.error(f"SCHEDULER JOB '{name}' FAILED: {e}")
+
+            entry = {
+                "job": name,
+                "worker": self.worker_id,
+                "started": datetime.datetime.fromtimestamp(started, datetime.timezone.utc).isoformat(),
+                "duration": round(time.time() - started, 3),
+                "status": status,
+                "error": error
+            }
+            try:
+                history_key = f"scheduler:history:{name}"
+                await redis_client.lpush(history_key, json.dumps(entry))
+                await redis_client.ltrim(history_key, 0, HISTORY_LENGTH - 1)
+            except Exception: pass
+        finally:
+            self._running.discard(name)
+
+    async def run(self):
+        last_slot = None
+        while True:
+            try:
+                await self._hold_lease()
+
+                now = datetime.datetime.now(datetime.timezone.utc)
+                slot = now.replace(second=0, microsecond=0)
+                if self.is_leader and slot != last_slot:
+                    last_slot = slot
+                    for name, job in self.jobs.items():
+                        # Skip if the previous run is still going
+                        if name in self._running or not job["schedule"].matches(slot):
+                            continue
+                        if await self._claim_slot(name, slot):
+                            self._running.add(name)
+                            asyncio.create_task(self._execute(name, job))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.is_leader = False
+                logger.error(f"SCHEDULER ERROR: {e}")
+
+            await asyncio.sleep(TICK_SECONDS)
+
+    async def status(self):
+        leader = await redis_client.get(LEADER_KEY)
+        jobs = {}
+        for name, job in self.jobs.items():
+            raw = await redis_client.lrange(f"scheduler:history:{name}", 0, HISTORY_LENGTH - 1)
+            jobs[name] = {
+                "cron": job["schedule"].expr,
+                "jitter": job["jitter"],
+                "history": [json.loads(r) for r in raw]
+            }
+        return {"leader": leader, "this_worker": self.worker_id, "jobs": jobs}
+
+scheduler = Scheduler()
@@ -1,32 +1,40 @@
 import json
+import asyncio
+import logging
 from app.core.db import database, redis_client
 
+logger = logging.getLogger(__name__)
+
+# Cross-worker invalidation: set() bumps the version and publishes it.
+SETTINGS_CHANNEL = "settings:changed"
+SETTINGS_VERSION_KEY = "settings:version"
+# Safety net in case a pub/sub message is missed (reconnects, Redis restarts)
+VERSION_CHECK_INTERVAL = 30
+
 class SettingsManager:
-    async def load(self):
-        pass
+    def __init__(self):
+        self._snapshot = {}
+        self._rules = {}
+        self._version = None
 
-    async def get(self, key, default=None):
-        # 1. Try Redis
+    async def load(self):
+        """Reload the full settings snapshot (and notification rules) from Postgres."""
+        # Version first: a set() landing mid-reload then leaves us on the older
+        # version, so the next check reloads again instead of skipping the change
         try:
-            val = await redis_client.get(f"setting:{key}")
-            if val is not None:
-                return val
+            version = await redis_client.get(SETTINGS_VERSION_KEY)
         except Exception:
-            pass
-        
-        # 2. Try DB
-        query = "SELECT value FROM system_settings WHERE key = :key"
-        row = await database.fetch_one(query=query, values={"key": key})
-        
-        if row:
-            val = row["value"]
-            # 3. Backfill Redis (TTL 60s)
-            try:
-                await redis_client.setex(f"setting:{key}", 60, val)
-            except Exception: pass
-            return val
-            
-        return default
+            version = None
+        rows = await database.fetch_all("SELECT key, value FROM system_settings")
+        self._snapshot = {row["key"]: row["value"] for row in rows}
+        rule_rows = await database.fetch_all("SELECT * FROM notification_rules")
+        self._rules = {row["event_type"]: dict(row) for row in rule_rows}
+        self._version = version
+        logger.info(f"⚙️  SETTINGS: Loaded {len(self._snapshot)} keys (version {self._version}).")
+
+    async def get(self, key, default=None):
+        # In-process lookup; kept async so call sites stay unchanged
+        return self._snapshot.get(key, default)
 
     async def set(self, key, value):
         s_val = str(value)
@@ -36,27 +44,66 @@ class SettingsManager:
             ON CONFLICT (key) DO UPDATE SET value = :value
         """
         await database.execute(query=query, values={"key": key, "value": s_val})
-        
-        # 2. Write to Redis
-        try:
-            await redis_client.setex(f"setting:{key}", 60, s_val)
-        except Exception: pass
-        
+
+        # 2. Apply locally, then notify the other workers
+        self._snapshot[key] = s_val
+        await self._broadcast()
+
         return True
 
-    # --- THIS WAS MISSING AND CAUSING THE CRASH ---
+    async def _broadcast(self):
+        try:
+            version = await redis_client.incr(SETTINGS_VERSION_KEY)
+            self._version = str(version)
+            await redis_client.publish(SETTINGS_CHANNEL, self._version)
+        except Exception as e:
+            logger.warning(f"SETTINGS: Broadcast failed, peers will catch up on version check: {e}")
+
+    async def watch(self):
+        """
+        Background task (one per worker).
+        Reloads the snapshot on pub/sub notification, and falls back to
+        a periodic version comparison if a message is missed.
+        """
+        while True:
+            pubsub = redis_client.pubsub()
+            try:
+                await pubsub.subscribe(SETTINGS_CHANNEL)
+                while True:
+                    msg = await pubsub.get_message(ignore_subscribe_messages=True, timeout=VERSION_CHECK_INTERVAL)
+                    if msg:
+                        if msg["data"] != self._version:
+                            await self.load()
+                        continue
+
+                    remote_version = await redis_client.get(SETTINGS_VERSION_KEY)
+                    if remote_version != self._version:
+                        await self.load()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"SETTINGS WATCH ERROR: {e}")
+                # Redis unavailable: keep the snapshot fresh straight from Postgres
+                try:
+                    await self.load()
+                except Exception: pass
+                await asyncio.sleep(VERSION_CHECK_INTERVAL)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception: pass
+
     async def get_all_rules(self):
         """Fetch notification rules"""
-        # The table exists now (you created it), so this will work.
         query = "SELECT * FROM notification_rules"
         rows = await database.fetch_all(query)
         return [dict(row) for row in rows]
 
     async def set_rule(self, event_type, channels, enabled):
         query = """
-            INSERT INTO notification_rules (event_type, channels, enabled) 
+            INSERT INTO notification_rules (event_type, channels, enabled)
             VALUES (:event_type, :channels, :enabled)
-            ON CONFLICT (event_type) DO UPDATE 
+            ON CONFLICT (event_type) DO UPDATE
             SET channels = :channels, enabled = :enabled
         """
         values = {
@@ -66,4 +113,11 @@ class SettingsManager:
         }
         await database.execute(query, values)
 
+        self._rules[event_type] = dict(values)
+        await self._broadcast()
+
+    def get_rule(self, event_type):
+        """Snapshot lookup of a notification rule row (or None)."""
+        return self._rules.get(event_type)
+
 settings = SettingsManager()
\ No newline at end of file
@@ -0,0 +1,171 @@
+import os
+import re
+import sys
+import hashlib
+import logging
+import mimetypes
+from fastapi import Request
+from fastapi.responses import Response, FileResponse
+from app.core.compression import supported_encodings, negotiate_encoding, compress
+
+logger = logging.getLogger(__name__)
+
+STATIC_ROOT = "/app/static"
+INDEX_FILE = "index.html"
+
+# Vite emits content-hashed names under assets/ (e.g. index-BX3k9fQa.js)
+HASHED_ASSET = re.compile(r"^assets/.+-[A-Za-z0-9_-]{8,}\.[a-z0-9]+$")
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "no-cache"
+
+# Files above this stay on disk (FileResponse) instead of in memory
+MAX_MEMORY_BYTES = 2 * 1024 * 1024
+# Smaller payloads aren't worth a compressed variant
+MIN_COMPRESS_BYTES = 512
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml",
+                      "application/xml", "application/manifest+json", "application/wasm")
+VARIANT_SUFFIX = {"br": ".br", "gzip": ".gz"}
+
+mimetypes.add_type("application/javascript", ".js")
+mimetypes.add_type("application/manifest+json", ".webmanifest")
+mimetypes.add_type("image/webp", ".webp")
+
+def _is_compressible(content_type):
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+class StaticIndex:
+    """
+    In-memory index of the built frontend, created once per worker.
+    Each entry carries its ETag, cache policy and (for text assets) gzip /
+    brotli variants, so a request is a dict lookup with no filesystem calls.
+    """
+    def __init__(self, root=STATIC_ROOT):
+        self.root = root
+        self.files = {}
+        self.loaded = False
+
+    def load(self):
+        files = {}
+        if os.path.isdir(self.root):
+            for dirpath, _, filenames in os.walk(self.root):
+                for filename in filenames:
+                    if filename.endswith((".gz", ".br")):
+                        continue  # Variants are attached to their source file
+                    path = os.path.join(dirpath, filename)
+                    rel = os.path.relpath(path, self.root).replace(os.sep, "/")
+                    try:
+                        files[rel] = self._index_file(rel, path)
+                    except OSError as e:
+                        logger.warning(f"STATIC: Skipped {rel}: {e}")
+        self.files = files
+        self.loaded = True
+        logger.info(f"📦 STATIC: Indexed {len(files)} files from {self.root}")
+
+    def _index_file(self, rel, path):
+        size = os.path.getsize(path)
+        content_type = mimetypes.guess_type(rel)[0] or "application/octet-stream"
+        if content_type.startswith("text/") or content_type == "application/javascript":
+            content_type += "; charset=utf-8"
+
+        entry = {
+            "path": path,
+            "content_type": content_type,
+            "cache_control": IMMUTABLE_CACHE if HASHED_ASSET.match(rel) else REVALIDATE_CACHE,
+            "body": None,
+            "variants": {},
+        }
+
+        if size > MAX_MEMORY_BYTES:
+            stat = os.stat(path)
+            entry["etag"] = f'"{stat.st_mtime_ns:x}-{size:x}"'
+            for encoding, suffix in VARIANT_SUFFIX.items():
+                if os.path.isfile(path + suffix):
+                    entry["variants"][encoding] = {"path": path + suffix}
+            return entry
+
+        with open(path, "rb") as f:
+            body = f.read()
+        digest = hashlib.sha1(body).hexdigest()[:16]
+        entry["body"] = body
+        entry["etag"] = f'"{digest}"'
+
+        if _is_compressible(content_type) and size >= MIN_COMPRESS_BYTES:
+            for encoding in supported_encodings():
+                variant_path = path + VARIANT_SUFFIX[encoding]
+                if os.path.isfile(variant_path):
+                    with open(variant_path, "rb") as f:
+                        data = f.read()
+                else:
+                    # Not precompressed at build time: do it once here
+                    data = compress(body, encoding)
+                if len(data) < size:
+                    entry["variants"][encoding] = {"body": data, "etag": f'"{digest}-{encoding}"'}
+        return entry
+
+    def get(self, rel):
+        if not self.loaded:
+            self.load()
+        return self.files.get(rel)
+
+    def has_index(self):
+        return self.get(INDEX_FILE) is not None
+
+    def respond(self, request: Request, entry, status_code=200):
+        """Builds the response for an entry: encoding negotiation, ETag / 304, cache headers."""
+        encoding = None
+        if entry["variants"]:
+            encoding = negotiate_encoding(request.headers.get("accept-encoding"), tuple(entry["variants"]))
+
+        variant = entry["variants"].get(encoding, {})
+        etag = variant.get("etag") or (f'{entry["etag"][:-1]}-{encoding}"' if encoding else entry["etag"])
+        headers = {"ETag": etag, "Cache-Control": entry["cache_control"]}
+        if entry["variants"]:
+            headers["Vary"] = "Accept-Encoding"
+
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        if "body" in variant:
+            return Response(variant["body"], status_code=status_code, media_type=entry["content_type"], headers=headers)
+        if "path" in variant:
+            return FileResponse(variant["path"], status_code=status_code, media_type=entry["content_type"], headers=headers)
+        if entry["body"] is not None:
+            return Response(entry["body"], status_code=status_code, media_type=entry["content_type"], headers=headers)
+        return FileResponse(entry["path"], status_code=status_code, media_type=entry["content_type"], headers=headers)
+
+def _etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [t.strip() for t in if_none_match.split(",")]
+    return any(t == etag or t == f"W/{etag}" for t in candidates)
+
+def precompress(root=STATIC_ROOT):
+    """Build step: writes .br / .gz siblings at maximum compression."""
+    written = 0
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            if filename.endswith((".gz", ".br")):
+                continue
+            path = os.path.join(dirpath, filename)
+            content_type = mimetypes.guess_type(path)[0] or ""
+            if not _is_compressible(content_type) or os.path.getsize(path) < MIN_COMPRESS_BYTES:
+                continue
+            with open(path, "rb") as f:
+                body = f.read()
+            for encoding in supported_encodings():
+                data = compress(body, encoding, static=True)
+                if len(data) < len(body):
+                    with open(path + VARIANT_SUFFIX[encoding], "wb") as f:
+                        f.write(data)
+                    written += 1
+    print(f"Precompressed {written} variants under {root}")
+
+static_files = StaticIndex()
+
+if __name__ == "__main__":
+    # Docker build step: python -m app.core.static /app/static
+    precompress(sys.argv[1] if len(sys.argv) > 1 else STATIC_ROOT)
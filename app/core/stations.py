@@ -0,0 +1,171 @@
+import os
+import json
+import math
+import time
+import asyncio
+import logging
+import httpx
+from app.core.db import database
+from app.core.geography import airports_icao, airports_lid, calculate_distance
+
+logger = logging.getLogger(__name__)
+
+# --- BEST REPORTING STATIONS (Precomputed per catalog airport) ---
+# Rebuilt daily by the scheduler from AWC station metadata.
+STATION_INFO_URL = "https://aviationweather.gov/api/data/stationinfo?bbox=-90,-180,90,180&format=json"
+# Offline / test source in the same format as the AWC response
+STATION_FIXTURE = os.getenv(
+    "STATION_FIXTURE",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "reporting_stations.json")
+)
+
+TAF_RADIUS_NM = 25     # A TAF station this close beats a nearer METAR-only one
+SEARCH_RADIUS_NM = 50
+STATIONS_PER_AIRPORT = 5
+INSERT_BATCH = 500
+
+def load_station_fixture():
+    with open(STATION_FIXTURE) as f:
+        return json.load(f)
+
+async def fetch_station_metadata(allow_fixture=False):
+    """
+    AWC station list. If AWC is unreachable: the bundled fixture when
+    allow_fixture (an empty table is worse than a partial one), else raises.
+    """
+    try:
+        async with httpx.AsyncClient(timeout=60.0) as client:
+            resp = await client.get(STATION_INFO_URL)
+            resp.raise_for_status()
+            stations = resp.json()
+            if stations:
+                return stations, "awc"
+            raise ValueError("empty station list")
+    except Exception as e:
+        if not allow_fixture:
+            raise
+        logger.warning(f"STATIONS: AWC metadata fetch failed, using fixture: {e}")
+    return load_station_fixture(), "fixture"
+
+def _reporting_stations(metadata):
+    """[(icao, lat, lon, has_taf)] for stations that issue METARs."""
+    stations = []
+    for item in metadata:
+        site_types = item.get("siteType") or []
+        icao = item.get("icaoId")
+        if not icao or "METAR" not in site_types:
+            continue
+        try:
+            stations.append((icao, float(item["lat"]), float(item["lon"]), "TAF" in site_types))
+        except (KeyError, TypeError, ValueError):
+            continue
+    return stations
+
+def rank_stations(stations, lat, lon, exclude=None, limit=STATIONS_PER_AIRPORT, grid=None):
+    """
+    Ordered best-first: TAF stations within TAF_RADIUS_NM by distance,
+    then every other METAR station within SEARCH_RADIUS_NM by distance.
+    """
+    if grid is not None:
+        candidates = _grid_candidates(grid, lat, lon)
+    else:
+        candidates = stations
+
+    taf_near, others = [], []
+    for icao, s_lat, s_lon, has_taf in candidates:
+        if exclude and icao in exclude:
+            continue
+        dist = calculate_distance(lat, lon, s_lat, s_lon)
+        if dist > SEARCH_RADIUS_NM:
+            continue
+        entry = (icao, round(dist, 1), has_taf)
+        if has_taf and dist <= TAF_RADIUS_NM:
+            taf_near.append(entry)
+        else:
+            others.append(entry)
+    taf_near.sort(key=lambda x: x[1])
+    others.sort(key=lambda x: x[1])
+    return (taf_near + others)[:limit]
+
+def _build_grid(stations):
+    # 1-degree cells so each airport only measures against nearby stations
+    grid = {}
+    for station in stations:
+        grid.setdefault((math.floor(station[1]), math.floor(station[2])), []).append(station)
+    return grid
+
+def _grid_candidates(grid, lat, lon):
+    lat_span = 1
+    lon_span = min(180, math.ceil(SEARCH_RADIUS_NM / (60 * max(math.cos(math.radians(lat)), 0.01))))
+    cell_lat, cell_lon = math.floor(lat), math.floor(lon)
+    for d_lat in range(-lat_span, lat_span + 1):
+        for d_lon in range(-lon_span, lon_span + 1):
+            yield from grid.get((cell_lat + d_lat, (cell_lon + d_lon + 180) % 360 - 180), ())
+
+def compute_station_table(metadata, keep_empty=False):
+    """
+    Blocking: {airport_code: [(icao, dist_nm, has_taf), ...]} for every catalog airport.
+    keep_empty records airports with no station in range, so they skip the live search too.
+    """
+    stations = _reporting_stations(metadata)
+    grid = _build_grid(stations)
+    table = {}
+    for catalog in (airports_icao, airports_lid):
+        for code, data in catalog.items():
+            if code in table:
+                continue
+            try:
+                lat, lon = float(data['lat']), float(data['lon'])
+            except (KeyError, TypeError, ValueError):
+                continue
+            # The airport's own station already failed if we're on the fallback path
+            ranked = rank_stations(stations, lat, lon, exclude={code, data.get('icao')}, grid=grid)
+            if ranked or keep_empty:
+                table[code] = ranked
+    return table
+
+async def refresh_station_table(allow_fixture=False):
+    """
+    Scheduler job (daily): rebuild nearest_stations from fresh metadata.
+    A failed AWC fetch raises and the previous table stays in force; the
+    fixture is only used to seed an empty table (ensure_station_table).
+    """
+    started = time.perf_counter()
+    metadata, source = await fetch_station_metadata(allow_fixture)
+    # Only a full AWC list can prove an airport has no station nearby
+    table = await asyncio.to_thread(compute_station_table, metadata, source == "awc")
+    if not any(table.values()):
+        logger.warning("STATIONS: Empty station table, keeping the previous one.")
+        return
+
+    rows = list(table.items())
+    async with database.transaction():
+        await database.execute("DELETE FROM nearest_stations")
+        for i in range(0, len(rows), INSERT_BATCH):
+            chunk = rows[i:i + INSERT_BATCH]
+            placeholders = ", ".join(f"(:a{n}, :s{n})" for n in range(len(chunk)))
+            values = {}
+            for n, (code, ranked) in enumerate(chunk):
+                values[f"a{n}"] = code
+                values[f"s{n}"] = json.dumps(ranked)
+            await database.execute(f"INSERT INTO nearest_stations (airport, stations) VALUES {placeholders}", values)
+
+    logger.info(f"📡 STATIONS: {len(rows)} airports mapped to reporting stations ({source}) in {time.perf_counter() - started:.1f}s")
+
+async def ensure_station_table():
+    """Builds the table once if it has never been filled (first deploy)."""
+    if not await database.fetch_val("SELECT EXISTS (SELECT 1 FROM nearest_stations)"):
+        await refresh_station_table(allow_fixture=True)
+
+async def get_best_reporting_stations(airport_code, limit=3):
+    """
+    [(icao, dist_nm), ...] best-first from the precomputed table,
+    or None when the airport isn't in it (caller falls back to a live search).
+    """
+    row = await database.fetch_one(
+        "SELECT stations FROM nearest_stations WHERE airport = :code",
+        values={"code": airport_code.upper().strip()}
+    )
+    if not row:
+        return None
+    return [(icao, dist) for icao, dist, _ in json.loads(row["stations"])[:limit]]
@@ -0,0 +1,261 @@
+import os
+import json
+import time
+import asyncio
+import logging
+import datetime
+import httpx
+import xml.etree.ElementTree as ET
+from app.core.airspace import AirspaceIndex, Zone, PROXIMITY_BUFFER_NM
+
+logger = logging.getLogger(__name__)
+
+# --- TEMPORARY FLIGHT RESTRICTIONS (FAA feed -> tfrs table -> per-worker R-tree) ---
+# app.core.db is imported where it's used: geography imports this module, and
+# the airspace table build step runs without DATABASE_URL.
+TFR_LIST_URL = os.getenv("TFR_LIST_URL", "https://tfr.faa.gov/tfrapi/exportTfrList")
+TFR_DETAIL_URL = os.getenv("TFR_DETAIL_URL", "https://tfr.faa.gov/download/detail_{}.xml")
+# Offline source: a directory with list.json + detail_*.xml recorded from the feed
+# (e.g. app/data/tfr_fixtures) instead of the live URLs
+TFR_SOURCE = os.getenv("TFR_SOURCE")
+
+TFR_VERSION_KEY = "tfr:version"
+TFR_SYNC_INTERVAL = 60       # Workers compare their snapshot with the ingested version
+TFR_STALE_AFTER = 60 * 60    # No successful ingest for this long: stop claiming coverage
+DETAIL_CONCURRENCY = 8
+
+# --- 1. PARSING (XNOTAM-Update) ---
+def _parse_coord(text):
+    # "38.85120000N" / "077.03770000W"
+    text = (text or "").strip()
+    value = float(text[:-1])
+    return -value if text[-1] in "SW" else value
+
+def _parse_time(text):
+    if not text or not text.strip():
+        return None
+    dt = datetime.datetime.fromisoformat(text.strip())
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=datetime.timezone.utc)
+    return dt.timestamp()
+
+def _parse_altitude(code, value):
+    code = (code or "").strip().upper()
+    if code == "SFC" or value is None:
+        return 0
+    value = int(float(value))
+    # STD values are flight levels
+    return value * 100 if code == "STD" else value
+
+def parse_tfr_xml(notam_id, xml_text):
+    """
+    One TFR detail document -> row dict for the tfrs table, or None if it has no usable area.
+    Each area keeps its own altitudes and (if scheduled) its own time window.
+    """
+    root = ET.fromstring(xml_text)
+    notam = root.find(".//Not")
+    if notam is None:
+        return None
+    effective = _parse_time(notam.findtext("dateEffective"))
+    expires = _parse_time(notam.findtext("dateExpire"))
+    tfr_type = (notam.findtext(".//TfrNot/codeType") or "TFR").strip()
+    purpose = " ".join((notam.findtext("txtDescrPurpose") or "").split())
+
+    areas = []
+    for group in notam.iter("TFRAreaGroup"):
+        area = group.find("aseTFRArea")
+        ring = []
+        for avx in group.iter("Avx"):
+            try:
+                ring.append((_parse_coord(avx.findtext("geoLong")), _parse_coord(avx.findtext("geoLat"))))
+            except (TypeError, ValueError, IndexError):
+                continue
+        if len(ring) < 3:
+            continue
+        if ring[0] != ring[-1]:
+            ring.append(ring[0])
+
+        area_effective, area_expires = effective, expires
+        if area is not None and area.find("ScheduleGroup") is not None:
+            area_effective = _parse_time(area.findtext("ScheduleGroup/dateEffective")) or effective
+            area_expires = _parse_time(area.findtext("ScheduleGroup/dateExpire")) or expires
+        areas.append({
+            "name": (area.findtext("txtName") if area is not None else None) or purpose,
+            "floor_ft": _parse_altitude(area.findtext("codeDistVerLower"), area.findtext("valDistVerLower")) if area is not None else 0,
+            "ceiling_ft": _parse_altitude(area.findtext("codeDistVerUpper"), area.findtext("valDistVerUpper")) if area is not None else None,
+            "effective": area_effective,
+            "expires": area_expires,
+            "polygons": [[ring]]
+        })
+
+    if not areas:
+        return None
+    return {
+        "notam_id": notam_id,
+        "name": purpose or notam_id,
+        "type": tfr_type,
+        "areas": areas,
+        "effective": min((a["effective"] for a in areas if a["effective"]), default=None),
+        "expires": None if any(a["expires"] is None for a in areas) else max(a["expires"] for a in areas)
+    }
+
+# --- 2. INGESTION (Scheduler job, leader only) ---
+async def _fetch_feed():
+    """{notam_id: xml_text or None}; None marks a detail that couldn't be fetched this round."""
+    if TFR_SOURCE:
+        with open(os.path.join(TFR_SOURCE, "list.json")) as f:
+            listing = json.load(f)
+        docs = {}
+        for item in listing:
+            path = os.path.join(TFR_SOURCE, f"detail_{item['notam_id'].replace('/', '_')}.xml")
+            try:
+                with open(path) as f:
+                    docs[item["notam_id"]] = f.read()
+            except OSError:
+                docs[item["notam_id"]] = None
+        return docs
+
+    async with httpx.AsyncClient(timeout=20.0) as client:
+        resp = await client.get(TFR_LIST_URL)
+        resp.raise_for_status()
+        listing = resp.json()
+        sem = asyncio.Semaphore(DETAIL_CONCURRENCY)
+
+        async def fetch_detail(notam_id):
+            async with sem:
+                try:
+                    r = await client.get(TFR_DETAIL_URL.format(notam_id.replace("/", "_")))
+                    r.raise_for_status()
+                    return notam_id, r.text
+                except Exception as e:
+                    logger.warning(f"TFR: Detail fetch failed for {notam_id}: {e}")
+                    return notam_id, None
+
+        ids = sorted({item["notam_id"] for item in listing if item.get("notam_id")})
+        return dict(await asyncio.gather(*(fetch_detail(i) for i in ids)))
+
+async def ingest_tfrs():
+    """
+    Scheduler job: mirrors the FAA TFR list into the tfrs table and bumps
+    the version so every worker rebuilds its index.
+    A failed list fetch raises (the previous set stays in force); a failed
+    detail keeps that TFR's previous row.
+    """
+    from app.core.db import database, redis_client
+    started = time.perf_counter()
+    docs = await _fetch_feed()
+    if not docs:
+        # An empty list is far more likely a feed glitch than a TFR-free country
+        logger.warning("TFR: Empty TFR list, keeping the previous set.")
+        return
+
+    rows, failed = [], set()
+    for notam_id, xml_text in docs.items():
+        if xml_text is None:
+            failed.add(notam_id)
+            continue
+        try:
+            row = parse_tfr_xml(notam_id, xml_text)
+        except Exception as e:
+            logger.warning(f"TFR: Could not parse {notam_id}: {e}")
+            failed.add(notam_id)
+            continue
+        if row and (row["expires"] is None or row["expires"] > time.time()):
+            rows.append(row)
+
+    async with database.transaction():
+        # Cancelled / expired TFRs drop out of the list; keep rows we just failed to refresh
+        keep = [r["notam_id"] for r in rows] + sorted(failed)
+        await database.execute("DELETE FROM tfrs WHERE NOT (notam_id = ANY(:keep))", values={"keep": keep})
+        await database.execute("DELETE FROM tfrs WHERE expires IS NOT NULL AND expires < :now", values={"now": time.time()})
+        for row in rows:
+            await database.execute("""
+                INSERT INTO tfrs (notam_id, name, type, areas, effective, expires, fetched_at)
+                VALUES (:notam_id, :name, :type, :areas, :effective, :expires, CURRENT_TIMESTAMP)
+                ON CONFLICT (notam_id) DO UPDATE
+                SET name = :name, type = :type, areas = :areas, effective = :effective,
+                    expires = :expires, fetched_at = CURRENT_TIMESTAMP
+            """, values={**row, "areas": json.dumps(row["areas"])})
+
+    try:
+        await redis_client.set(TFR_VERSION_KEY, json.dumps({"ingested": time.time(), "count": len(rows)}))
+    except Exception as e:
+        logger.warning(f"TFR: Version bump failed, workers catch up on restart: {e}")
+    logger.info(f"🚧 TFR: {len(rows)} TFRs ingested ({len(failed)} kept from last run) in {time.perf_counter() - started:.1f}s")
+
+# --- 3. PER-WORKER INDEX ---
+class TFRIndex(AirspaceIndex):
+    """
+    Active TFR areas in the same R-tree as permanent airspace. Rebuilt from
+    the tfrs table whenever the ingest job publishes a new version; time
+    windows are checked at query time so a TFR switches on/off on schedule.
+    """
+    def __init__(self):
+        super().__init__(path=None)
+        self.loaded = True  # Nothing to read from disk; filled by sync()
+        self.version = None
+        self.ingested_at = None
+
+    async def sync(self):
+        from app.core.db import database
+        rows = await database.fetch_all("SELECT notam_id, name, type, areas FROM tfrs")
+        zones = []
+        for row in rows:
+            for n, area in enumerate(json.loads(row["areas"])):
+                zones.append(Zone(
+                    f"{row['notam_id']}#{n}", area["name"], row["type"],
+                    area["floor_ft"], area["ceiling_ft"], area["polygons"],
+                    {"notam_id": row["notam_id"], "purpose": row["name"],
+                     "effective": area["effective"], "expires": area["expires"]}
+                ))
+        self.replace(zones)
+
+    async def watch(self):
+        """Background task (one per worker): reloads when the ingest job bumps the version."""
+        from app.core.db import redis_client
+        while True:
+            try:
+                version = await redis_client.get(TFR_VERSION_KEY)
+                if version != self.version:
+                    await self.sync()
+                    self.version = version
+                    self.ingested_at = json.loads(version)["ingested"] if version else None
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"TFR SYNC ERROR: {e}")
+                # Redis unavailable: keep the index fresh straight from Postgres
+                try:
+                    await self.sync()
+                except Exception: pass
+            await asyncio.sleep(TFR_SYNC_INTERVAL)
+
+    def is_current(self):
+        return self.ingested_at is not None and time.time() - self.ingested_at < TFR_STALE_AFTER
+
+    def zones_near(self, lat, lon, buffer_nm=PROXIMITY_BUFFER_NM, at=None):
+        at = at or time.time()
+        return [
+            r for r in super().zones_near(lat, lon, buffer_nm)
+            if (r[0].properties["effective"] or 0) <= at
+            and (r[0].properties["expires"] is None or at < r[0].properties["expires"])
+        ]
+
+    def warnings(self, target_code, lat, lon):
+        warnings, seen = [], set()
+        for zone, inside, dist in self.zones_near(lat, lon):
+            p = zone.properties
+            # One line per NOTAM: its innermost area (e.g. VIP inner ring over the outer one)
+            if p["notam_id"] in seen:
+                continue
+            seen.add(p["notam_id"])
+            until = "until further notice"
+            if p["expires"]:
+                until = "until " + datetime.datetime.fromtimestamp(p["expires"], datetime.timezone.utc).strftime("%d %H%MZ")
+            if inside:
+                warnings.append(f"CRITICAL: {target_code} is located within active TFR {p['notam_id']} ({zone.type}: {p['purpose']}; {zone.altitudes()}, {until}). Flight prohibited unless authorized.")
+            else:
+                warnings.append(f"ADVISORY: {target_code} is {dist:.1f}nm outside active TFR {p['notam_id']} ({zone.type}: {p['purpose']}; {zone.altitudes()}, {until}).")
+        return warnings
+
+tfr_store = TFRIndex()
@@ -1,3 +1,4 @@
+import re
 import httpx
 import asyncio
 import logging
@@ -120,4 +121,77 @@ async def get_bulk_weather_data(icao_codes):
         except Exception as e:
             logger.error(f"Bulk Fetch Error: {e}")
             
-    return results
\ No newline at end of file
+    return results
+
+async def get_bulk_metars(icao_codes):
+    """
+    METARs only, { "ICAO": "raw METAR" } for the stations that reported.
+    Unlike get_bulk_weather_data, a failed request raises instead of
+    looking like a batch of silent stations.
+    """
+    if not icao_codes: return {}
+    url = f"https://aviationweather.gov/api/data/metar?ids={','.join(sorted(set(icao_codes)))}&format=json"
+    async with httpx.AsyncClient(timeout=8.0) as client:
+        response = await client.get(url)
+    if response.status_code == 204:
+        return {}  # None of them has a current METAR
+    response.raise_for_status()
+    return {
+        item['icaoId']: item['rawOb']
+        for item in response.json() if item.get('icaoId') and item.get('rawOb')
+    }
+
+
+# --- FLIGHT CATEGORY (Deterministic, from the raw METAR) ---
+SKY_LAYER = re.compile(r"\b(BKN|OVC|VV)(\d{3})")
+VIS_STATUTE = re.compile(r"\s([PM]?)(\d+(?: \d/\d)?|\d/\d)SM\b")
+VIS_METERS = re.compile(r"\s(\d{4})(?:NDV)?\s")
+
+def _statute_miles(text):
+    whole, _, frac = text.partition(" ")
+    if "/" in whole:
+        whole, frac = "0", whole
+    value = float(whole)
+    if frac:
+        num, den = frac.split("/")
+        value += int(num) / int(den)
+    return value
+
+def flight_category(metar):
+    """
+    VFR / MVFR / IFR / LIFR from ceiling (lowest BKN/OVC/VV) and visibility,
+    per the FAA thresholds; "UNK" if neither can be read.
+    """
+    if not metar:
+        return "UNK"
+    # Remarks can repeat layers/visibility (e.g. sector visibility): ignore them
+    body = " " + metar.split(" RMK ")[0] + " "
+
+    ceiling = None
+    layer = SKY_LAYER.search(body)
+    if layer:
+        ceiling = int(layer.group(2)) * 100
+
+    visibility = None
+    if " CAVOK " in body:
+        visibility = 10.0
+    else:
+        vis = VIS_STATUTE.search(body)
+        if vis:
+            visibility = _statute_miles(vis.group(2))
+            if vis.group(1) == "M":
+                visibility -= 0.01
+        else:
+            vis = VIS_METERS.search(body)
+            if vis:
+                visibility = int(vis.group(1)) / 1609.34
+
+    if ceiling is None and visibility is None:
+        return "UNK"
+    if (ceiling is not None and ceiling < 500) or (visibility is not None and visibility < 1):
+        return "LIFR"
+    if (ceiling is not None and ceiling < 1000) or (visibility is not None and visibility < 3):
+        return "IFR"
+    if (ceiling is not None and ceiling <= 3000) or (visibility is not None and visibility <= 5):
+        return "MVFR"
+    return "VFR"
@@ -0,0 +1,161 @@
+import json
+import math
+import time
+import asyncio
+import logging
+import threading
+from app.core.db import redis_client
+from app.core.airspace import RTree
+from app.core.geography import airports_icao
+from app.core.weather import get_bulk_metars, flight_category
+
+logger = logging.getLogger(__name__)
+
+# --- REGIONAL FLIGHT-CATEGORY MAP ---
+# The world is cut into fixed TILE_DEG tiles; each tile's observations are
+# cached in Redis, so panning only fetches the tiles that just came into view.
+TILE_DEG = 1
+TILE_KEY = "map:tile:{}:{}"
+TILE_TTL = 5 * 60          # SPECIs matter more than saving a bulk call
+TILE_EMPTY_TTL = 30        # No reporting stations (a station's METAR can lag; check again soon)
+MAX_TILES = 64             # Per request (about 8x8 degrees); zoom in for more
+FETCH_CHUNK = 200          # Station ids per AviationWeather bulk request
+FETCH_CONCURRENCY = 4
+
+class StationIndex:
+    """R-tree over catalog airports (ICAO codes), built on first use."""
+    def __init__(self):
+        self.tree = None
+        self._lock = threading.Lock()
+
+    def _build(self):
+        with self._lock:
+            if self.tree is None:
+                started = time.perf_counter()
+                items = []
+                for code, data in airports_icao.items():
+                    try:
+                        lat, lon = float(data['lat']), float(data['lon'])
+                    except (KeyError, TypeError, ValueError):
+                        continue
+                    items.append(((lon, lat, lon, lat), (code, data.get('name', code), lat, lon)))
+                self.tree = RTree(items)
+                logger.info(f"🗺️ MAP: Indexed {len(items)} airports in {time.perf_counter() - started:.2f}s")
+        return self.tree
+
+    async def ready(self):
+        if self.tree is None:
+            await asyncio.to_thread(self._build)
+
+    def within(self, min_lon, min_lat, max_lon, max_lat):
+        """[(code, name, lat, lon)] inside the box (call ready() first)."""
+        return self.tree.query(min_lon, min_lat, max_lon, max_lat)
+
+station_index = StationIndex()
+
+def tiles_for(min_lon, min_lat, max_lon, max_lat):
+    # Inclusive of max: a station exactly on the top/right edge lives in the next tile up
+    return [
+        (x, y)
+        for y in range(math.floor(min_lat / TILE_DEG), math.floor(max_lat / TILE_DEG) + 1)
+        for x in range(math.floor(min_lon / TILE_DEG), math.floor(max_lon / TILE_DEG) + 1)
+    ]
+
+def _tile_bounds(tile):
+    x, y = tile
+    # Half-open tiles: a station on an edge belongs to exactly one
+    return x * TILE_DEG, y * TILE_DEG, (x + 1) * TILE_DEG - 1e-9, (y + 1) * TILE_DEG - 1e-9
+
+async def _fetch_observations(codes):
+    """({code: metar}, {codes whose chunk failed}); the map never needs TAFs."""
+    sem = asyncio.Semaphore(FETCH_CONCURRENCY)
+
+    async def fetch(chunk):
+        async with sem:
+            return await get_bulk_metars(chunk)
+
+    chunks = [codes[i:i + FETCH_CHUNK] for i in range(0, len(codes), FETCH_CHUNK)]
+    observations, failed = {}, set()
+    for chunk, result in zip(chunks, await asyncio.gather(*(fetch(c) for c in chunks), return_exceptions=True)):
+        if isinstance(result, Exception):
+            logger.warning(f"MAP: METAR fetch failed for {len(chunk)} stations: {result}")
+            failed.update(chunk)
+        else:
+            observations.update(result)
+    return observations, failed
+
+async def _build_tiles(tiles):
+    """{tile: [station, ...]} for tiles not in Redis: one chunked bulk fetch for all of them."""
+    members = {tile: station_index.within(*_tile_bounds(tile)) for tile in tiles}
+    codes = sorted({s[0] for stations in members.values() for s in stations})
+    observations, failed = await _fetch_observations(codes) if codes else ({}, set())
+
+    built = {}
+    for tile, stations in members.items():
+        reporting = []
+        for code, name, lat, lon in stations:
+            metar = observations.get(code)
+            if not metar:
+                continue
+            reporting.append({
+                "icao": code, "name": name, "lat": lat, "lon": lon,
+                "category": flight_category(metar), "metar": metar
+            })
+        built[tile] = reporting
+
+    # A tile with a station from a failed chunk is served as-is but not cached incomplete
+    cacheable = {tile: stations for tile, stations in built.items() if not any(s[0] in failed for s in members[tile])}
+    if len(cacheable) < len(built):
+        logger.warning(f"MAP: {len(built) - len(cacheable)} of {len(built)} tiles not cached (partial fetch)")
+    if not cacheable:
+        return built
+
+    try:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for (x, y), stations in cacheable.items():
+                pipe.set(TILE_KEY.format(x, y), json.dumps(stations), ex=TILE_TTL if stations else TILE_EMPTY_TTL)
+            await pipe.execute()
+    except Exception as e:
+        logger.warning(f"MAP: Tile cache write failed: {e}")
+    return built
+
+_building = {}
+
+async def get_tiles(tiles):
+    """
+    {tile: stations} from Redis where cached; missing tiles are built together,
+    and a tile another request in this worker is already building is awaited, not refetched.
+    Returns (tiles, cached_count).
+    """
+    result = {}
+    try:
+        cached = await redis_client.mget([TILE_KEY.format(x, y) for x, y in tiles])
+    except Exception:
+        cached = [None] * len(tiles)
+    for tile, raw in zip(tiles, cached):
+        if raw is not None:
+            result[tile] = json.loads(raw)
+    cached_count = len(result)
+
+    waiting = {tile: _building[tile] for tile in tiles if tile not in result and tile in _building}
+    missing = [tile for tile in tiles if tile not in result and tile not in waiting]
+    if missing:
+        await station_index.ready()
+        call = asyncio.ensure_future(_build_tiles(missing))
+        for tile in missing:
+            _building[tile] = call
+        call.add_done_callback(lambda _: [_building.pop(t, None) for t in missing if _building.get(t) is call])
+        result.update(await asyncio.shield(call))
+    for tile, call in waiting.items():
+        result[tile] = (await asyncio.shield(call))[tile]
+    return result, cached_count
+
+async def stations_in_bbox(min_lon, min_lat, max_lon, max_lat):
+    """Reporting stations inside the box with their flight category."""
+    tiles = tiles_for(min_lon, min_lat, max_lon, max_lat)
+    by_tile, cached_count = await get_tiles(tiles)
+    stations = [
+        s for tile in tiles for s in by_tile.get(tile, [])
+        if min_lon <= s["lon"] <= max_lon and min_lat <= s["lat"] <= max_lat
+    ]
+    return stations, len(tiles), cached_count
@@ -1,15 +1,27 @@
-import os
+import time
 import logging
 import asyncio
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, Request
+from fastapi.responses import Response
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.router import router as api_router
-from app.core.db import database, init_db_tables
+from app.core.db import database
+from app.core.migrations import run_migrations
+from app.core.partitions import create_log_partitions
+from app.core.geography import warm_airports, warm_airspace
+from app.core.tfr import tfr_store
+from app.core.ai import get_client as get_ai_client
+from app.api.endpoints.health import startup_state
+from app.core.static import static_files, INDEX_FILE
+from app.core.compression import CompressionMiddleware
+from app.core.responses import FastJSONResponse
 from app.core.settings import settings
-from app.core.probes import run_probes
+from app.core.probes import register_probe_jobs
+from app.core.scheduler import scheduler
+from app.core.logger import log_pipeline
+from app.core.notifications import notifier
+from app.core.alerts import alert_aggregator
 
 # --- LOGGING CONFIGURATION ---
 logging.basicConfig(
@@ -22,29 +34,58 @@ logger = logging.getLogger("uvicorn.startup")
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # STARTUP
+    started = time.perf_counter()
     logger.info("Connecting to Database and Cache...")
+    # Airport tables, the OpenAI client, the static index and airspace load in threads while the DB connects
+    warm_task = asyncio.gather(
+        asyncio.to_thread(warm_airports),
+        asyncio.to_thread(get_ai_client),
+        asyncio.to_thread(static_files.load),
+        asyncio.to_thread(warm_airspace)
+    )
     await database.connect()
     
-    # 1. Create Tables (Prevent Race Condition with try/except)
+    # 1. Schema Migrations (Versioned; a single SELECT once up to date)
     try:
-        await init_db_tables()
+        await run_migrations()
     except Exception as e:
-        logger.warning(f"Table init skipped (Race Condition): {e}")
+        logger.warning(f"Migrations skipped: {e}")
+    try:
+        await create_log_partitions()
+    except Exception as e:
+        logger.warning(f"Log partition setup failed: {e}")
 
     # 2. Load Settings
     logger.info("Loading System Settings...")
     await settings.load()
+    asyncio.create_task(settings.watch())
+    asyncio.create_task(tfr_store.watch())
     
     # 3. Start Background Probes (OpenAI/FAA Health Checks)
-    asyncio.create_task(run_probes())
-    
-    logger.info("Systems Online.")
+    # Every worker joins the election; only the leader runs the jobs
+    register_probe_jobs(scheduler)
+    asyncio.create_task(scheduler.run())
+
+    # 4. Start Request Log Writer (Batched inserts)
+    log_pipeline.start()
+
+    # 5. Start Notification Dispatcher (Drains the alert outbox)
+    asyncio.create_task(notifier.run_dispatcher())
+    alert_aggregator.start()
+
+    await warm_task
+    startup_state["startup_seconds"] = round(time.perf_counter() - started, 3)
+    startup_state["complete"] = True
+    logger.info(f"Systems Online in {startup_state['startup_seconds']:.2f}s.")
     yield
     # SHUTDOWN
+    logger.info("Flushing request logs...")
+    await log_pipeline.stop()
+    await alert_aggregator.stop()
     logger.info("Disconnecting...")
     await database.disconnect()
 
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -54,25 +95,39 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-app.include_router(api_router)
+# br/gzip for large buffered responses (reports, admin tables)
+app.add_middleware(CompressionMiddleware)
 
-if os.path.exists("/app/static/assets"):
-    app.mount("/assets", StaticFiles(directory="/app/static/assets"), name="assets")
+@app.middleware("http")
+async def rate_limit_headers(request: Request, call_next):
+    # Attach X-RateLimit-* headers recorded by RateLimiter on allowed calls
+    response = await call_next(request)
+    headers = getattr(request.state, "rate_limit_headers", None)
+    if headers:
+        response.headers.update(headers)
+    return response
+
+app.include_router(api_router)
 
+# --- STATIC FRONTEND (Indexed in memory at startup, see app.core.static) ---
 @app.get("/favicon.ico", include_in_schema=False)
 @app.get("/favicon.png", include_in_schema=False)
-async def favicon():
-    possible_paths = ["/app/static/favicon.png", "/app/static/favicon.ico"]
-    for path in possible_paths:
-        if os.path.exists(path):
-            return FileResponse(path)
+async def favicon(request: Request):
+    for name in ("favicon.png", "favicon.ico"):
+        entry = static_files.get(name)
+        if entry:
+            return static_files.respond(request, entry)
     return {"error": "Favicon not found"}
 
 @app.get("/{full_path:path}")
-async def serve_app(full_path: str):
-    file_path = os.path.join("/app/static", full_path)
-    if os.path.isfile(file_path):
-        return FileResponse(file_path)
-    if os.path.exists("/app/static/index.html"):
-        return FileResponse("/app/static/index.html")
-    return {"error": "Frontend not built. Check Dockerfile."}
\ No newline at end of file
+async def serve_app(full_path: str, request: Request):
+    entry = static_files.get(full_path)
+    if entry:
+        return static_files.respond(request, entry)
+    if full_path.startswith("assets/"):
+        # A stale hashed asset must not come back as index.html
+        return Response(status_code=404)
+    index = static_files.get(INDEX_FILE)
+    if index:
+        return static_files.respond(request, index)
+    return {"error": "Frontend not built. Check Dockerfile."}
@@ -0,0 +1,54 @@
+"""
+Airspace lookups: bundled zones plus N synthetic polygon zones
+(special-use airspace scale) in the R-tree, queried at random CONUS points.
+
+Usage:
+    python -m benchmarks.airspace_bench [zone_count] [queries]
+"""
+import os
+import sys
+import math
+import time
+import random
+
+os.environ.setdefault("DATABASE_URL", "postgresql://localhost/wxdecoder")
+
+from app.core.airspace import AirspaceIndex, Zone
+
+def synthetic_zone(rng, n):
+    lat, lon = rng.uniform(25, 49), rng.uniform(-124, -67)
+    radius = rng.uniform(2, 40)
+    ring = []
+    for i in range(64):
+        b = 2 * math.pi * i / 64
+        r = radius * rng.uniform(0.7, 1.0)
+        ring.append((lon + r * math.sin(b) / (60 * math.cos(math.radians(lat))), lat + r * math.cos(b) / 60))
+    ring.append(ring[0])
+    return Zone(f"SYN_{n}", f"Synthetic Area {n}", rng.choice(["RESTRICTED", "PROHIBITED"]), 0, 10000, [[ring]])
+
+def main():
+    zone_count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    rng = random.Random(7)
+
+    index = AirspaceIndex()
+    index.load()
+    zones = list(index.zones.values())
+    t = time.perf_counter()
+    index.replace(zones + [synthetic_zone(rng, n) for n in range(zone_count)])
+    print(f"Indexed {len(index.zones)} zones in {(time.perf_counter() - t) * 1000:.0f} ms")
+
+    points = [(rng.uniform(25, 49), rng.uniform(-124, -67)) for _ in range(queries)]
+    hits = 0
+    t = time.perf_counter()
+    for lat, lon in points:
+        hits += len(index.warnings("TEST", lat, lon))
+    elapsed = time.perf_counter() - t
+    print(f"{queries} lookups: {elapsed / queries * 1e6:.1f} us/lookup, {hits} warnings")
+
+    # DC FRZ / SFRA sanity check
+    for line in index.warnings("KDCA", 38.8521, -77.0377):
+        print(" ", line)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Limiter overhead per request: legacy INCR + EXPIRE vs. the sliding-window Lua script.
+
+Usage:
+    REDIS_URL=redis://localhost:6379/0 python -m benchmarks.rate_limit_bench [iterations]
+"""
+import os
+import sys
+import time
+import asyncio
+import secrets
+
+os.environ.setdefault("DATABASE_URL", "postgresql://localhost/wxdecoder")
+
+import redis.asyncio as redis
+from app.core.rate_limit import SLIDING_WINDOW_LUA
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+async def bench_legacy(client, n):
+    t = time.perf_counter()
+    for i in range(n):
+        key = f"bench_rl_legacy:{i % 100}"
+        count = await client.incr(key)
+        if count == 1:
+            await client.expire(key, 300)
+    return time.perf_counter() - t
+
+async def bench_lua(client, n):
+    script = client.register_script(SLIDING_WINDOW_LUA)
+    t = time.perf_counter()
+    for i in range(n):
+        await script(keys=[f"bench_rl_lua:{i % 100}"], args=[5, 300_000, secrets.token_hex(8)])
+    return time.perf_counter() - t
+
+async def main(n):
+    client = redis.from_url(REDIS_URL, decode_responses=True)
+    try:
+        for label, fn in (("INCR+EXPIRE", bench_legacy), ("Lua sliding window", bench_lua)):
+            elapsed = await fn(client, n)
+            print(f"{label:<20} {n} calls  {elapsed:.3f}s  {elapsed / n * 1e6:.1f} us/request")
+    finally:
+        keys = [k async for k in client.scan_iter("bench_rl_*")]
+        if keys:
+            await client.delete(*keys)
+        await client.aclose()
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000))
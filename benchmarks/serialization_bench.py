@@ -0,0 +1,81 @@
+"""
+Report serialization: FastAPI's default path (jsonable_encoder + json.dumps)
+vs. orjson, and bytes on the wire for identity / gzip / brotli.
+
+Usage:
+    python -m benchmarks.serialization_bench [iterations] [notam_count]
+"""
+import os
+import sys
+import json
+import time
+import random
+import datetime
+
+os.environ.setdefault("DATABASE_URL", "postgresql://localhost/wxdecoder")
+
+from fastapi.encoders import jsonable_encoder
+from app.core.responses import dumps
+from app.core.compression import compress, supported_encodings
+
+NOTAM_SAMPLES = [
+    "!BWI 11/045 BWI RWY 10/28 CLSD 2311061200-2311062000",
+    "!BWI 11/102 BWI TWY F BTN TWY F1 AND TWY F2 CLSD 2311070100-2311071000",
+    "!FDC 3/4471 ZDC MD..AIRSPACE WASHINGTON DC..TEMPORARY FLIGHT RESTRICTIONS. PURSUANT TO 49 USC 40103(B)...",
+    "!BWI 10/311 BWI OBST TOWER LGT (ASR 1234567) 391234N0764321W (2.1NM NE BWI) 412FT (250FT AGL) OUT OF SERVICE",
+    "!BWI 11/007 BWI NAV ILS RWY 33L LOC/GP OUT OF SERVICE 2311080800-2311081600",
+]
+
+def typical_report(notam_count):
+    """Shape of an /api/analyze response: full NOTAM list plus the AI narrative."""
+    rng = random.Random(42)
+    return {
+        "airport_name": "Baltimore/Washington International Thurgood Marshall Airport",
+        "airport_tz": "America/New_York",
+        "is_cached": False,
+        "valid_until": time.time() + 1800,
+        "analysis": {
+            "flight_category": "MVFR",
+            "summary": " ".join(["Ceilings broken at 2,500 ft improving to VFR by afternoon."] * 8),
+            "hazards": [f"Crosswind component {rng.randint(5, 20)} kt on runway {rng.randint(1, 36):02d}" for _ in range(6)],
+            "timeline": [
+                {"time": (datetime.datetime(2024, 1, 1, 12) + datetime.timedelta(hours=h)).isoformat(),
+                 "category": rng.choice(["VFR", "MVFR", "IFR"]), "detail": "FM group with SCT025 BKN040"}
+                for h in range(12)
+            ],
+            "airspace_warnings": ["ADVISORY: KBWI is just outside the Washington DC SFRA."],
+        },
+        "raw_data": {
+            "metar": "KBWI 011254Z 27012G20KT 10SM BKN025 OVC040 08/M01 A2992 RMK AO2 SLP132 T00831011",
+            "taf": "KBWI 011120Z 0112/0212 27012G20KT P6SM BKN025 FM011800 28010KT P6SM SCT040 FM020000 VRB03KT P6SM SKC",
+            "notams": [f"{rng.choice(NOTAM_SAMPLES)} #{i}" for i in range(notam_count)],
+            "weather_source": "KBWI",
+            "weather_dist": 0.0,
+            "weather_name": "Baltimore/Washington International Thurgood Marshall Airport",
+        },
+    }
+
+def timed(fn, n):
+    t = time.perf_counter()
+    for _ in range(n):
+        out = fn()
+    return (time.perf_counter() - t) / n * 1e6, out
+
+def main(n, notam_count):
+    report = typical_report(notam_count)
+
+    default_us, body = timed(lambda: json.dumps(jsonable_encoder(report), ensure_ascii=False, separators=(",", ":")).encode(), n)
+    orjson_us, fast_body = timed(lambda: dumps(report), n)
+    print(f"report with {notam_count} NOTAMs, {n} iterations")
+    print(f"  jsonable_encoder + json.dumps: {default_us:8.1f} us")
+    print(f"  orjson:                        {orjson_us:8.1f} us  ({default_us / orjson_us:.1f}x)")
+
+    print(f"  identity: {len(fast_body):7d} bytes")
+    for encoding in supported_encodings():
+        enc_us, data = timed(lambda: compress(fast_body, encoding), max(1, n // 10))
+        print(f"  {encoding:8s}: {len(data):7d} bytes ({len(data) / len(fast_body):.0%}), {enc_us:.0f} us to compress")
+
+if __name__ == "__main__":
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    notams = int(sys.argv[2]) if len(sys.argv) > 2 else 80
+    main(iterations, notams)
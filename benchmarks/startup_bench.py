@@ -0,0 +1,80 @@
+"""
+Cold-start time: module import cost, and (with --serve) wall-clock time until
+all uvicorn workers have logged "Systems Online" and /readyz answers 200.
+
+Usage:
+    python -m benchmarks.startup_bench [--runs 5]
+    DATABASE_URL=... REDIS_URL=... python -m benchmarks.startup_bench --serve [--workers 5]
+"""
+import os
+import re
+import sys
+import time
+import argparse
+import subprocess
+import statistics
+import httpx
+
+os.environ.setdefault("DATABASE_URL", "postgresql://localhost/wxdecoder")
+
+ONLINE = re.compile(r"Systems Online in ([\d.]+)s")
+
+def bench_import(runs):
+    # A fresh interpreter per run: this is what each worker pays before the lifespan starts
+    code = "import time; t = time.perf_counter(); import app.main; print(time.perf_counter() - t)"
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        samples.append(float(out.stdout.strip().splitlines()[-1]))
+    print(f"import app.main: median {statistics.median(samples) * 1000:.0f} ms, max {max(samples) * 1000:.0f} ms ({runs} runs)")
+
+    code = "import time; t = time.perf_counter(); from app.core.geography import warm_airports; warm_airports(); print(time.perf_counter() - t)"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    print(f"warm_airports (runs in a thread during startup): {float(out.stdout.strip().splitlines()[-1]) * 1000:.0f} ms")
+
+def bench_serve(workers, port, timeout):
+    cmd = [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1",
+           "--port", str(port), "--workers", str(workers)]
+    started = time.perf_counter()
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    per_worker = []
+    ready_at = None
+    try:
+        os.set_blocking(proc.stdout.fileno(), False)
+        while time.perf_counter() - started < timeout:
+            for line in iter(proc.stdout.readline, ""):
+                match = ONLINE.search(line)
+                if match:
+                    per_worker.append(float(match.group(1)))
+            if len(per_worker) >= workers and ready_at is None:
+                try:
+                    if httpx.get(f"http://127.0.0.1:{port}/readyz", timeout=1.0).status_code == 200:
+                        ready_at = time.perf_counter() - started
+                        break
+                except httpx.HTTPError:
+                    pass
+            time.sleep(0.05)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+    if not per_worker:
+        print("No worker reached 'Systems Online' (check DATABASE_URL / REDIS_URL).")
+        return
+    print(f"workers online: {len(per_worker)}/{workers}")
+    print(f"lifespan per worker: median {statistics.median(per_worker):.2f}s, max {max(per_worker):.2f}s")
+    if ready_at is not None:
+        print(f"spawn -> /readyz 200: {ready_at:.2f}s")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--serve", action="store_true")
+    parser.add_argument("--workers", type=int, default=5)
+    parser.add_argument("--port", type=int, default=4699)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    bench_import(args.runs)
+    if args.serve:
+        bench_serve(args.workers, args.port, args.timeout)
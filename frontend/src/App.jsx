@@ -5,6 +5,7 @@ import Dashboard from './components/Dashboard';
 import AdminDashboard from './components/admin/AdminDashboard';
 import LiveLogs from './components/admin/LiveLogs';
 import CacheManager from './components/admin/CacheManager';
+import AirspaceManager from './components/admin/AirspaceManager';
 import IpManager from './components/admin/IpManager';
 import Settings from './components/admin/Settings';
 import KioskManager from './components/admin/KioskManager';
@@ -138,6 +139,7 @@ const AppContent = () => {
              <Route path="/admin/dashboard" element={<AdminDashboard />} />
              <Route path="/admin/logs" element={<LiveLogs />} />
              <Route path="/admin/cache" element={<CacheManager />} />
+             <Route path="/admin/airspace" element={<AirspaceManager />} />
              <Route path="/admin/ip" element={<IpManager />} />
              <Route path="/admin/settings" element={<Settings />} />
              <Route path="/admin/kiosk" element={<KioskManager />} />
@@ -14,6 +14,9 @@ const getClientId = () => {
   return id;
 };
 
+// Last report body per (icao, plane) with its ETag; a 304 reuses it
+const reportCache = new Map();
+
 // Helper to parse METAR time (Time Only, No Date)
 const getMetarTime = (metarString, timezone) => {
   if (!metarString) return null;
@@ -70,17 +73,28 @@ const Dashboard = ({ onSearchStateChange }) => {
     setSuggestions([]); // Clear previous suggestions
     
     const payload = { icao: targetIcao, plane_size: plane };
+    const cacheKey = `${targetIcao.toUpperCase()}|${plane}`;
+    const previous = reportCache.get(cacheKey);
 
     try {
+      const headers = {
+        "Content-Type": "application/json",
+        "X-Client-ID": getClientId(),
+      };
+      if (previous) headers["If-None-Match"] = previous.etag;
+
       const response = await fetch("/api/analyze", {
         method: "POST",
-        headers: {
-          "Content-Type": "application/json",
-          "X-Client-ID": getClientId(),
-        },
+        headers,
         body: JSON.stringify(payload),
       });
 
+      if (response.status === 304 && previous) {
+        setData(previous.data);
+        if (onSearchStateChange) onSearchStateChange(true);
+        return;
+      }
+
       if (!response.ok) {
         let errorDetail = "An unexpected error occurred.";
         try {
@@ -105,6 +119,8 @@ const Dashboard = ({ onSearchStateChange }) => {
       if (result.error) {
         setError(result.error);
       } else {
+        const etag = response.headers.get("ETag");
+        if (etag) reportCache.set(cacheKey, { etag, data: result });
         setData(result);
         if (onSearchStateChange) onSearchStateChange(true);
       }
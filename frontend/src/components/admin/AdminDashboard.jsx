@@ -59,6 +59,10 @@ const AdminDashboard = () => {
                 <span className="text-xs text-neutral-500 uppercase font-bold">Avg Speed</span>
                 <span className="text-sm font-mono text-green-400">{data?.avg_latency || 0}s</span>
             </div>
+            <div className="flex justify-between items-baseline">
+                <span className="text-xs text-neutral-500 uppercase font-bold">P95 Speed</span>
+                <span className="text-sm font-mono text-green-400">{data?.p95_latency || 0}s</span>
+            </div>
             <div className="flex justify-between items-baseline">
                 <span className="text-xs text-neutral-500 uppercase font-bold">Top Apt</span>
                 <span className="text-sm font-mono text-yellow-400">{data?.top_airport || "-"}</span>
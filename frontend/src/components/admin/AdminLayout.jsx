@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { Link, useLocation } from 'react-router-dom';
-import { LayoutDashboard, Network, Settings, Lock, ListVideo, Database, Monitor } from 'lucide-react';
+import { LayoutDashboard, Network, Settings, Lock, ListVideo, Database, Monitor, Map as MapIcon } from 'lucide-react';
 
 const AdminLayout = ({ children }) => {
   const location = useLocation();
@@ -85,6 +85,7 @@ const AdminLayout = ({ children }) => {
             <NavItem to="/admin/logs" icon={ListVideo} label="Live Logs" />
             <NavItem to="/admin/kiosk" icon={Monitor} label="Kiosk Manager" />
             <NavItem to="/admin/cache" icon={Database} label="Cache Manager" />
+            <NavItem to="/admin/airspace" icon={MapIcon} label="Airspace" />
             <NavItem to="/admin/ip" icon={Network} label="IP Manager" />
             <NavItem to="/admin/settings" icon={Settings} label="Settings" />
             </nav>
@@ -0,0 +1,132 @@
+import React, { useEffect, useState } from 'react';
+import AdminLayout from './AdminLayout';
+import api from '../../services/api';
+import { Search, ChevronRight } from 'lucide-react';
+
+const AirspaceManager = () => {
+  const [zones, setZones] = useState([]);
+  const [table, setTable] = useState(null);
+  const [search, setSearch] = useState("");
+  const [loading, setLoading] = useState(true);
+  const [selected, setSelected] = useState(null);
+  const [airports, setAirports] = useState([]);
+
+  useEffect(() => {
+    const fetchZones = async () => {
+      try {
+        const data = await api.get("/api/admin/airspace");
+        setZones(data.zones);
+        setTable(data.table);
+      } catch (err) {
+        console.error(err);
+      } finally {
+        setLoading(false);
+      }
+    };
+    fetchZones();
+  }, []);
+
+  const selectZone = async (zone) => {
+    setSelected(zone);
+    setAirports([]);
+    try {
+      const data = await api.get(`/api/admin/airspace/${encodeURIComponent(zone.id)}`);
+      setAirports(data.airports);
+    } catch (err) {
+      console.error(err);
+    }
+  };
+
+  const filtered = zones.filter(z =>
+      z.name.toLowerCase().includes(search.toLowerCase()) ||
+      z.id.toLowerCase().includes(search.toLowerCase())
+  );
+
+  return (
+    <AdminLayout>
+      <div className="flex flex-col md:flex-row justify-between items-center mb-6 gap-4">
+        <div>
+            <h1 className="text-2xl font-bold text-white tracking-tight">Airspace</h1>
+            <p className="text-neutral-500 text-sm">Restricted & Prohibited Zones vs. Catalog Airports</p>
+            {table && (
+                <p className="text-neutral-500 text-xs mt-1 font-mono">
+                    Table {table.digest || "-"} ({table.source || "not built"}){!table.current && " · STALE, live lookups in use"}
+                </p>
+            )}
+        </div>
+        <div className="relative w-full md:w-64">
+            <Search className="absolute left-3 top-2.5 text-neutral-500 w-4 h-4" />
+            <input
+                type="text"
+                placeholder="Search zones..."
+                className="w-full bg-neutral-900 border border-neutral-700 rounded-full pl-10 pr-4 py-2 text-sm text-white focus:outline-none focus:border-blue-500"
+                value={search}
+                onChange={(e) => setSearch(e.target.value)}
+            />
+        </div>
+      </div>
+
+      <div className="grid grid-cols-1 lg:grid-cols-2 gap-6">
+        <div className="border border-neutral-800 rounded bg-neutral-900/20 overflow-hidden shadow-2xl">
+          <table className="w-full text-left text-xs">
+              <thead className="bg-neutral-800 text-neutral-400 uppercase tracking-wider">
+                  <tr>
+                      <th className="p-4">Zone</th>
+                      <th className="p-4">Altitudes</th>
+                      <th className="p-4 text-right">Inside</th>
+                      <th className="p-4 text-right">Nearby</th>
+                      <th className="p-4"></th>
+                  </tr>
+              </thead>
+              <tbody className="divide-y divide-neutral-800 text-gray-300 font-mono">
+                  {loading ? (
+                      <tr><td colSpan="5" className="p-8 text-center text-blue-500 animate-pulse">LOADING ZONES...</td></tr>
+                  ) : filtered.length === 0 ? (
+                      <tr><td colSpan="5" className="p-8 text-center text-neutral-500">No zones.</td></tr>
+                  ) : filtered.map((zone) => (
+                      <tr
+                          key={zone.id}
+                          onClick={() => selectZone(zone)}
+                          className={`cursor-pointer hover:bg-neutral-800/50 ${selected?.id === zone.id ? 'bg-neutral-800/70' : ''}`}
+                      >
+                          <td className="p-4">
+                              <div className="text-white font-bold">{zone.name}</div>
+                              <span className={`text-[10px] ${zone.type === 'PROHIBITED' ? 'text-red-400' : 'text-orange-400'}`}>{zone.type}</span>
+                          </td>
+                          <td className="p-4 text-neutral-400">{zone.altitudes}</td>
+                          <td className="p-4 text-right text-white">{zone.airports_inside}</td>
+                          <td className="p-4 text-right text-neutral-500">{zone.airports_nearby}</td>
+                          <td className="p-4 text-neutral-600"><ChevronRight size={14} /></td>
+                      </tr>
+                  ))}
+              </tbody>
+          </table>
+        </div>
+
+        <div className="border border-neutral-800 rounded bg-neutral-900/20 overflow-hidden shadow-2xl">
+          <div className="bg-neutral-800 text-neutral-400 uppercase tracking-wider text-xs p-4 font-bold">
+              {selected ? `Airports: ${selected.name}` : "Select a zone"}
+          </div>
+          <table className="w-full text-left text-xs">
+              <tbody className="divide-y divide-neutral-800 text-gray-300 font-mono">
+                  {selected && airports.length === 0 && (
+                      <tr><td colSpan="3" className="p-8 text-center text-neutral-500">No catalog airports in or near this zone.</td></tr>
+                  )}
+                  {airports.map((a) => (
+                      <tr key={a.code} className="hover:bg-neutral-800/50">
+                          <td className="p-3 text-white font-bold">{a.code}</td>
+                          <td className="p-3 text-neutral-400 font-sans">{a.name}</td>
+                          <td className={`p-3 text-right ${a.inside ? 'text-red-400' : 'text-yellow-500/80'}`}>
+                              {a.inside ? `INSIDE (${a.distance_nm}nm)` : `${a.distance_nm}nm OUT`}
+                          </td>
+                      </tr>
+                  ))}
+              </tbody>
+          </table>
+        </div>
+      </div>
+    </AdminLayout>
+  );
+};
+
+export default AirspaceManager;
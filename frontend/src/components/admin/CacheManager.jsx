@@ -1,25 +1,36 @@
 import React, { useEffect, useState } from 'react';
 import AdminLayout from './AdminLayout';
-import api from '../../services/api';
+import Pager from './Pager';
+import api, { getPage } from '../../services/api';
 import { Search, Trash2, Database, AlertTriangle } from 'lucide-react';
 
+// Newest first, paged server-side (/api/admin/cache)
+const PAGE_SIZE = 100;
+
 const CacheManager = () => {
   const [cache, setCache] = useState([]);
+  const [total, setTotal] = useState(0);
   const [search, setSearch] = useState("");
+  const [icao, setIcao] = useState("");
+  const [offset, setOffset] = useState(0);
   const [loading, setLoading] = useState(true);
   const [tz, setTz] = useState("UTC");
 
   const [kiosks, setKiosks] = useState([]); // Add State
+  const [aiStats, setAiStats] = useState(null);
 
   const fetchData = async () => {
     setLoading(true);
     try {
-      const [cacheData, settingsData, kioskData] = await Promise.all([
-          api.get("/api/admin/cache"),
+      const [cachePage, settingsData, kioskData, aiData] = await Promise.all([
+          getPage("/api/admin/cache", { limit: PAGE_SIZE, offset, icao }),
           api.get("/api/admin/settings"),
-          api.get("/api/kiosk/list")
+          api.get("/api/kiosk/list"),
+          api.get("/api/admin/cache/ai").catch(() => null)
       ]);
-      setCache(cacheData);
+      setCache(cachePage.items);
+      setTotal(cachePage.total);
+      setAiStats(aiData);
       setKiosks(kioskData); // Set Kiosks
       if (Array.isArray(settingsData.config)) {
            const foundTz = settingsData.config.find(c => c.key === "app_timezone");
@@ -32,7 +43,16 @@ const CacheManager = () => {
     }
   };
 
-  useEffect(() => { fetchData(); }, []);
+  useEffect(() => { fetchData(); }, [offset, icao]);
+
+  // Debounced ICAO filter (exact match on the server)
+  useEffect(() => {
+    const t = setTimeout(() => {
+      setOffset(0);
+      setIcao(search.trim().toUpperCase());
+    }, 300);
+    return () => clearTimeout(t);
+  }, [search]);
 
   const formatTime = (isoString) => {
     if (!isoString) return "-";
@@ -51,17 +71,17 @@ const CacheManager = () => {
     }
   };
 
-  const filtered = cache.filter(item => 
-      item.icao.toLowerCase().includes(search.toLowerCase()) || 
-      item.category.toLowerCase().includes(search.toLowerCase())
-  );
-
   return (
     <AdminLayout>
       <div className="flex flex-col md:flex-row justify-between items-center mb-6 gap-4">
         <div>
             <h1 className="text-2xl font-bold text-white tracking-tight">Cache Manager</h1>
             <p className="text-neutral-500 text-sm">Stored Weather & AI Analyses</p>
+            {aiStats && (
+                <p className="text-neutral-500 text-xs mt-1 font-mono">
+                    AI reuse: {(aiStats.hit_ratio * 100).toFixed(1)}% ({aiStats.hits}/{aiStats.hits + aiStats.misses}) · {aiStats.tokens_saved.toLocaleString()} tokens saved
+                </p>
+            )}
         </div>
         
         <div className="flex items-center gap-3 w-full md:w-auto">
@@ -69,7 +89,7 @@ const CacheManager = () => {
                 <Search className="absolute left-3 top-2.5 text-neutral-500 w-4 h-4" />
                 <input 
                     type="text" 
-                    placeholder="Search ICAO..." 
+                    placeholder="Filter ICAO..." 
                     className="w-full bg-neutral-900 border border-neutral-700 rounded-full pl-10 pr-4 py-2 text-sm text-white focus:outline-none focus:border-blue-500"
                     value={search}
                     onChange={(e) => setSearch(e.target.value)}
@@ -100,12 +120,12 @@ const CacheManager = () => {
             <tbody className="divide-y divide-neutral-800 text-gray-300 font-mono">
                 {loading ? (
                     <tr><td colSpan="5" className="p-8 text-center text-blue-500 animate-pulse">LOADING CACHED DATA...</td></tr>
-                ) : filtered.length === 0 ? (
-                    <tr><td colSpan="5" className="p-8 text-center text-neutral-500">Cache is empty.</td></tr>
-                ) : filtered.map((row) => {
-                    // Match Kiosks to this Cache Row
+                ) : cache.length === 0 ? (
+                    <tr><td colSpan="5" className="p-8 text-center text-neutral-500">{icao ? `Nothing cached for ${icao}.` : "Cache is empty."}</td></tr>
+                ) : cache.map((row) => {
+                    // Match Kiosks to this Cache Row (boards list their airports instead of a target)
                     const matchingKiosks = kiosks.filter(k => 
-                        k.target_icao === row.icao && 
+                        (k.target_icao === row.icao || JSON.parse(k.airports || '[]').includes(row.icao)) && 
                         (
                             // 1. Kiosk has explicit override matching this row's source
                             (k.weather_override_icao && k.weather_override_icao === row.weather_source) || 
@@ -158,6 +178,7 @@ const CacheManager = () => {
                 );})}
             </tbody>
         </table>
+        <Pager offset={offset} pageSize={PAGE_SIZE} total={total} onChange={setOffset} />
       </div>
     </AdminLayout>
   );
@@ -1,10 +1,21 @@
 import React, { useEffect, useState } from 'react';
 import AdminLayout from './AdminLayout';
-import { Search, ShieldAlert, ShieldCheck, Unlock, Smartphone, Monitor } from 'lucide-react';
+import Pager from './Pager';
+import { getPage } from '../../services/api';
+import { Search, ShieldAlert, ShieldCheck, Unlock, Smartphone, Monitor, ArrowUpDown } from 'lucide-react';
+
+// Sorting, search and paging happen server-side (/api/admin/clients)
+const PAGE_SIZE = 100;
+const WINDOWS = [1, 7, 30, 90];
 
 const IpManager = () => {
   const [clients, setClients] = useState([]);
+  const [total, setTotal] = useState(0);
   const [search, setSearch] = useState("");
+  const [query, setQuery] = useState("");
+  const [days, setDays] = useState(30);
+  const [sort, setSort] = useState({ col: "total", order: "desc" });
+  const [offset, setOffset] = useState(0);
   const [loading, setLoading] = useState(true);
 
   // Helper for Headers
@@ -15,8 +26,11 @@ const IpManager = () => {
 
   const fetchClients = async () => {
     try {
-      const res = await fetch("/api/admin/clients", { headers: getHeaders() });
-      if (res.ok) setClients(await res.json());
+      const page = await getPage("/api/admin/clients", {
+        limit: PAGE_SIZE, offset, sort: sort.col, order: sort.order, search: query, days
+      });
+      setClients(page.items);
+      setTotal(page.total);
     } catch (err) {
       console.error(err);
     } finally {
@@ -26,7 +40,30 @@ const IpManager = () => {
 
   useEffect(() => {
     fetchClients();
-  }, []);
+  }, [offset, sort, query, days]);
+
+  // Debounced: each keystroke would otherwise be a grouped scan of the logs
+  useEffect(() => {
+    const t = setTimeout(() => {
+      setOffset(0);
+      setQuery(search.trim());
+    }, 300);
+    return () => clearTimeout(t);
+  }, [search]);
+
+  const toggleSort = (col) => {
+    setOffset(0);
+    setSort(prev => ({ col, order: prev.col === col && prev.order === "desc" ? "asc" : "desc" }));
+  };
+
+  const SortHeader = ({ col, children }) => (
+    <th className="p-4 cursor-pointer select-none hover:text-white" onClick={() => toggleSort(col)}>
+      <span className="inline-flex items-center gap-1">
+        {children}
+        <ArrowUpDown className={`w-3 h-3 ${sort.col === col ? "text-blue-400" : "text-neutral-600"}`} />
+      </span>
+    </th>
+  );
 
   const handleUnblock = async (key) => {
     if (!confirm(`Unblock User?`)) return;
@@ -51,24 +88,28 @@ const IpManager = () => {
     }
   };
 
-  const filtered = clients.filter(item => 
-      (item.client_id || "").toLowerCase().includes(search.toLowerCase()) || 
-      (item.last_ip || "").includes(search)
-  );
-
   return (
     <AdminLayout>
       <div className="flex justify-between items-center mb-6">
         <h2 className="text-lg font-bold text-white">Client & Traffic Manager</h2>
-        <div className="relative">
-            <Search className="absolute left-3 top-2.5 text-neutral-500 w-4 h-4" />
-            <input 
-                type="text" 
-                placeholder="Search ID or IP..." 
-                className="bg-neutral-900 border border-neutral-700 rounded-full pl-10 pr-4 py-2 text-sm text-white focus:outline-none focus:border-blue-500 w-64"
-                value={search}
-                onChange={(e) => setSearch(e.target.value)}
-            />
+        <div className="flex items-center gap-3">
+            <select
+                className="bg-neutral-900 border border-neutral-700 rounded-full px-4 py-2 text-sm text-white focus:outline-none focus:border-blue-500"
+                value={days}
+                onChange={(e) => { setOffset(0); setDays(Number(e.target.value)); }}
+            >
+                {WINDOWS.map(d => <option key={d} value={d}>Seen in last {d}d</option>)}
+            </select>
+            <div className="relative">
+                <Search className="absolute left-3 top-2.5 text-neutral-500 w-4 h-4" />
+                <input 
+                    type="text" 
+                    placeholder="Search ID or IP..." 
+                    className="bg-neutral-900 border border-neutral-700 rounded-full pl-10 pr-4 py-2 text-sm text-white focus:outline-none focus:border-blue-500 w-64"
+                    value={search}
+                    onChange={(e) => setSearch(e.target.value)}
+                />
+            </div>
         </div>
       </div>
 
@@ -76,16 +117,17 @@ const IpManager = () => {
         <table className="w-full text-left text-xs">
             <thead className="bg-neutral-800 text-neutral-400 uppercase tracking-wider">
                 <tr>
-                    <th className="p-4">Client Identity</th>
+                    <SortHeader col="client_id">Client Identity</SortHeader>
                     <th className="p-4">Last Known IP</th>
-                    <th className="p-4">Requests</th>
-                    <th className="p-4">Blocks</th>
+                    <SortHeader col="last_seen">Last Seen</SortHeader>
+                    <SortHeader col="total">Requests</SortHeader>
+                    <SortHeader col="blocked">Blocks</SortHeader>
                     <th className="p-4">Status</th>
                     <th className="p-4 text-right">Action</th>
                 </tr>
             </thead>
             <tbody className="divide-y divide-neutral-800 text-gray-300">
-                {filtered.map((row) => (
+                {clients.map((row) => (
                     <tr key={row.limit_key} className="hover:bg-neutral-800/50">
                         <td className="p-4 font-mono text-blue-400">
                             <div className="flex items-center gap-2">
@@ -103,6 +145,7 @@ const IpManager = () => {
                             </div>
                         </td>
                         <td className="p-4 font-mono text-gray-400">{row.last_ip}</td>
+                        <td className="p-4 font-mono text-gray-500">{row.last_seen ? new Date(row.last_seen + "Z").toLocaleString() : "-"}</td>
                         <td className="p-4 font-bold text-white">{row.total}</td>
                         <td className="p-4 text-orange-400">{row.blocked_count}</td>
                         <td className="p-4">
@@ -130,9 +173,10 @@ const IpManager = () => {
                 ))}
             </tbody>
         </table>
-        {filtered.length === 0 && !loading && (
+        {clients.length === 0 && !loading && (
             <div className="p-8 text-center text-neutral-500">No clients found.</div>
         )}
+        <Pager offset={offset} pageSize={PAGE_SIZE} total={total} onChange={setOffset} />
       </div>
     </AdminLayout>
   );
@@ -13,7 +13,9 @@ const KioskManager = () => {
 
   const [form, setForm] = useState({ 
       slug: '', 
+      profile_type: 'single',
       target_icao: '', 
+      airports: '',
       subscriber_name: '', 
       default_profile: 'small',
       weather_override_icao: '',
@@ -37,7 +39,7 @@ const KioskManager = () => {
   // Open Modal for New Entry
   const handleCreate = () => {
       setForm({ 
-          slug: '', target_icao: '', subscriber_name: '', default_profile: 'small',
+          slug: '', profile_type: 'single', target_icao: '', airports: '', subscriber_name: '', default_profile: 'small',
           weather_override_icao: '', title_override: '',
           show_raw_metar: true, show_notams: true, show_facility_message: false, custom_message_html: ''
       });
@@ -53,9 +55,16 @@ const KioskManager = () => {
           if (kiosk.config_options) conf = JSON.parse(kiosk.config_options);
       } catch (e) { console.error("JSON Parse Error", e); }
 
+      let airports = [];
+      try {
+          if (kiosk.airports) airports = JSON.parse(kiosk.airports);
+      } catch (e) { console.error("JSON Parse Error", e); }
+
       setForm({
           slug: kiosk.slug,
-          target_icao: kiosk.target_icao,
+          profile_type: kiosk.profile_type || 'single',
+          target_icao: kiosk.target_icao || '',
+          airports: airports.join(' '),
           subscriber_name: kiosk.subscriber_name,
           default_profile: kiosk.default_profile,
           weather_override_icao: kiosk.weather_override_icao || '',
@@ -72,10 +81,13 @@ const KioskManager = () => {
   const handleSubmit = async (e) => {
     e.preventDefault();
     try {
-        await api.post("/api/kiosk/add", form);
+        await api.post("/api/kiosk/add", {
+            ...form,
+            airports: form.airports.split(/[\s,]+/).filter(Boolean)
+        });
         setShowModal(false);
         fetchKiosks();
-    } catch (e) { alert("Failed to save kiosk"); }
+    } catch (e) { alert(`Failed to save kiosk: ${e.message}`); }
   };
 
   const handleRemove = async (slug) => {
@@ -119,7 +131,11 @@ const KioskManager = () => {
                         </td>
                         <td className="p-4">
                             <div className="flex items-center gap-2 mb-1">
+                                {k.profile_type === 'board' ? (
+                                    <span className="text-xs font-bold bg-neutral-800 px-1.5 py-0.5 rounded border border-neutral-700 text-blue-400">BOARD: {JSON.parse(k.airports || '[]').join(' ')}</span>
+                                ) : (
                                 <span className="text-xs font-bold bg-neutral-800 px-1.5 py-0.5 rounded border border-neutral-700 text-green-400">TGT: {k.target_icao}</span>
+                                )}
                                 {k.weather_override_icao && (
                                     <span className="text-xs font-bold bg-neutral-800 px-1.5 py-0.5 rounded border border-neutral-700 text-yellow-400">WX: {k.weather_override_icao}</span>
                                 )}
@@ -188,6 +204,27 @@ const KioskManager = () => {
                             </div>
                         </div>
                         
+                        <div>
+                            <label className="block text-xs font-bold text-neutral-500 mb-1 uppercase">Kiosk Type</label>
+                            <select className="w-full bg-black border border-neutral-700 rounded p-3 text-white focus:border-blue-500 outline-none appearance-none cursor-pointer" 
+                                value={form.profile_type} 
+                                onChange={e => setForm({...form, profile_type: e.target.value})}
+                            >
+                                <option value="single">Single Airport</option>
+                                <option value="board">Dispatch Board (Multiple Airports)</option>
+                            </select>
+                        </div>
+
+                        {form.profile_type === 'board' ? (
+                            <div>
+                                <label className="block text-xs font-bold text-neutral-500 mb-1 uppercase">Airports (Up to 20)</label>
+                                <input required className="w-full bg-black border border-neutral-700 rounded p-3 text-white font-mono uppercase focus:border-blue-500 outline-none" 
+                                    placeholder="e.g. KBOS KBED KOWD KBVY" 
+                                    value={form.airports} 
+                                    onChange={e => setForm({...form, airports: e.target.value.toUpperCase()})} 
+                                />
+                            </div>
+                        ) : (
                         <div className="grid grid-cols-1 md:grid-cols-2 gap-5">
                             <div>
                                 <label className="block text-xs font-bold text-neutral-500 mb-1 uppercase">Target Airport (ICAO)</label>
@@ -206,6 +243,7 @@ const KioskManager = () => {
                                 />
                             </div>
                         </div>
+                        )}
 
                         <div className="grid grid-cols-1 md:grid-cols-2 gap-5">
                             <div>
@@ -34,6 +34,57 @@ const LiveLogs = () => {
     fetchData();
   }, []);
 
+  // Live Tail (SSE over fetch so the admin key header can be sent)
+  useEffect(() => {
+    const controller = new AbortController();
+    let lastId = null;
+
+    const connect = async () => {
+      while (!controller.signal.aborted) {
+        try {
+          const headers = { "X-Admin-Key": localStorage.getItem("gonogo_admin_key") || "" };
+          if (lastId) headers["Last-Event-ID"] = lastId;
+
+          const res = await fetch("/api/admin/logs/stream", { headers, signal: controller.signal });
+          if (!res.ok || !res.body) throw new Error(`Stream failed (${res.status})`);
+
+          const reader = res.body.getReader();
+          const decoder = new TextDecoder();
+          let buffer = "";
+
+          while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+
+            const events = buffer.split("\n\n");
+            buffer = events.pop();
+            for (const evt of events) {
+              let id = null, type = "message", data = "";
+              for (const line of evt.split("\n")) {
+                if (line.startsWith("id: ")) id = line.slice(4);
+                else if (line.startsWith("event: ")) type = line.slice(7);
+                else if (line.startsWith("data: ")) data += line.slice(6);
+              }
+              if (id) lastId = id;
+              if (type === "log" && data) {
+                const entry = JSON.parse(data);
+                setLogs(prev => prev.some(l => l.id === entry.id) ? prev : [entry, ...prev].slice(0, 500));
+              }
+            }
+          }
+        } catch (err) {
+          if (controller.signal.aborted) return;
+          console.error(err);
+        }
+        // Back off before reconnecting (resumes from lastId)
+        await new Promise(r => setTimeout(r, 3000));
+      }
+    };
+    connect();
+    return () => controller.abort();
+  }, []);
+
   const formatTime = (isoString) => {
     if (!isoString) return "-";
     try {
@@ -0,0 +1,32 @@
+import React from 'react';
+import { ChevronLeft, ChevronRight } from 'lucide-react';
+
+// Offset pager for the admin list endpoints (total comes from X-Total-Count)
+const Pager = ({ offset, pageSize, total, onChange }) => {
+  const from = total === 0 ? 0 : offset + 1;
+  const to = Math.min(offset + pageSize, total);
+
+  return (
+    <div className="flex justify-between items-center px-4 py-3 bg-neutral-900/40 border-t border-neutral-800 text-xs text-neutral-400">
+      <span className="font-mono">{from}–{to} of {total}</span>
+      <div className="flex gap-2">
+        <button
+          disabled={offset === 0}
+          onClick={() => onChange(Math.max(0, offset - pageSize))}
+          className="px-3 py-1 rounded border border-neutral-700 hover:border-blue-500 disabled:opacity-30 disabled:hover:border-neutral-700 inline-flex items-center gap-1"
+        >
+          <ChevronLeft size={14} /> Prev
+        </button>
+        <button
+          disabled={to >= total}
+          onClick={() => onChange(offset + pageSize)}
+          className="px-3 py-1 rounded border border-neutral-700 hover:border-blue-500 disabled:opacity-30 disabled:hover:border-neutral-700 inline-flex items-center gap-1"
+        >
+          Next <ChevronRight size={14} />
+        </button>
+      </div>
+    </div>
+  );
+};
+
+export default Pager;
@@ -149,7 +149,10 @@ const Settings = () => {
             body: JSON.stringify({ channel })
         });
         if(res.ok) alert("Test Sent!");
-        else alert("Failed to send test.");
+        else {
+            const err = await res.json().catch(() => ({}));
+            alert(err.detail || "Failed to send test.");
+        }
     } catch (e) {
         alert("Error sending test.");
     }
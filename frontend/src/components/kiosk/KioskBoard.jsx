@@ -0,0 +1,163 @@
+import React, { useEffect, useRef, useState } from 'react';
+import { postStream } from '../../services/api';
+import { AlertTriangle, Loader2 } from 'lucide-react';
+
+// Multi-airport kiosk ("board" profile): one tile per airport, filled in as
+// /api/analyze/batch streams results, so a slow airport never holds up the rest.
+const REFRESH_MS = 5 * 60 * 1000;
+
+const CATEGORY_COLORS = {
+    VFR: "bg-green-900/40 border-green-600 text-green-400",
+    MVFR: "bg-blue-900/40 border-blue-600 text-blue-400",
+    IFR: "bg-red-900/40 border-red-600 text-red-400",
+    LIFR: "bg-pink-900/40 border-pink-600 text-pink-400"
+};
+
+const AirportTile = ({ icao, entry }) => {
+    if (!entry || entry.pending) {
+        return (
+            <div className="bg-neutral-800/40 border border-neutral-700 rounded-xl p-4 flex flex-col items-center justify-center gap-2">
+                <span className="text-2xl font-black font-mono text-white">{icao}</span>
+                <Loader2 className="w-6 h-6 text-blue-500 animate-spin" />
+            </div>
+        );
+    }
+    if (entry.error) {
+        return (
+            <div className="bg-neutral-800/40 border border-red-900/50 rounded-xl p-4 flex flex-col items-center justify-center gap-2 text-center">
+                <span className="text-2xl font-black font-mono text-white">{icao}</span>
+                <span className="text-red-400 text-xs font-bold flex items-center gap-1"><AlertTriangle size={14} /> {entry.error}</span>
+            </div>
+        );
+    }
+
+    const { analysis = {}, raw_data = {} } = entry.report;
+    const category = analysis.flight_category || "UNK";
+    return (
+        <div className={`${CATEGORY_COLORS[category] || "bg-neutral-800 border-neutral-700 text-neutral-400"} border rounded-xl p-4 flex flex-col gap-2 min-h-0 overflow-hidden`}>
+            <div className="flex justify-between items-baseline gap-2">
+                <span className="text-2xl font-black font-mono text-white">{icao}</span>
+                <span className="text-xl font-black">{category}</span>
+            </div>
+            <div className="text-xs text-gray-400 truncate">{entry.report.airport_name}</div>
+            <div className="grid grid-cols-2 gap-x-3 gap-y-1 text-sm text-gray-200">
+                <span className="text-gray-500 text-[10px] font-bold uppercase">Wind</span>
+                <span className="text-gray-500 text-[10px] font-bold uppercase">X-Wind {analysis.bubbles?.rwy ? `RWY ${analysis.bubbles.rwy}` : ""}</span>
+                <span className="font-bold">{analysis.bubbles?.wind || "--"}</span>
+                <span className="font-bold">{analysis.bubbles?.x_wind || "--"}</span>
+                <span className="text-gray-500 text-[10px] font-bold uppercase">Ceiling</span>
+                <span className="text-gray-500 text-[10px] font-bold uppercase">Visibility</span>
+                <span className="font-bold whitespace-pre-line">{analysis.bubbles?.ceiling || "--"}</span>
+                <span className="font-bold">{analysis.bubbles?.visibility || "--"}</span>
+            </div>
+            {analysis.airspace_warnings?.length > 0 && (
+                <span className="text-red-400 text-xs font-bold flex items-center gap-1 truncate">
+                    <AlertTriangle size={12} className="shrink-0" /> {analysis.airspace_warnings[0]}
+                </span>
+            )}
+            <p className="font-mono text-green-400 text-xs leading-tight break-words mt-auto">
+                {raw_data.metar || "No METAR"}
+            </p>
+        </div>
+    );
+};
+
+const KioskBoard = ({ config }) => {
+    const [entries, setEntries] = useState({});
+    const [currentTime, setCurrentTime] = useState(new Date());
+    const [lastUpdate, setLastUpdate] = useState(null);
+    const [error, setError] = useState(null);
+    const loadingRef = useRef(false);
+
+    const airports = config.airports || [];
+
+    const loadBoard = async (force = false) => {
+        if (loadingRef.current) return;
+        loadingRef.current = true;
+        // Keep showing the previous report until its replacement arrives
+        setEntries(prev => Object.fromEntries(airports.map(code => [code, prev[code] || { pending: true }])));
+        try {
+            await postStream("/api/analyze/batch", {
+                airports,
+                plane_size: config.default_profile,
+                force,
+                kiosk: config.slug
+            }, (line) => {
+                if (line.type === "report") {
+                    setEntries(prev => ({ ...prev, [line.icao]: { report: line.report } }));
+                } else if (line.type === "error") {
+                    // A stale report beats an error tile (e.g. the board's refresh budget ran out)
+                    setEntries(prev => ({ ...prev, [line.icao]: prev[line.icao]?.report ? prev[line.icao] : { error: line.error } }));
+                }
+            });
+            setError(null);
+            setLastUpdate(new Date());
+        } catch (e) {
+            console.error("Board load failed", e);
+            setError(e.message);
+        } finally {
+            loadingRef.current = false;
+        }
+    };
+
+    useEffect(() => {
+        document.title = `${config.subscriber_name} | WxDecoder`;
+        loadBoard();
+        const refresh = setInterval(() => loadBoard(), REFRESH_MS);
+        const clock = setInterval(() => setCurrentTime(new Date()), 1000);
+        return () => {
+            clearInterval(refresh);
+            clearInterval(clock);
+        };
+    }, [config]);
+
+    const cols = airports.length <= 4 ? "grid-cols-2" : airports.length <= 9 ? "grid-cols-3" : airports.length <= 12 ? "grid-cols-4" : "grid-cols-5";
+
+    return (
+        <div className="w-screen h-screen bg-neutral-900 text-white overflow-hidden font-sans p-6 grid grid-rows-[auto_1fr_auto] gap-6 selection:bg-none cursor-none">
+
+            {/* HEADER ROW */}
+            <div className="flex justify-between items-end border-b-2 border-neutral-800 pb-4">
+                <div className="flex items-center gap-10 min-w-0">
+                    <img src="/logo.webp" className="h-20 w-auto object-contain" />
+                    <div className="min-w-0">
+                        <h1 className="text-4xl md:text-6xl font-black tracking-tighter text-white leading-none truncate whitespace-nowrap">
+                            {config.title_override || config.subscriber_name}
+                        </h1>
+                        <div className="text-sm font-mono text-gray-500 mt-3">
+                            DISPATCH BOARD · {airports.length} AIRPORTS · PROFILE {config.default_profile?.toUpperCase()}
+                            {lastUpdate && ` · UPDATED ${lastUpdate.toLocaleTimeString('en-US', { hour12: false, hour: '2-digit', minute: '2-digit' })}`}
+                            {error && <span className="text-red-400"> · {error}</span>}
+                        </div>
+                    </div>
+                </div>
+
+                {/* Clock */}
+                <div className="text-right">
+                    <div className="text-6xl font-mono font-bold text-gray-200">
+                        {currentTime.toLocaleTimeString('en-US', { hour12: false, hour: '2-digit', minute:'2-digit' })}
+                        <span className="text-2xl text-neutral-500 ml-2">LCL</span>
+                    </div>
+                    <div className="text-xl text-blue-500 font-mono font-bold mt-1">
+                        {currentTime.toLocaleTimeString('en-US', { hour12: false, hour: '2-digit', minute:'2-digit', timeZone: 'UTC' })}Z
+                    </div>
+                </div>
+            </div>
+
+            {/* AIRPORT GRID */}
+            <div className={`grid ${cols} auto-rows-fr gap-4 min-h-0`}>
+                {airports.map(code => <AirportTile key={code} icao={code} entry={entries[code]} />)}
+            </div>
+
+            <div className="bg-neutral-800 border border-neutral-700 rounded-lg p-3">
+                <p className="text-xs text-gray-300 font-medium flex items-center justify-center gap-1 text-center">
+                    <AlertTriangle className="w-4 h-4 text-red-500 shrink-0" />
+                    <span className="font-bold text-red-500">DISCLAIMER:</span>
+                    <span>AI normalizes data and can make errors. Always verify with official sources.</span>
+                </p>
+            </div>
+        </div>
+    );
+};
+
+export default KioskBoard;
@@ -2,6 +2,7 @@ import React, { useEffect, useState } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import api from '../../services/api';
 import Bubble from '../Bubble';
+import KioskBoard from './KioskBoard';
 import { AlertTriangle, Clock, Plane, Info } from 'lucide-react';
 
 const NOTAMScroller = ({ notams }) => {
@@ -246,6 +247,12 @@ const KioskDisplay = () => {
                 const conf = await api.get(`/api/kiosk/config/${slug}`);
                 console.log("✅ Config received:", conf);
                 setConfig(conf);
+
+                // Multi-airport boards load their own data (KioskBoard)
+                if (conf.profile_type === 'board') {
+                    setLoading(false);
+                    return;
+                }
                 
                 // Trigger initial analysis using the config's defaults
                 loadAnalysis(conf.default_profile, false, conf); 
@@ -279,7 +286,7 @@ const KioskDisplay = () => {
     // 3. Poller
     useEffect(() => {
         const poller = setInterval(async () => {
-            if (!config) return;
+            if (!config || config.profile_type === 'board') return;
 
             try {
                 // Peek the TARGET icao from config
@@ -326,6 +333,10 @@ const KioskDisplay = () => {
         }
     };
 
+    if (config?.profile_type === 'board') {
+        return <KioskBoard config={config} />;
+    }
+
     // LOADING STATE
     if (loading) {
         return (
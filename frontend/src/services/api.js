@@ -41,4 +41,49 @@ apiClient.interceptors.response.use(
   }
 );
 
+// 6. Streaming POST (NDJSON): calls onLine for each object as it arrives.
+// Axios buffers the whole body in the browser, so this one uses fetch.
+export const postStream = async (url, body, onLine) => {
+  const headers = { 'Content-Type': 'application/json', 'X-Client-ID': getClientId() };
+  const adminKey = getAdminKey();
+  if (adminKey) headers['X-Admin-Key'] = adminKey;
+
+  const res = await fetch(url, { method: 'POST', headers, body: JSON.stringify(body) });
+  if (!res.ok) {
+    const err = await res.json().catch(() => ({}));
+    throw new Error(err.detail || `HTTP ${res.status}`);
+  }
+
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    const lines = buffer.split("\n");
+    buffer = lines.pop();
+    lines.filter(l => l.trim()).forEach(l => onLine(JSON.parse(l)));
+  }
+  if (buffer.trim()) onLine(JSON.parse(buffer));
+};
+
+// 7. Paged GET: the list plus the X-Total-Count the admin list endpoints return.
+// Empty params are dropped so the server defaults apply.
+export const getPage = async (url, params = {}) => {
+  const headers = { 'X-Client-ID': getClientId() };
+  const adminKey = getAdminKey();
+  if (adminKey) headers['X-Admin-Key'] = adminKey;
+
+  const query = new URLSearchParams(
+    Object.entries(params).filter(([, v]) => v !== undefined && v !== null && v !== "")
+  ).toString();
+  const res = await fetch(query ? `${url}?${query}` : url, { headers });
+  if (!res.ok) {
+    const err = await res.json().catch(() => ({}));
+    throw new Error(err.detail || `HTTP ${res.status}`);
+  }
+  return { items: await res.json(), total: parseInt(res.headers.get('X-Total-Count') || '0', 10) };
+};
+
 export default apiClient;
\ No newline at end of file
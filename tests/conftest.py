@@ -0,0 +1,9 @@
+import os
+import pytest
+
+# app.core.db builds its clients at import time; nothing here connects to them
+os.environ.setdefault("DATABASE_URL", "postgresql://localhost/test")
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
@@ -0,0 +1,45 @@
+import datetime
+from app.core.freshness import observation_age, report_ttl, is_superseded, REPORT_MAX_TTL, REPORT_NO_OBS_TTL
+
+NOW = datetime.datetime(2026, 10, 19, 12, 0, tzinfo=datetime.timezone.utc).timestamp()
+TAF = "TAF KBWI 191120Z 1912/2018 27010KT P6SM FEW250"
+
+def test_observation_age():
+    assert observation_age("METAR KBWI 191154Z 27010KT 10SM CLR 15/05 A3012", NOW) == 6 * 60
+    assert observation_age("KBWI 27010KT 10SM", NOW) is None
+
+def test_observation_age_previous_month():
+    now = datetime.datetime(2026, 11, 1, 0, 10, tzinfo=datetime.timezone.utc).timestamp()
+    assert observation_age("KBWI 312354Z 27010KT", now) == 16 * 60
+
+def test_current_observation_lives_until_replaced():
+    wx = {"metar": "KBWI 191154Z 27010KT 10SM CLR 15/05 A3012", "taf": TAF}
+    assert report_ttl(wx, NOW) == REPORT_MAX_TTL
+
+def test_stale_observation_is_cached_briefly():
+    wx = {"metar": "KBWI 190854Z 27010KT 10SM CLR 15/05 A3012", "taf": TAF}
+    assert report_ttl(wx, NOW) == REPORT_NO_OBS_TTL
+
+def test_missing_observation_is_cached_briefly():
+    assert report_ttl({"metar": None, "taf": TAF}, NOW) == REPORT_NO_OBS_TTL
+    assert report_ttl(None, NOW) == REPORT_NO_OBS_TTL
+
+def test_newer_metar_or_taf_supersedes():
+    built = "191154|191120"
+    assert is_superseded(built, {"metar": "KBWI 191208Z 27010KT", "taf": TAF}, NOW)
+    assert is_superseded(built, {"metar": "KBWI 191154Z 27010KT", "taf": "TAF AMD KBWI 191140Z 1912/2018 27010KT"}, NOW)
+    assert not is_superseded(built, {"metar": "KBWI 191154Z 27010KT", "taf": TAF}, NOW)
+
+def test_missing_taf_or_lagging_feed_keeps_report():
+    built = "191154|191120"
+    assert not is_superseded(built, {"metar": "KBWI 191154Z 27010KT", "taf": "No TAF available"}, NOW)
+    assert not is_superseded(built, {"metar": "KBWI 191054Z 27010KT", "taf": TAF}, NOW)
+    assert not is_superseded(built, {"metar": None, "taf": "No TAF available"}, NOW)
+    assert not is_superseded(built, None, NOW)
+
+def test_taf_issued_after_report_supersedes():
+    assert is_superseded("191154|", {"metar": "KBWI 191154Z 27010KT", "taf": TAF}, NOW)
+
+def test_month_rollover_is_newer():
+    now = datetime.datetime(2026, 11, 1, 0, 10, tzinfo=datetime.timezone.utc).timestamp()
+    assert is_superseded("312354|311720", {"metar": "KBWI 010005Z 27010KT", "taf": None}, now)
@@ -0,0 +1,49 @@
+import httpx
+import pytest
+from app.core import geography, resolver as resolver_module
+from app.core.resolver import IdentifierResolver, RemoteLookupError, REMOTE_KEY
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(resolver_module, "redis_client", fake)
+    return fake
+
+def awc_answers(monkeypatch, status, body=None):
+    def handler(request):
+        return httpx.Response(status, json=body) if body is not None else httpx.Response(status)
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(geography.httpx, "AsyncClient",
+                        lambda **kw: real_client(transport=httpx.MockTransport(handler), **kw))
+
+@pytest.mark.anyio
+async def test_found_station_is_cached(monkeypatch, redis):
+    awc_answers(monkeypatch, 200, [{"lat": 39.2, "lon": -76.7, "site": "Test Field"}])
+    data = await IdentifierResolver().lookup_remote("KZZZ")
+    assert data == {"lat": 39.2, "lon": -76.7, "name": "Test Field"}
+    assert REMOTE_KEY.format("KZZZ") in redis.data
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("status, body", [(200, []), (204, None)])
+async def test_empty_answer_is_cached_as_missing(monkeypatch, redis, status, body):
+    awc_answers(monkeypatch, status, body)
+    assert await IdentifierResolver().lookup_remote("KZZZ") is None
+    assert redis.data[REMOTE_KEY.format("KZZZ")] == "null"
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("status", [403, 429, 500, 503])
+async def test_upstream_refusal_is_not_cached(monkeypatch, redis, status):
+    awc_answers(monkeypatch, status)
+    with pytest.raises(RemoteLookupError):
+        await IdentifierResolver().lookup_remote("KZZZ")
+    assert redis.data == {}
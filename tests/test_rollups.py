@@ -0,0 +1,18 @@
+from app.core.logger import latency_bin, latency_percentile
+from app.core.db import LATENCY_BINS
+
+def test_latency_bin_edges():
+    assert latency_bin(0.05) == 0
+    assert latency_bin(0.1) == 1
+    assert latency_bin(1.5) == LATENCY_BINS.index(2)
+    assert latency_bin(600) == len(LATENCY_BINS)
+
+def test_latency_percentile():
+    counts = {latency_bin(0.3): 90, latency_bin(4): 8, latency_bin(25): 2}
+    assert latency_percentile(counts, 0.5) == 0.5
+    assert latency_percentile(counts, 0.95) == 5
+    assert latency_percentile(counts, 0.99) == 30
+
+def test_latency_percentile_open_bin_and_empty():
+    assert latency_percentile({len(LATENCY_BINS): 3}, 0.95) == LATENCY_BINS[-1]
+    assert latency_percentile({}, 0.95) is None
@@ -0,0 +1,68 @@
+import httpx
+import pytest
+from app.core import stations
+from app.core.geography import airports_icao
+
+@pytest.fixture(scope="module")
+def reporting():
+    return stations._reporting_stations(stations.load_station_fixture())
+
+def rank(reporting, code, limit=10):
+    airport = airports_icao[code]
+    return stations.rank_stations(reporting, float(airport['lat']), float(airport['lon']), exclude={code}, limit=limit)
+
+def test_taf_stations_within_taf_radius_come_first(reporting):
+    ranked = rank(reporting, "KANP")
+    # KW29 (11nm) and KFME (12nm) are closer, but METAR-only
+    assert [r[0] for r in ranked[:4]] == ["KBWI", "KADW", "KDCA", "KMTN"]
+    assert all(has_taf and dist <= stations.TAF_RADIUS_NM for _, dist, has_taf in ranked[:4])
+    assert ranked[4][0] == "KW29"
+
+def test_taf_station_beyond_taf_radius_ranks_by_distance(reporting):
+    ranked = [r[0] for r in rank(reporting, "KBWI")]
+    # KDCA has a TAF but is 26nm out: it goes after nearer METAR-only stations
+    assert ranked.index("KDCA") > ranked.index("KGAI")
+    assert ranked[:2] == ["KMTN", "KADW"]
+
+def test_search_radius_cutoff(reporting):
+    ranked = rank(reporting, "KBOS")
+    assert [r[0] for r in ranked] == ["KBED", "KOWD", "KGHG", "KPSM"]
+    assert all(dist <= stations.SEARCH_RADIUS_NM for _, dist, _ in ranked)
+
+def test_limit(reporting):
+    assert len(rank(reporting, "KANP", limit=stations.STATIONS_PER_AIRPORT)) == stations.STATIONS_PER_AIRPORT
+
+@pytest.fixture(scope="module")
+def table():
+    return stations.compute_station_table(stations.load_station_fixture())
+
+def test_table_excludes_own_station(table):
+    assert "KBWI" not in [r[0] for r in table["KBWI"]]
+    # LID keys exclude the airport's ICAO station too
+    assert "KBWI" not in [r[0] for r in table["BWI"]]
+    assert table["KBWI"][0][0] == "KMTN"
+
+def test_grid_matches_full_scan(table, reporting):
+    assert [tuple(r) for r in table["KANP"]] == rank(reporting, "KANP", limit=stations.STATIONS_PER_AIRPORT)
+
+def test_keep_empty(table):
+    # Nothing in the fixture is near Anchorage
+    assert "PANC" not in table
+    with_empty = stations.compute_station_table(stations.load_station_fixture(), keep_empty=True)
+    assert with_empty["PANC"] == []
+    assert with_empty["KANP"] == table["KANP"]
+
+@pytest.mark.anyio
+async def test_fixture_only_when_allowed(monkeypatch):
+    class FailingClient:
+        def __init__(self, *args, **kwargs): pass
+        async def __aenter__(self): return self
+        async def __aexit__(self, *exc): return False
+        async def get(self, url):
+            raise httpx.ConnectError("unreachable")
+
+    monkeypatch.setattr(stations.httpx, "AsyncClient", FailingClient)
+    with pytest.raises(httpx.ConnectError):
+        await stations.fetch_station_metadata()
+    metadata, source = await stations.fetch_station_metadata(allow_fixture=True)
+    assert source == "fixture" and len(metadata) == 28
@@ -0,0 +1,186 @@
+import os
+import json
+import types
+import datetime
+import pytest
+import app.core.db
+from app.core import tfr
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(__file__)), "app", "data", "tfr_fixtures")
+# Fixtures were recorded on 19 Oct 2026: the VIP TFR is active, the launch window is ahead
+NOW = datetime.datetime(2026, 10, 19, 12, 0, tzinfo=datetime.timezone.utc).timestamp()
+
+def ts(text):
+    return datetime.datetime.fromisoformat(text).replace(tzinfo=datetime.timezone.utc).timestamp()
+
+def read_fixture(notam_id):
+    with open(os.path.join(FIXTURES, f"detail_{notam_id.replace('/', '_')}.xml")) as f:
+        return f.read()
+
+def centroid(area):
+    ring = area["polygons"][0][0][:-1]
+    return sum(p[1] for p in ring) / len(ring), sum(p[0] for p in ring) / len(ring)
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = types.SimpleNamespace(now=NOW, perf_counter=lambda: 0.0)
+    fake.time = lambda: fake.now
+    monkeypatch.setattr(tfr, "time", fake)
+    return fake
+
+# --- PARSING ---
+def test_parse_vip_areas_and_altitudes():
+    row = tfr.parse_tfr_xml("6/4375", read_fixture("6/4375"))
+    assert row["type"] == "SECURITY"
+    assert row["name"] == "VIP MOVEMENT. WEST PALM BEACH, FL"
+    assert [a["name"] for a in row["areas"]] == ["WEST PALM BEACH INNER", "WEST PALM BEACH OUTER"]
+    for area in row["areas"]:
+        assert (area["floor_ft"], area["ceiling_ft"]) == (0, 17999)
+        ring = area["polygons"][0][0]
+        assert len(ring) > 3 and ring[0] == ring[-1]
+        # (lon, lat), west longitudes negative
+        assert ring[0][0] < 0 < ring[0][1]
+    assert row["effective"] == ts("2026-10-17T22:00:00")
+    assert row["expires"] == ts("2026-10-21T03:00:00")
+
+def test_parse_until_further_notice():
+    row = tfr.parse_tfr_xml("6/2110", read_fixture("6/2110"))
+    assert row["type"] == "HAZARDS"
+    assert row["areas"][0]["ceiling_ft"] == 8000
+    assert row["expires"] is None and row["areas"][0]["expires"] is None
+
+def test_parse_flight_level_and_schedule():
+    row = tfr.parse_tfr_xml("6/5502", read_fixture("6/5502"))
+    area = row["areas"][0]
+    assert area["ceiling_ft"] == 60000  # STD 600 = FL600
+    assert (area["effective"], area["expires"]) == (ts("2026-11-02T21:30:00"), ts("2026-11-03T02:30:00"))
+
+def test_area_schedule_overrides_notam_window():
+    xml = read_fixture("6/5502").replace(
+        "<dateEffective>2026-11-02T21:30:00</dateEffective>\n                <dateExpire>2026-11-03T02:30:00</dateExpire>",
+        "<dateEffective>2026-11-02T23:00:00</dateEffective>\n                <dateExpire>2026-11-03T00:00:00</dateExpire>"
+    )
+    row = tfr.parse_tfr_xml("6/5502", xml)
+    assert (row["areas"][0]["effective"], row["areas"][0]["expires"]) == (ts("2026-11-02T23:00:00"), ts("2026-11-03T00:00:00"))
+
+def test_parse_without_area_returns_none():
+    assert tfr.parse_tfr_xml("X", "<XNOTAM-Update><Group><Add><Not><dateEffective/></Not></Add></Group></XNOTAM-Update>") is None
+
+# --- INGEST (recorded feed, in-memory tfrs table) ---
+class FakeDatabase:
+    def __init__(self):
+        self.rows = {}
+
+    def transaction(self):
+        db = self
+
+        class Tx:
+            async def __aenter__(self): return db
+            async def __aexit__(self, *exc): return False
+        return Tx()
+
+    async def execute(self, query, values=None):
+        if query.startswith("DELETE FROM tfrs WHERE NOT"):
+            self.rows = {k: v for k, v in self.rows.items() if k in values["keep"]}
+        elif query.startswith("DELETE FROM tfrs WHERE expires"):
+            self.rows = {k: v for k, v in self.rows.items() if v["expires"] is None or v["expires"] >= values["now"]}
+        elif "INSERT INTO tfrs" in query:
+            self.rows[values["notam_id"]] = dict(values)
+        else:
+            raise AssertionError(query)
+
+    async def fetch_all(self, query):
+        return list(self.rows.values())
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+@pytest.fixture
+def store(monkeypatch, clock):
+    db, redis = FakeDatabase(), FakeRedis()
+    monkeypatch.setattr(app.core.db, "database", db)
+    monkeypatch.setattr(app.core.db, "redis_client", redis)
+    monkeypatch.setattr(tfr, "TFR_SOURCE", FIXTURES)
+    return db, redis
+
+@pytest.mark.anyio
+async def test_ingest_from_recorded_feed(store):
+    db, redis = store
+    await tfr.ingest_tfrs()
+    assert sorted(db.rows) == ["6/2110", "6/4375", "6/5502"]
+    assert len(json.loads(db.rows["6/4375"]["areas"])) == 2
+    assert json.loads(redis.data[tfr.TFR_VERSION_KEY])["count"] == 3
+
+@pytest.mark.anyio
+async def test_ingest_keeps_rows_whose_detail_failed(store, monkeypatch):
+    db, _ = store
+    await tfr.ingest_tfrs()
+    real_fetch = tfr._fetch_feed
+
+    async def flaky_feed():
+        docs = await real_fetch()
+        docs["6/2110"] = None
+        del docs["6/5502"]  # Dropped from the list: cancelled
+        return docs
+
+    monkeypatch.setattr(tfr, "_fetch_feed", flaky_feed)
+    await tfr.ingest_tfrs()
+    assert sorted(db.rows) == ["6/2110", "6/4375"]
+
+@pytest.mark.anyio
+async def test_ingest_drops_expired(store, clock):
+    db, _ = store
+    clock.now = ts("2026-10-22T00:00:00")
+    await tfr.ingest_tfrs()
+    assert "6/4375" not in db.rows
+
+# --- PER-WORKER INDEX ---
+@pytest.fixture
+async def index(store):
+    await tfr.ingest_tfrs()
+    idx = tfr.TFRIndex()
+    await idx.sync()
+    return idx
+
+@pytest.mark.anyio
+async def test_zones_near_active_window(index, clock):
+    row = tfr.parse_tfr_xml("6/4375", read_fixture("6/4375"))
+    lat, lon = centroid(row["areas"][0])
+    hits = index.zones_near(lat, lon)
+    assert {z.properties["notam_id"] for z, _, _ in hits} == {"6/4375"}
+    assert all(inside for _, inside, _ in hits)
+    # Before the TFR starts and after it ends it doesn't apply
+    assert index.zones_near(lat, lon, at=ts("2026-10-17T21:59:00")) == []
+    assert index.zones_near(lat, lon, at=ts("2026-10-21T03:00:00")) == []
+
+@pytest.mark.anyio
+async def test_scheduled_tfr_switches_on(index, clock):
+    row = tfr.parse_tfr_xml("6/5502", read_fixture("6/5502"))
+    lat, lon = centroid(row["areas"][0])
+    assert index.warnings("KXMR", lat, lon) == []
+    clock.now = ts("2026-11-02T22:00:00")
+    warnings = index.warnings("KXMR", lat, lon)
+    assert len(warnings) == 1
+    assert warnings[0].startswith("CRITICAL: KXMR is located within active TFR 6/5502")
+    assert "SFC-FL600" in warnings[0] and "until 03 0230Z" in warnings[0]
+
+@pytest.mark.anyio
+async def test_one_warning_per_notam(index):
+    row = tfr.parse_tfr_xml("6/4375", read_fixture("6/4375"))
+    lat, lon = centroid(row["areas"][0])  # Inside both the inner and outer ring
+    warnings = index.warnings("KPBI", lat, lon)
+    assert len(warnings) == 1 and "6/4375" in warnings[0]
+
+@pytest.mark.anyio
+async def test_until_further_notice_warning(index):
+    row = tfr.parse_tfr_xml("6/2110", read_fixture("6/2110"))
+    lat, lon = centroid(row["areas"][0])
+    warnings = index.warnings("O00", lat, lon)
+    assert len(warnings) == 1 and "until further notice" in warnings[0]
@@ -0,0 +1,97 @@
+import httpx
+import pytest
+from app.core import wxmap
+from app.core.weather import flight_category
+from app.core.wxmap import tiles_for, TILE_KEY, TILE_TTL, TILE_EMPTY_TTL
+
+@pytest.mark.parametrize("metar, category", [
+    ("KBWI 191154Z 27010KT 10SM FEW250 15/05 A3012", "VFR"),
+    ("KBWI 191154Z 27010KT 10SM BKN030 15/05 A3012", "MVFR"),
+    ("KBWI 191154Z 27010KT 5SM HZ SCT040 15/05 A3012", "MVFR"),
+    ("KBWI 191154Z 27010KT 2 1/2SM BR OVC015 15/05 A3012", "IFR"),
+    ("KBWI 191154Z 27010KT 10SM OVC008 15/05 A3012", "IFR"),
+    ("KBWI 191154Z 00000KT 1/4SM FG VV002 10/10 A3012", "LIFR"),
+    ("KBWI 191154Z 00000KT M1/4SM FG OVC001 10/10 A3012", "LIFR"),
+    ("EGLL 191150Z 27010KT CAVOK 15/05 Q1020", "VFR"),
+    ("EGLL 191150Z 27010KT 4000 BR BKN007 15/05 Q1020", "IFR"),
+    ("KBWI 191154Z 27010KT 10SM CLR 15/05 A3012 RMK VIS 1/2SM N", "VFR"),
+    ("KBWI 191154Z AUTO 27010KT A3012", "UNK"),
+    (None, "UNK"),
+])
+def test_flight_category(metar, category):
+    assert flight_category(metar) == category
+
+def test_tiles_for_covers_the_box():
+    assert tiles_for(-77.5, 38.5, -76.5, 39.5) == [(-78, 38), (-77, 38), (-78, 39), (-77, 39)]
+
+def test_tiles_for_includes_top_right_edge_tiles():
+    # A box ending exactly on a tile edge still needs the tile its edge stations live in
+    assert tiles_for(-77, 39, -76, 40) == [(-77, 39), (-76, 39), (-77, 40), (-76, 40)]
+
+def test_tiles_for_single_point():
+    assert tiles_for(-76.6, 39.2, -76.6, 39.2) == [(-77, 39)]
+
+class FakeIndex:
+    def __init__(self, stations):
+        self.stations = stations
+
+    def within(self, min_lon, min_lat, max_lon, max_lat):
+        return [s for s in self.stations if min_lon <= s[3] <= max_lon and min_lat <= s[2] <= max_lat]
+
+class FakePipeline:
+    def __init__(self, store):
+        self.store = store
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def set(self, key, value, ex=None):
+        self.store[key] = ex
+
+    async def execute(self):
+        pass
+
+class FakeRedis:
+    def __init__(self):
+        self.ttls = {}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self.ttls)
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(wxmap, "redis_client", fake)
+    return fake
+
+STATIONS = [
+    ("KBWI", "Baltimore", 39.18, -76.67),
+    ("KDCA", "Reagan", 38.85, -77.04),
+    ("KIAD", "Dulles", 38.94, -77.46),
+    ("KPHL", "Philadelphia", 39.87, -75.24),
+]
+
+@pytest.mark.anyio
+async def test_tiles_with_a_failed_chunk_are_not_cached(monkeypatch, redis):
+    monkeypatch.setattr(wxmap, "station_index", FakeIndex(STATIONS))
+    monkeypatch.setattr(wxmap, "FETCH_CHUNK", 1)
+
+    async def metars(codes):
+        if codes == ["KDCA"]:
+            raise httpx.ConnectError("upstream down")
+        return {c: f"{c} 191154Z 27010KT 10SM FEW250 15/05 A3012" for c in codes if c != "KPHL"}
+    monkeypatch.setattr(wxmap, "get_bulk_metars", metars)
+
+    tiles = [(-77, 39), (-78, 38), (-76, 39), (-70, 40)]
+    built = await wxmap._build_tiles(tiles)
+
+    assert [s["icao"] for s in built[(-78, 38)]] == ["KIAD"]
+    # KDCA's chunk failed: its tile is served without it but not cached
+    assert TILE_KEY.format(-78, 38) not in redis.ttls
+    assert redis.ttls[TILE_KEY.format(-77, 39)] == TILE_TTL
+    # Reported nothing (but answered): cached briefly
+    assert redis.ttls[TILE_KEY.format(-76, 39)] == TILE_EMPTY_TTL
+    assert redis.ttls[TILE_KEY.format(-70, 40)] == TILE_EMPTY_TTL